@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines the REST central server's application, shared by every serving mode
+"""
+
+# built-in dependencies
+import atexit
+import os
+import time
+
+# external dependencies
+import flask
+import flask_restful
+from werkzeug.exceptions import InternalServerError
+
+# project dependencies
+from controllers.database.index import get_resource_index_controller
+from controllers.database.selection import DEFAULT_STRATEGY
+from controllers.profiling import ProfilerController
+from controllers.server.heartbeat import HeartBeatController
+from controllers.server.metadata import ResourceMetadataController
+from controllers.server.metrics import MetricsController
+from controllers.server.profiling import ProfilingController
+from controllers.server.resource import ResourceController
+from controllers.server.search import SearchController
+from controllers.server.utils import response
+from controllers.server.utils.metrics import get_metrics_registry_controller
+from database.table import create_table
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+HOST = "127.0.0.1"  # flask's development server default
+PORT = 5000
+KEEP_ALIVE_TIMEOUT = 30  # seconds an idle keep-alive connection is kept open (peers beat every 5)
+
+
+def create_app(shared: bool = False, udp_heartbeat: bool = False,
+               selection: str = DEFAULT_STRATEGY) -> flask.Flask:
+    """
+    Creates the central server's application and starts its heartbeat monitor
+
+    :param shared: Whether other processes serve the same database (registry and liveness live at the
+                   database instead of process' memory, whose tables must already exist)
+    :param udp_heartbeat: Whether compact heartbeats are also received over UDP
+    :param selection: Strategy that ranks a content's holders by their reported load
+    :return: WSGI application
+    """
+
+    app = flask.Flask(__name__)
+    api = flask_restful.Api(app)
+
+    # clients may accept compact binary responses instead of JSON
+    api.representations[response.MSGPACK_MIMETYPE] = response.output_msgpack
+
+    # stop server's heartbeat monitor when server is stopped
+    atexit.register(HeartBeatController.stop_monitor)
+
+    metrics = get_metrics_registry_controller()
+
+    # time every request, labelled by its route's rule (not its URL), so there are only a few labels
+    @app.before_request
+    def start_timer():
+        flask.g.started = time.perf_counter()
+
+    @app.after_request
+    def record_request(resp):
+        rule = flask.request.url_rule
+        labels = (
+            ("route", "unmatched" if rule is None else rule.rule),
+            ("method", flask.request.method),
+            ("status", str(resp.status_code))
+        )
+        metrics.observe("p2p_http_request_duration_seconds", labels, time.perf_counter() - flask.g.started)
+        return resp
+
+    # when internal exceptions occurs
+    @app.errorhandler(InternalServerError)
+    def handle_exception(e):
+        return response.internal_server_error(data=str(e))
+
+    # assign resources to routes
+    api.add_resource(ResourceController, "/resource")
+    api.add_resource(ResourceMetadataController, "/resource/metadata")
+    api.add_resource(SearchController, "/search")
+    api.add_resource(HeartBeatController, "/heartbeat")
+    api.add_resource(MetricsController, "/metrics")
+    api.add_resource(ProfilingController, "/admin/profiling")
+
+    ResourceController.rank_holders_with(selection)
+
+    # a fraction of requests is profiled when 'P2P_PROFILE' is set or through '/admin/profiling'
+    profiler = ProfilerController.from_environment()
+
+    if shared:
+        ResourceController.share_registry()
+        SearchController.share_registry()
+        HeartBeatController.share_monitor()
+
+        # each scrape is answered by a single worker, whose metrics are its own
+        metrics.label_every_metric(worker=os.getpid())
+
+        # and their profiles
+        profiler.directory = os.path.join(profiler.directory, f"worker_{os.getpid()}")
+
+    else:
+        # create database table if not exists
+        create_table()
+
+        # load every resource at the in-memory index
+        get_resource_index_controller().rebuild()
+
+    ProfilingController.install(app, profiler)
+
+    # start server's heartbeat monitor
+    HeartBeatController.start_monitor()
+
+    # compact heartbeats over UDP, alongside the REST route
+    if udp_heartbeat:
+        HeartBeatController.start_listener(HOST, reuse_port=shared)
+
+    return app
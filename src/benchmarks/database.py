@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks central server's registry queries before and after indexes and engine tuning
+
+The same randomly filled 'resources' table is queried through a default engine over the table with
+no secondary indexes ('before'), through the shared engine's settings over the migrated table
+('after') and through the in-memory index rebuilt from it ('memory', lookups only).
+
+Beforehand, it checks that listings hold every 'peer x content' once after the latest registers are
+deleted (peers expiring) and others are registered, over a migrated table.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.database [--rows 1000000] [--queries 200]
+"""
+
+# built-in dependencies
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+
+# external dependencies
+import sqlalchemy
+
+# project dependencies
+from controllers.database.database import _DatabaseResourceTableController
+from controllers.database.index import _ResourceIndexController
+from database.engine import create_engine
+from database.table import (
+    LivenessTable,
+    ResourceTable,
+    create_table
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+INSERT_BATCH_SIZE = 50000
+
+
+def create_legacy_table(engine: sqlalchemy.engine.Engine) -> None:
+    """
+    Creates a 'resources' table as it was before indexes and AUTOINCREMENT were declared
+
+    :param engine: Database's engine
+    """
+
+    statement = str(sqlalchemy.schema.CreateTable(ResourceTable.__table__).compile(dialect=engine.dialect))
+    engine.execute(statement.replace(" AUTOINCREMENT", ""))
+
+
+def fill(url: str, rows: int, peers: int) -> tuple:
+    """
+    Creates a 'resources' table with no secondary indexes and fills it with random rows
+
+    :param url: Database's URL
+    :param rows: Number of rows
+    :param peers: Number of distinct peers
+    :return: Tuple (resource names, peer ids) present at the table
+    """
+
+    engine = sqlalchemy.create_engine(url)
+    table = ResourceTable.__table__
+
+    create_legacy_table(engine)
+    LivenessTable.__table__.create(engine)  # lookups join holders' loads
+
+    peer_ids = [str(uuid.uuid4()) for _ in range(peers)]
+    names = [f"resource_{i}.bin" for i in range(rows // 2)]  # about two holders per name
+
+    for start in range(0, rows, INSERT_BATCH_SIZE):
+        engine.execute(table.insert(), [
+            {
+                "peerId": random.choice(peer_ids),
+                "peerIp": "127.0.0.1",
+                "peerPort": 5000,
+                "resourceName": name,
+                "resourcePath": "files",
+                "resourceHash": f"{hash(name) & 0xffffffffffffffff:032x}",
+                "resourceSize": 1024,
+                "transferMode": "udp",
+            }
+            for name in (random.choice(names) for _ in range(min(INSERT_BATCH_SIZE, rows - start)))
+        ])
+
+    engine.dispose()
+
+    return names, peer_ids
+
+
+def run(db_access: _DatabaseResourceTableController, names: list, peer_ids: list) -> dict:
+    """
+    Times name lookups and peer drops
+
+    :return: Benchmark's results (milliseconds per operation)
+    """
+
+    start = time.perf_counter()
+    for name in names:
+        db_access.get_available_peer(name)
+    lookup = (time.perf_counter() - start) / len(names) * 1000
+
+    start = time.perf_counter()
+    for peer_id in peer_ids:
+        db_access.drop_peer(peer_id)
+    drop = (time.perf_counter() - start) / len(peer_ids) * 1000
+
+    return {"lookup_ms": lookup, "drop_ms": drop}
+
+
+def check_listing(url: str, rounds: int = 5, page_size: int = 2) -> None:
+    """
+    Checks that the in-memory index's and the database's listings hold every 'peer x content' once, in
+    the same order, after peers whose registers are the latest ones expire and other peers register
+
+    :param url: Database's URL (a table created as 'create_legacy_table' does is migrated first)
+    :param rounds: Rounds of registers and expirations
+    :param page_size: Registers per listed page
+    :raises AssertionError: When a register is listed twice or the listings differ
+    """
+
+    engine = create_engine(url)
+    create_legacy_table(engine)
+    create_table(engine)
+
+    db_access = _DatabaseResourceTableController(engine)
+    index = _ResourceIndexController(db_access)
+    index.rebuild()
+
+    for i in range(rounds):
+        peer_ids = [str(uuid.uuid4()) for _ in range(3)]
+
+        for peer_id in peer_ids:
+            index.register_resources([
+                {
+                    "peer_id": peer_id,
+                    "peer_ip": "127.0.0.1",
+                    "peer_port": 5000,
+                    "resource_name": f"x{j}.bin",
+                    "resource_path": "files",
+                    "resource_hash": f"{i:016x}{j:016x}",
+                    "resource_size": 1024,
+                }
+                for j in range(3)
+            ])
+
+        # the latest registers are deleted, so their ids would be reused without AUTOINCREMENT
+        index.drop_peers(peer_ids[1:])
+
+    listings = dict()
+
+    for name, source in (("memory", index), ("database", db_access)):
+        ids = list()
+        page = source.get_resources_page(after=0, limit=page_size)
+
+        while page:
+            ids.extend(resource_id for resource_id, _ in page)
+            page = source.get_resources_page(after=page[-1][0], limit=page_size)
+
+        assert len(ids) == len(set(ids)), f"{name} listing holds {len(ids) - len(set(ids))} repeated registers"
+        listings[name] = ids
+
+    assert listings["memory"] == listings["database"], "in-memory and database listings differ"
+    assert len(listings["memory"]) == rounds * 3, "listing misses registers"
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark registry queries before and after indexing")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--peers", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        check_listing(f"sqlite:///{os.path.join(directory, 'listing.sqlite3')}")
+        print("listing check: every register listed once after peers expire and others register")
+
+        before_file = os.path.join(directory, "before.sqlite3")
+        after_file = os.path.join(directory, "after.sqlite3")
+
+        print(f"filling {args.rows} rows ...")
+        all_names, all_peer_ids = fill(f"sqlite:///{before_file}", args.rows, args.peers)
+        shutil.copy(before_file, after_file)
+
+        query_names = random.sample(all_names, args.queries)
+        query_peer_ids = random.sample(all_peer_ids, min(args.queries, len(all_peer_ids)))
+
+        # before: default engine, no secondary indexes
+        before = run(
+            _DatabaseResourceTableController(sqlalchemy.create_engine(f"sqlite:///{before_file}")),
+            query_names,
+            query_peer_ids
+        )
+
+        # after: shared engine's settings, indexes added by migration
+        after_engine = create_engine(f"sqlite:///{after_file}")
+        start = time.perf_counter()
+        create_table(after_engine)
+        migration = time.perf_counter() - start
+
+        # in-memory index (lookups only, drops write through to the database)
+        index = _ResourceIndexController(_DatabaseResourceTableController(after_engine))
+        start = time.perf_counter()
+        index.rebuild()
+        rebuild = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query_name in query_names:
+            index.get_available_peer(query_name)
+        memory_lookup = (time.perf_counter() - start) / len(query_names) * 1000
+
+        after = run(_DatabaseResourceTableController(after_engine), query_names, query_peer_ids)
+
+        print(f"migration (index creation): {migration:.1f} s, in-memory index rebuild: {rebuild:.1f} s")
+        print(f"{'':>8} {'lookup ms':>10} {'drop ms':>10}")
+        print(f"{'before':>8} {before['lookup_ms']:>10.3f} {before['drop_ms']:>10.3f}")
+        print(f"{'after':>8} {after['lookup_ms']:>10.3f} {after['drop_ms']:>10.3f}")
+        print(f"{'memory':>8} {memory_lookup:>10.3f} {'-':>10}")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks central server's heartbeat intake over REST and over UDP
+
+The REST route is driven through flask's test client (handling cost only, no network), while the UDP
+listener receives datagrams blasted by sender processes over loopback. Both report beats per second
+and CPU microseconds per beat spent by the server.
+
+Beforehand, the monitor's deadline heap is stressed on its own: every peer beats, half of them beat
+again later, and expiring them must leave the heap and the deadline map empty.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.heartbeat [--peers 100000] [--senders 4] [--seconds 5] [--deadline-peers 50000]
+"""
+
+# built-in dependencies
+import argparse
+import json
+import multiprocessing
+import socket
+import time
+import uuid
+
+# external dependencies
+import flask
+import flask_restful
+
+# project dependencies
+from controllers.server.heartbeat import HeartBeatController
+from protocol import heartbeat
+from threads.server.heartbeat import ServerHeartBeatThread
+from threads.server.listen import ServerHeartBeatListenThread
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+PORT = 5901
+
+
+class _CountingMonitor(ServerHeartBeatThread):
+    """
+    Heartbeat monitor (never started, so no peer expires) that counts received beats
+    """
+
+    def __init__(self):
+        super(_CountingMonitor, self).__init__(timeout=3600)
+
+        self.received = 0
+
+    def beat(self, peer_id: str, load: tuple = None) -> None:
+        self.received += 1
+        super(_CountingMonitor, self).beat(peer_id, load)
+
+    def beat_many(self, beats: list) -> None:
+        self.received += len(beats)
+        super(_CountingMonitor, self).beat_many(beats)
+
+
+def deadlines(peers: int) -> dict:
+    """
+    Beats many peers, beats half of them again with a later deadline (over the UDP path, sequenced) and
+    expires first the other half and then every peer, straight at the monitor (no thread, no database)
+
+    :return: Microseconds per beat and per expired peer
+    :raises AssertionError: When the heap holds more than one entry per peer or is not emptied
+    """
+
+    monitor = _CountingMonitor()
+    monitor.timeout = 60
+    peer_ids = [str(uuid.uuid4()) for _ in range(peers)]
+    now = time.monotonic()
+
+    start = time.perf_counter()
+    for peer_id in peer_ids:
+        monitor.beat(peer_id)
+    beat = (time.perf_counter() - start) / peers * 1e6
+
+    # the beating half moves its deadlines forward, leaving stale entries at the heap
+    monitor.timeout = 120
+    monitor.beat_many([(peer_id, 0, None) for peer_id in peer_ids[::2]])
+    assert len(monitor.heap) == len(monitor.deadlines) == peers, "heap holds more than one entry per peer"
+
+    start = time.perf_counter()
+    first = monitor.expire(now + 90)
+    second = monitor.expire(now + 180)
+    expire = (time.perf_counter() - start) / peers * 1e6
+
+    assert sorted(first) == sorted(peer_ids[1::2]), "only the silent half should expire first"
+    assert sorted(second) == sorted(peer_ids[::2]), "every remaining peer should expire"
+    assert not monitor.heap and not monitor.deadlines and not monitor.sequences, "monitor is not empty"
+
+    return {"beat_us": beat, "expire_us": expire}
+
+
+def rest(peers: int, beats: int) -> dict:
+    """
+    Posts heartbeats to the REST route through flask's test client
+
+    :return: Beats per second and CPU microseconds per beat
+    """
+
+    monitor = _CountingMonitor()
+    HeartBeatController.monitor = monitor
+
+    app = flask.Flask(__name__)
+    flask_restful.Api(app).add_resource(HeartBeatController, "/heartbeat")
+    client = app.test_client()
+
+    bodies = [json.dumps({"peer_id": str(uuid.uuid4())}) for _ in range(min(peers, beats))]
+
+    start, cpu = time.perf_counter(), time.process_time()
+    for i in range(beats):
+        client.post("/heartbeat", data=bodies[i % len(bodies)], content_type="application/json")
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+
+    return {"beats_per_s": monitor.received / elapsed, "cpu_us_per_beat": cpu / monitor.received * 1e6}
+
+
+def send(peer_ids: list, seconds: float, sent: multiprocessing.Value) -> None:
+    """
+    Blasts sequenced beats of some peers to the UDP listener (sender process)
+    """
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.connect(("127.0.0.1", PORT))
+
+    count, sequence = 0, 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        datagrams = [heartbeat.pack(peer_id, sequence) for peer_id in peer_ids]
+        for datagram in datagrams:
+            try:
+                sock.send(datagram)
+                count += 1
+            except OSError:  # momentarily full socket buffer
+                pass
+        sequence += 1
+
+    with sent.get_lock():
+        sent.value += count
+
+
+def udp(peers: int, senders: int, seconds: float) -> dict:
+    """
+    Blasts beats from sender processes at the UDP listener
+
+    :return: Beats sent, beats received per second and listener's CPU microseconds per beat
+    """
+
+    monitor = _CountingMonitor()
+    listener = ServerHeartBeatListenThread(monitor, "127.0.0.1", PORT)
+    listener.start()
+
+    peer_ids = [str(uuid.uuid4()) for _ in range(peers)]
+    sent = multiprocessing.Value("q", 0)
+    processes = [
+        multiprocessing.Process(target=send, args=(peer_ids[i::senders], seconds, sent))
+        for i in range(senders)
+    ]
+
+    clock = time.pthread_getcpuclockid(listener.ident)
+    start, cpu = time.perf_counter(), time.clock_gettime(clock)
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    time.sleep(0.2)  # drain
+    elapsed, cpu = time.perf_counter() - start, time.clock_gettime(clock) - cpu
+
+    listener.stop()
+    listener.join()
+
+    return {
+        "sent": sent.value,
+        "received": monitor.received,
+        "monitored": len(monitor.deadlines),
+        "beats_per_s": monitor.received / elapsed,
+        "cpu_us_per_beat": cpu / max(monitor.received, 1) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark heartbeat intake over REST and UDP")
+    parser.add_argument("--peers", type=int, default=100000)
+    parser.add_argument("--senders", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rest-beats", type=int, default=20000)
+    parser.add_argument("--deadline-peers", type=int, default=50000)
+    args = parser.parse_args()
+
+    deadline_results = deadlines(args.deadline_peers)
+    print(f"deadline heap: {args.deadline_peers} peers beaten and expired, heap and deadlines empty "
+          f"({deadline_results['beat_us']:.2f} us/beat, {deadline_results['expire_us']:.2f} us/expired peer)")
+
+    rest_results = rest(args.peers, args.rest_beats)
+    udp_results = udp(args.peers, args.senders, args.seconds)
+
+    print(f"{'':>5} {'beats/s':>10} {'cpu us/beat':>12}")
+    print(f"{'rest':>5} {rest_results['beats_per_s']:>10.0f} {rest_results['cpu_us_per_beat']:>12.1f}")
+    print(f"{'udp':>5} {udp_results['beats_per_s']:>10.0f} {udp_results['cpu_us_per_beat']:>12.1f}")
+    print(f"udp: {udp_results['sent']} sent, {udp_results['received']} received, "
+          f"{udp_results['monitored']} peers monitored")
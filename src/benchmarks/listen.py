@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks a peer's listen thread serving concurrent downloaders
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.listen [--mode udp|tcp] [--size <bytes>] [--concurrency 1 10 100]
+"""
+
+# built-in dependencies
+import argparse
+import hashlib
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time
+
+# project dependencies
+from protocol import (
+    tcp,
+    udp
+)
+from protocol.base import TransferError
+from threads.peer.listen import PeerListenSocketThread
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+def download(mode: str, address: tuple, resource: str) -> str:
+    """
+    Downloads a whole resource, hashing it as it arrives
+
+    :param mode: Transfer mode ('udp' or 'tcp')
+    :param address: Seeder's listen address
+    :param resource: Resource identification at seeder's listen port
+    :return: MD5 hash over downloaded data
+    """
+
+    md5_hash = hashlib.md5()
+
+    if mode == "tcp":
+        for data in tcp.download(address=address, resource=resource):
+            md5_hash.update(data)
+
+    else:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind((address[0], 0))
+            for data in udp.download(sock=sock, address=address, resource=resource):
+                md5_hash.update(data)
+
+    return md5_hash.hexdigest()
+
+
+def run(mode: str, address: tuple, resource: str, expected_hash: str, concurrency: int) -> dict:
+    """
+    Runs 'concurrency' simultaneous downloads of the same resource
+
+    :return: Benchmark's results
+    """
+
+    results = queue.Queue()
+
+    def downloader() -> None:
+        try:
+            results.put(download(mode, address, resource) == expected_hash)
+        except (OSError, TransferError):
+            results.put(False)
+
+    threads = [threading.Thread(target=downloader) for _ in range(concurrency)]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    succeeded = sum(results.get() for _ in range(concurrency))
+
+    return {
+        "concurrency": concurrency,
+        "succeeded": succeeded,
+        "seconds": elapsed,
+        "throughput": succeeded * os.path.getsize(resource) / elapsed / 1024 / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark a peer serving concurrent downloaders")
+    parser.add_argument("--mode", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--size", type=int, default=8 * 1024 * 1024, help="resource's size in bytes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--max-transfers", type=int, default=None, help="defaults to the highest concurrency")
+    parser.add_argument("--port", type=int, default=45000)
+    args = parser.parse_args()
+
+    exceptions = queue.Queue()
+
+    with tempfile.TemporaryDirectory() as directory:
+        resource = os.path.join(directory, "resource.bin")
+        content = os.urandom(args.size)
+
+        with open(resource, "wb") as resource_file:
+            resource_file.write(content)
+
+        listen_thread = PeerListenSocketThread(
+            peer_ip="127.0.0.1",
+            listen_port=args.port,
+            exceptions=exceptions,
+            transfer_mode=args.mode,
+            max_transfers=args.max_transfers or max(args.concurrency)
+        )
+        listen_thread.start()
+
+        try:
+            print(f"mode: {args.mode}, resource: {args.size} bytes")
+            print(f"{'downloaders':>12} {'succeeded':>10} {'seconds':>9} {'MB/s':>9}")
+
+            for concurrency in args.concurrency:
+                result = run(
+                    mode=args.mode,
+                    address=("127.0.0.1", args.port),
+                    resource=resource,
+                    expected_hash=hashlib.md5(content).hexdigest(),
+                    concurrency=concurrency
+                )
+                print(f"{result['concurrency']:>12} {result['succeeded']:>10} "
+                      f"{result['seconds']:>9.2f} {result['throughput']:>9.1f}")
+
+        finally:
+            listen_thread.stop()
+            listen_thread.join()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks central server's capacity under a mix of requests from many virtual peers
+
+A fresh server (at a temporary directory, same arguments as 'server.py') is filled with the resources of
+every virtual peer. Client processes, each with a few keep-alive connections, then send requests
+back-to-back for a fixed time: every request picks a route by the configured mix and a virtual peer at
+random. Virtual peers beat (with their load), register new resources and look resources up.
+
+Reports throughput, errors and p50/p95/p99 latency per route, plus the server's resident memory and
+thread count over time (every server's process, read from '/proc', so Linux only). Results are written
+as JSON, to be compared across commits.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.load [--peers 5000] [--mix heartbeat=80 register=5 lookup=15] [--clients 4]
+                                [--connections 4] [--seconds 30] [--server-args="--workers 2"]
+                                [--output load.json] [--baseline previous.json]
+"""
+
+# built-in dependencies
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# external dependencies
+import requests
+
+# project dependencies
+from benchmarks.workers import (
+    SERVER,
+    wait_server
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+BASE_URL = "http://127.0.0.1:5000"
+ROUTES = ("heartbeat", "register", "lookup")
+DEFAULT_MIX = ["heartbeat=80", "register=5", "lookup=15"]
+HEADERS = {"content-type": "application/json"}
+
+
+def resource(peer_id: str, peer_port: int, name: str) -> dict:
+    """
+    :return: Registration of a resource held by a virtual peer
+    """
+
+    return {
+        "peer_id": peer_id,
+        "peer_ip": "127.0.0.1",
+        "peer_port": peer_port,
+        "resource_name": name,
+        "resource_path": "files",
+        "resource_hash": f"{hash(name) & 0xffffffffffffffff:032x}",
+        "resource_size": 1024,
+        "transfer_mode": "udp",
+    }
+
+
+def fill(peer_ids: list, resources: int) -> None:
+    """
+    Registers the initial resources of every virtual peer and beats once for each of them
+    """
+
+    registrations = [
+        resource(peer_id, 10000 + index, f"resource_{index}_{k}.bin")
+        for index, peer_id in enumerate(peer_ids)
+        for k in range(resources)
+    ]
+
+    with requests.Session() as session:
+        for start in range(0, len(registrations), 1000):
+            session.post(f"{BASE_URL}/resource", data=json.dumps(registrations[start:start + 1000]),
+                         headers=HEADERS).raise_for_status()
+
+        for peer_id in peer_ids:
+            session.post(f"{BASE_URL}/heartbeat", data=json.dumps({"peer_id": peer_id}),
+                         headers=HEADERS).raise_for_status()
+
+
+def connection(peer_ids: list, resources: int, mix: dict, deadline: float, seed: int, results: list) -> None:
+    """
+    Sends requests back-to-back over a keep-alive connection until the deadline (client thread)
+
+    :param results: List where (route, status code, seconds) of every request are appended
+    """
+
+    generator = random.Random(seed)
+    routes = list(mix)
+    weights = [mix[route] for route in routes]
+    registered = 0
+
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            route = generator.choices(routes, weights)[0]
+            index = generator.randrange(len(peer_ids))
+
+            if route == "heartbeat":
+                method, url = session.post, f"{BASE_URL}/heartbeat"
+                body = {
+                    "peer_id": peer_ids[index],
+                    "active_uploads": generator.randrange(4),
+                    "upload_rate": generator.randrange(1 << 20)
+                }
+
+            elif route == "register":
+                registered += 1
+                method, url = session.post, f"{BASE_URL}/resource"
+                body = resource(peer_ids[index], 10000 + index, f"extra_{seed}_{registered}.bin")
+
+            else:
+                method, url = session.get, f"{BASE_URL}/resource"
+                body = {"resource_name": f"resource_{index}_{generator.randrange(resources)}.bin"}
+
+            start = time.perf_counter()
+            try:
+                status = method(url, data=json.dumps(body), headers=HEADERS, timeout=30).status_code
+            except requests.exceptions.RequestException:
+                status = 0
+            results.append((route, status, time.perf_counter() - start))
+
+
+def client(peer_ids: list, resources: int, mix: dict, connections: int, seconds: float, seed: int,
+           output: multiprocessing.Queue) -> None:
+    """
+    Runs many connections at once (client process), handing their results over when they are done
+    """
+
+    results = list()
+    deadline = time.monotonic() + seconds
+    threads = [
+        threading.Thread(target=connection,
+                         args=(peer_ids, resources, mix, deadline, seed * connections + i, results))
+        for i in range(connections)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    output.put(results)
+
+
+def processes(pid: int) -> list:
+    """
+    :return: A process' id and its descendants' ones
+    """
+
+    pids = [pid]
+
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as children:
+                for child in children.read().split():
+                    pids.extend(processes(int(child)))
+        except OSError:
+            pass
+
+    return pids
+
+
+def sample(pid: int) -> dict:
+    """
+    :return: Resident memory (bytes) and threads of a process and its descendants
+    """
+
+    rss = threads = 0
+
+    for process in processes(pid):
+        try:
+            with open(f"/proc/{process}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1]) * 1024
+                    elif line.startswith("Threads:"):
+                        threads += int(line.split()[1])
+        except OSError:  # process exited meanwhile
+            pass
+
+    return {"rss_bytes": rss, "threads": threads}
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    """
+    :return: Value at a fraction of an ordered list (nearest rank)
+    """
+
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(results: list, seconds: float) -> dict:
+    """
+    :return: Route -> requests, errors, throughput and latency percentiles (milliseconds)
+    """
+
+    summary = dict()
+
+    for route in ROUTES:
+        latencies = sorted(elapsed for name, _, elapsed in results if name == route)
+        statuses = [status for name, status, _ in results if name == route]
+
+        if not latencies:
+            continue
+
+        summary[route] = {
+            "requests": len(latencies),
+            "errors": sum(1 for status in statuses if not 200 <= status < 300),
+            "throughput": len(latencies) / seconds,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+
+    return summary
+
+
+def revision() -> str:
+    """
+    :return: Current commit's hash, when running inside a git repository
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(SERVER), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(server_args: list, peers: int, resources: int, mix: dict, clients: int, connections: int,
+        seconds: float, interval: float) -> dict:
+    """
+    Starts a server (fresh database), fills it with virtual peers and loads it
+
+    :return: Benchmark's results
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([sys.executable, SERVER] + server_args, cwd=directory,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_server()
+
+            peer_ids = [str(uuid.uuid4()) for _ in range(peers)]
+            fill(peer_ids, resources)
+
+            output = multiprocessing.Queue()
+            workers = [
+                multiprocessing.Process(target=client,
+                                        args=(peer_ids, resources, mix, connections, seconds, seed, output))
+                for seed in range(clients)
+            ]
+
+            samples = list()
+            start = time.monotonic()
+            for worker in workers:
+                worker.start()
+
+            while any(worker.is_alive() for worker in workers) and time.monotonic() < start + seconds:
+                samples.append(dict(second=round(time.monotonic() - start, 1), **sample(server.pid)))
+                time.sleep(interval)
+
+            # results must be drained before joining, or workers block on a full pipe
+            results = [result for _ in workers for result in output.get()]
+            for worker in workers:
+                worker.join()
+
+            return {
+                "revision": revision(),
+                "config": {
+                    "server_args": server_args,
+                    "peers": peers,
+                    "resources": resources,
+                    "mix": mix,
+                    "clients": clients,
+                    "connections": connections,
+                    "seconds": seconds,
+                    "cpus": os.cpu_count(),
+                },
+                "routes": summarize(results, seconds),
+                "server": samples,
+            }
+
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark central server's capacity under many virtual peers")
+    parser.add_argument("--peers", type=int, default=5000)
+    parser.add_argument("--resources", type=int, default=2, help="initial resources per virtual peer")
+    parser.add_argument("--mix", nargs="+", default=DEFAULT_MIX, help=f"<route>=<weight>, routes: {ROUTES}")
+    parser.add_argument("--clients", type=int, default=4, help="client processes")
+    parser.add_argument("--connections", type=int, default=4, help="keep-alive connections per client")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=1, help="seconds between server's samples")
+    parser.add_argument("--server-args", default="", help="arguments for 'server.py', e.g. '--workers 2'")
+    parser.add_argument("--output", default="load.json")
+    parser.add_argument("--baseline", help="results of a previous run, to print the changes against")
+    args = parser.parse_args()
+
+    mix = {route: float(weight) for route, weight in (entry.split("=", 1) for entry in args.mix)}
+    if set(mix) - set(ROUTES):
+        parser.error(f"unknown routes at mix: {sorted(set(mix) - set(ROUTES))}")
+
+    report = run(shlex.split(args.server_args), args.peers, args.resources, mix, args.clients, args.connections,
+                 args.seconds, args.interval)
+
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    print(f"{args.peers} virtual peers, {args.clients * args.connections} connections, {args.seconds:g}s, "
+          f"server: '{args.server_args}'")
+    print(f"{'route':>10} {'requests/s':>11} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route, stats in report["routes"].items():
+        print(f"{route:>10} {stats['throughput']:>11.0f} {stats['errors']:>7} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+        print(f"against {args.baseline} ({baseline['revision'][:10] or 'unknown revision'}):")
+        for route, stats in report["routes"].items():
+            before = baseline["routes"].get(route)
+            if before:
+                changes = [stats[key] / before[key] - 1 for key in ("throughput", "p50_ms", "p95_ms", "p99_ms")]
+                print(f"{route:>10} {changes[0]:>+11.1%} {'':>7} {changes[1]:>+8.1%} {changes[2]:>+8.1%} "
+                      f"{changes[3]:>+8.1%}")
+
+    if report["server"]:
+        print(f"server: peak {max(entry['rss_bytes'] for entry in report['server']) / 2 ** 20:.0f} MiB, "
+              f"peak {max(entry['threads'] for entry in report['server'])} threads")
+    print(f"written to {args.output}")
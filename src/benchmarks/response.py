@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks the encode/decode cost of central server's responses per request
+
+Compares the former double JSON encoding ('data' dumped to a string, then the whole response dumped
+again, and the reverse at the peer) with a single JSON encoding and with MessagePack, for a lookup
+answered by many holders and for a page of the listing.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.response [--holders 100] [--page 1000] [--repeat 2000]
+"""
+
+# built-in dependencies
+import argparse
+import json
+import time
+import typing
+
+# external dependencies
+import flask
+import msgpack
+import requests
+from flask_restful.representations.json import output_json
+
+# project dependencies
+from controllers.peer.peer_rest import PeerRESTController
+from controllers.server.utils import response
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+def resource(i: int) -> dict:
+    """
+    :return: A resource's info, as sent by central server
+    """
+
+    return {
+        "peer_ip": "192.168.0.10",
+        "peer_port": 5000 + i,
+        "resource_path": "downloads",
+        "resource_name": f"resource_{i}.bin",
+        "resource_hash": f"{i:032x}",
+        "resource_size": 1024 * 1024 * i,
+        "transfer_mode": "udp",
+    }
+
+
+def as_response(body: bytes, mimetype: str) -> requests.Response:
+    """
+    :return: Response as received by the peer
+    """
+
+    received = requests.Response()
+    received._content = body
+    received.headers["content-type"] = mimetype
+
+    return received
+
+
+def double_json(data: typing.Any) -> typing.Any:
+    """
+    Former pipeline: 'data' dumped by the handler, whole response dumped again by flask_restful
+    """
+
+    body, code = response.ok(data=json.dumps(data))
+    sent = output_json(body, code).get_data()
+
+    return json.loads(PeerRESTController.content(as_response(sent, "application/json")).get("data"))
+
+
+def single_json(data: typing.Any) -> typing.Any:
+    body, code = response.ok(data=data)
+    sent = output_json(body, code).get_data()
+
+    return PeerRESTController.content(as_response(sent, "application/json")).get("data")
+
+
+def single_msgpack(data: typing.Any) -> typing.Any:
+    body, code = response.ok(data=data)
+    sent = response.output_msgpack(body, code).get_data()
+
+    return PeerRESTController.content(as_response(sent, response.MSGPACK_MIMETYPE)).get("data")
+
+
+def measure(pipeline: typing.Callable, data: typing.Any, repeat: int) -> float:
+    """
+    :return: Microseconds per request (encode at the server and decode at the peer)
+    """
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        pipeline(data)
+
+    return (time.perf_counter() - start) / repeat * 1000000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark response encode/decode cost")
+    parser.add_argument("--holders", type=int, default=100, help="holders answering a lookup")
+    parser.add_argument("--page", type=int, default=1000, help="resources at a listing page")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    payloads = {
+        "lookup": [resource(i) for i in range(args.holders)],
+        "page": {"resources": [resource(i) for i in range(args.page)], "next": args.page},
+    }
+
+    app = flask.Flask(__name__)
+
+    with app.app_context():
+        # results are only meaningful with msgpack's C extension (pure python fallback is much slower)
+        print(f"msgpack implementation: {msgpack.Packer.__module__}")
+        print(f"{'payload':>8} {'pipeline':>12} {'us/request':>11} {'bytes':>9}")
+
+        for name, payload in payloads.items():
+            for pipeline, size in (
+                (double_json, len(output_json(response.ok(data=json.dumps(payload))[0], 200).get_data())),
+                (single_json, len(output_json(response.ok(data=payload)[0], 200).get_data())),
+                (single_msgpack, len(msgpack.packb(response.ok(data=payload)[0], use_bin_type=True))),
+            ):
+                assert pipeline(payload) == payload
+                repeat = max(1, args.repeat * 100 // max(args.holders, args.page)) if name == "page" else args.repeat
+                print(f"{name:>8} {pipeline.__name__:>12} {measure(pipeline, payload, repeat):>11.1f} {size:>9}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks resources' names search over the trigram index
+
+Synthetic names ("<word>_<word>_<number>.<extension>", words being a few common ones and many random
+ones) are indexed, then exact, prefix, substring, typo, broad and missing queries are timed (milliseconds
+per query, best of a few rounds), along with the index's build time and the resident memory it takes.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.search [--names 1000000] [--vocabulary 10000] [--rounds 5]
+"""
+
+# built-in dependencies
+import argparse
+import random
+import resource
+import string
+import time
+
+# project dependencies
+from controllers.database.trigram import TrigramIndexController
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+WORDS = [
+    "holiday", "report", "backup", "music", "movie", "lecture", "dataset", "invoice", "thesis", "photo",
+    "album", "episode", "season", "draft", "final", "scan", "manual", "archive", "notes", "slides",
+    "project", "budget", "summer", "winter", "family", "trip", "concert", "podcast", "recipe", "game",
+]
+EXTENSIONS = ["txt", "pdf", "mp3", "mp4", "zip", "png", "jpg", "csv", "iso", "tar"]
+
+QUERIES = {
+    "exact": "holiday_report_123456.pdf",
+    "prefix": "holiday_rep",
+    "substring": "report_12345",
+    "typo": "holdiay_reprot_123456",
+    "broad": "music",
+    "missing": "qwxz",
+}
+
+
+def names(count: int, vocabulary: int, seed: int = 0) -> list:
+    """
+    :return: Distinct synthetic names
+    """
+
+    generator = random.Random(seed)
+    words = WORDS + [
+        "".join(generator.choices(string.ascii_lowercase, k=generator.randint(4, 9)))
+        for _ in range(vocabulary)
+    ]
+
+    return [
+        f"{generator.choice(words)}_{generator.choice(words)}_{i}.{generator.choice(EXTENSIONS)}"
+        for i in range(count)
+    ] + [QUERIES["exact"]]
+
+
+def rss() -> int:
+    """
+    :return: Peak resident memory, in bytes
+    """
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resources' names search")
+    parser.add_argument("--names", type=int, default=1000000)
+    parser.add_argument("--vocabulary", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    generated = names(args.names, args.vocabulary)
+    before = rss()
+
+    index = TrigramIndexController()
+    start = time.perf_counter()
+    for name in generated:
+        index.add(name)
+    built = time.perf_counter() - start
+
+    print(f"{len(index)} names indexed in {built:.1f}s, "
+          f"{(rss() - before) / 2 ** 20:.0f} MiB, {len(index.postings)} trigrams")
+    print(f"{'query':>10} {'text':>24} {'ms':>8} {'results':>8}  best")
+
+    for kind, query in QUERIES.items():
+        timings = list()
+
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            results = index.search(query, args.limit)
+            timings.append(time.perf_counter() - start)
+
+        best = f"{results[0][0]} (tier {results[0][1]})" if results else "-"
+        print(f"{kind:>10} {query:>24} {min(timings) * 1000:>8.2f} {len(results):>8}  {best}")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks holders' ranking strategies by simulating a swarm of seeders
+
+Downloads of the same content arrive at random (Poisson) and each one is served by the first holder
+answered by the ranking strategy. A seeder splits its upload bandwidth among its transfers, and the
+load it reports (transfers in progress, recent upload rate) is only refreshed at every heartbeat, as in
+a real swarm. Reports the mean and 95th percentile download time (downloads unfinished at the end count
+for the time taken so far) and the most transfers a single seeder served at once.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.selection [--seeders 20] [--load 0.75] [--interval 5] [--seconds 600]
+"""
+
+# built-in dependencies
+import argparse
+import random
+import statistics
+
+# project dependencies
+from controllers.database.selection import STRATEGIES
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+STEP = 0.05  # seconds
+BANDWIDTH = 10 * 1024 * 1024  # bytes per second, per seeder
+SIZE = 50 * 1024 * 1024  # bytes per download
+RATE_WINDOW = 30  # seconds averaged into the reported upload rate, as peers do
+
+
+def simulate(strategy: str, seeders: int, load: float, interval: float, seconds: float, seed: int = 0) -> dict:
+    """
+    :param strategy: Ranking strategy's name
+    :param seeders: Number of seeders holding the content
+    :param load: Offered load, as a fraction of the swarm's whole upload bandwidth
+    :param interval: Seconds between two heartbeats (load reports) of a seeder
+    :param seconds: Simulated time
+    :return: Download times' mean and 95th percentile, and most concurrent transfers of a seeder
+    """
+
+    generator = random.Random(seed)
+    random.seed(seed)  # strategies sample from the module's generator
+    rank = STRATEGIES[strategy]
+
+    arrival_rate = load * seeders * BANDWIDTH / SIZE
+    transfers = [list() for _ in range(seeders)]  # [remaining bytes, start time] per transfer
+    served = [list() for _ in range(seeders)]  # (time, bytes) served in the last 'RATE_WINDOW' seconds
+    reported = [None] * seeders  # load as last seen by central server
+    next_beat = [generator.uniform(0, interval) for _ in range(seeders)]
+
+    durations = list()
+    most_transfers = 0
+    next_arrival = generator.expovariate(arrival_rate)
+    now = 0.0
+
+    while now < seconds:
+        # heartbeats
+        for seeder in range(seeders):
+            if now >= next_beat[seeder]:
+                served[seeder] = [(at, sent) for at, sent in served[seeder] if at > now - RATE_WINDOW]
+                rate = int(sum(sent for _, sent in served[seeder]) / RATE_WINDOW)
+                reported[seeder] = (len(transfers[seeder]), rate)
+                next_beat[seeder] += interval
+
+        # arrivals, each served by the best ranked holder
+        while next_arrival <= now:
+            chosen = rank([((seeder,), reported[seeder]) for seeder in range(seeders)])[0][0]
+            transfers[chosen].append([SIZE, now])
+            most_transfers = max(most_transfers, len(transfers[chosen]))
+            next_arrival += generator.expovariate(arrival_rate)
+
+        # transfers share their seeder's bandwidth
+        for seeder in range(seeders):
+            if not transfers[seeder]:
+                continue
+
+            share = BANDWIDTH * STEP / len(transfers[seeder])
+            ongoing = list()
+
+            served[seeder].append((now, BANDWIDTH * STEP))
+
+            for transfer in transfers[seeder]:
+                transfer[0] -= share
+
+                if transfer[0] <= 0:
+                    durations.append(now + STEP - transfer[1])
+                else:
+                    ongoing.append(transfer)
+
+            transfers[seeder] = ongoing
+
+        now += STEP
+
+    # downloads still in progress count for at least as long as they have taken so far
+    durations.extend(now - start for ongoing in transfers for _, start in ongoing)
+    durations.sort()
+
+    return {
+        "mean": statistics.mean(durations),
+        "p95": durations[int(0.95 * (len(durations) - 1))],
+        "most_transfers": most_transfers,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark holders' ranking strategies over a simulated swarm")
+    parser.add_argument("--seeders", type=int, default=20)
+    parser.add_argument("--load", type=float, default=0.75)
+    parser.add_argument("--interval", type=float, default=5)
+    parser.add_argument("--seconds", type=float, default=600)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES))
+    args = parser.parse_args()
+
+    print(f"{args.seeders} seeders, {args.load:.0%} of their bandwidth requested, loads reported every "
+          f"{args.interval:g}s, downloads alone take {SIZE / BANDWIDTH:g}s")
+    print(f"{'strategy':>13} {'mean (s)':>9} {'p95 (s)':>8} {'max transfers':>14}")
+
+    for name in args.strategies:
+        result = simulate(name, args.seeders, args.load, args.interval, args.seconds)
+        print(f"{name:>13} {result['mean']:>9.1f} {result['p95']:>8.1f} {result['most_transfers']:>14}")
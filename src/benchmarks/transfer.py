@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks the peers' data path end to end, by transfer mode and resource's size
+
+A central server (fresh database, at a temporary directory) and seeders (each one a peer whose
+PeerListenSocketThread serves in the given transfer mode) run at loopback, the seeders holding a
+random resource of every size. Downloaders then run at once, each one a PeerController at its own
+process (and directory), downloading the resource as a user would: lookup, piece hashes, transfer from
+every seeder and hash check.
+
+Each download reports MB/s, CPU seconds and peak memory of its process, time to first byte (lookup plus
+the first chunk of a ranged request to the best ranked seeder) and whether the hash check passed. With
+'--baseline', it is a regression gate: it exits with an error when any hash check fails or any case's
+throughput drops below the baseline's by more than '--tolerance'.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.transfer [--modes udp tcp] [--sizes 1K 1M 64M 1G] [--seeders 1] [--downloaders 1]
+                                    [--output transfer.json] [--baseline previous.json] [--tolerance 0.25]
+"""
+
+# built-in dependencies
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+# project dependencies
+from benchmarks.load import revision
+from benchmarks.workers import (
+    SERVER,
+    wait_server
+)
+from controllers.peer.peer import PeerController
+from protocol import (
+    tcp,
+    udp
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+HOST = "127.0.0.1"
+SEEDER_PORT = 46000  # action and listen ports of seeders, two per seeder
+DOWNLOADER_PORT = 47000  # action and listen ports of downloaders, two per downloader
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+BLOCK_SIZE = 1024 * 1024
+
+
+def parse_size(size: str) -> int:
+    """
+    :param size: Size in bytes, optionally suffixed by 'K', 'M' or 'G' (e.g. '64M')
+    :return: Size in bytes
+    """
+
+    unit = UNITS.get(size[-1:].upper(), 1)
+    return int(size[:-1] if unit > 1 else size) * unit
+
+
+def generate(path: str, size: int) -> None:
+    """
+    Writes a random resource, block by block
+    """
+
+    with open(path, "wb") as resource_file:
+        written = 0
+        while written < size:
+            block = os.urandom(min(BLOCK_SIZE, size - written))
+            resource_file.write(block)
+            written += len(block)
+
+
+def md5(path: str) -> str:
+    """
+    :return: MD5 hash over a file's content
+    """
+
+    md5_hash = hashlib.md5()
+
+    with open(path, "rb") as resource_file:
+        for block in iter(lambda: resource_file.read(BLOCK_SIZE), b""):
+            md5_hash.update(block)
+
+    return md5_hash.hexdigest()
+
+
+def first_byte(peer: PeerController, resource_name: str) -> float:
+    """
+    Looks a resource up and requests the first chunk of it from the best ranked holder
+
+    :return: Seconds until the first byte arrived
+    """
+
+    start = time.perf_counter()
+
+    holders = peer.rest_controller.content(
+        peer.rest_controller.call_server_get_resource(resource_name=resource_name, server_ip=HOST)
+    ).get("data")
+
+    address = (holders[0].get("peer_ip"), holders[0].get("peer_port"))
+    seeded = f"{holders[0].get('resource_path')}/{holders[0].get('resource_name')}"
+    arrived = None
+
+    # a ranged request is drained to its end, so the seeder is not left serving an abandoned transfer
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((HOST, 0))
+
+        if holders[0].get("transfer_mode") == "tcp":
+            transfer = tcp.download(address=address, resource=seeded, length=udp.DEFAULT_CHUNK_SIZE)
+        else:
+            transfer = udp.download(sock=sock, address=address, resource=seeded, length=udp.DEFAULT_CHUNK_SIZE)
+
+        for _ in transfer:
+            arrived = arrived or time.perf_counter()
+
+    return (arrived or time.perf_counter()) - start
+
+
+def downloader(index: int, resource_name: str, size: int, expected_hash: str, start: multiprocessing.Event,
+               output: multiprocessing.Queue) -> None:
+    """
+    Downloads a resource through a PeerController at a fresh directory (downloader process)
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        peer = PeerController(
+            peer_ip=HOST,
+            server_ip=HOST,
+            action_port=DOWNLOADER_PORT + 2 * index,
+            listen_port=DOWNLOADER_PORT + 2 * index + 1,
+            seed_downloads=False  # downloaders quit right after, so they are not registered as holders
+        )
+
+        ttfb = first_byte(peer, resource_name)
+        peer.lookup_cache.invalidate(resource_name)
+
+        start.wait()
+
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        began = time.perf_counter()
+        message = peer.download(resource_name)
+        elapsed = time.perf_counter() - began
+        finished = resource.getrusage(resource.RUSAGE_SELF)
+
+        downloaded = os.path.join("downloads", HOST, resource_name)
+        hash_ok = "downloaded at path" in message and os.path.exists(downloaded) and md5(downloaded) == expected_hash
+
+        output.put({
+            "downloader": index,
+            "seconds": elapsed,
+            "mb_s": size / elapsed / 1024 / 1024,
+            "cpu_seconds": finished.ru_utime + finished.ru_stime - usage.ru_utime - usage.ru_stime,
+            "peak_memory_mb": finished.ru_maxrss / 1024,
+            "ttfb_ms": ttfb * 1000,
+            "hash_ok": hash_ok,
+            "message": message,
+        })
+
+        peer.socket.close()
+        peer.listen_thread.socket.close()
+
+
+def run(mode: str, sizes: list, seeders: int, downloaders: int, directory: str) -> list:
+    """
+    Starts seeders of a transfer mode holding a resource of every size, and downloads each resource
+
+    :return: One result per downloaded resource and downloader
+    """
+
+    context = multiprocessing.get_context("spawn")  # fresh processes, so their peak memory is their own
+    peers = list()
+    results = list()
+
+    try:
+        for i in range(seeders):
+            peer = PeerController(
+                peer_ip=HOST,
+                server_ip=HOST,
+                action_port=SEEDER_PORT + 2 * i,
+                listen_port=SEEDER_PORT + 2 * i + 1,
+                transfer_mode=mode,
+                max_transfers=max(16, downloaders)
+            )
+            peer.heartbeat_thread.start()
+            peer.listen_thread.start()
+            peers.append(peer)
+
+        for size in sizes:
+            resource_name = f"{mode}_{size}.bin"
+            path = os.path.join(directory, resource_name)
+            generate(path, size)
+
+            for peer in peers:
+                peer.upload(path)
+
+            expected_hash = md5(path)
+            start = context.Event()
+            output = context.Queue()
+            processes = [
+                context.Process(target=downloader, args=(i, resource_name, size, expected_hash, start, output))
+                for i in range(downloaders)
+            ]
+
+            for process in processes:
+                process.start()
+            start.set()
+
+            for _ in processes:
+                results.append(dict(mode=mode, size=size, seeders=seeders, downloaders=downloaders, **output.get()))
+            for process in processes:
+                process.join()
+
+            os.remove(path)
+
+    finally:
+        for peer in peers:
+            peer.heartbeat_thread.stop()
+            peer.listen_thread.stop()
+            peer.heartbeat_thread.join()
+            peer.listen_thread.join()
+            peer.listen_thread.socket.close()
+            peer.socket.close()
+
+    return results
+
+
+def regressions(results: list, baseline: dict, tolerance: float) -> list:
+    """
+    Compares cases (mode, size, seeders and downloaders) run by both the baseline and this run
+
+    :return: Failed hash checks and throughputs below the baseline's by more than the tolerance
+    """
+
+    failures = [f"{result['mode']} {result['size']} bytes: {result['message']}"
+                for result in results if not result["hash_ok"]]
+
+    def case(result: dict) -> tuple:
+        return result["mode"], result["size"], result["seeders"], result["downloaders"], result["downloader"]
+
+    before = {case(result): result["mb_s"] for result in baseline["results"]}
+
+    for result in results:
+        previous = before.get(case(result))
+
+        if previous and result["mb_s"] < previous * (1 - tolerance):
+            failures.append(f"{result['mode']} {result['size']} bytes: {result['mb_s']:.1f} MB/s, "
+                            f"baseline {previous:.1f} MB/s")
+
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the peers' data path end to end")
+    parser.add_argument("--modes", nargs="+", choices=["udp", "tcp"], default=["udp", "tcp"])
+    parser.add_argument("--sizes", nargs="+", default=["1K", "1M", "64M"], help="e.g. 1K 1M 64M 4G")
+    parser.add_argument("--seeders", type=int, default=1)
+    parser.add_argument("--downloaders", type=int, default=1, help="downloading at once")
+    parser.add_argument("--output", default="transfer.json")
+    parser.add_argument("--baseline", help="results of a previous run, failing on regressions against it")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="throughput drop tolerated by the gate")
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes]
+    output_path = os.path.abspath(args.output)  # benchmark runs at a temporary directory
+    results = list()
+
+    with tempfile.TemporaryDirectory() as server_directory, tempfile.TemporaryDirectory() as files_directory:
+        server = subprocess.Popen([sys.executable, SERVER], cwd=server_directory,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_server()
+
+            # seeders' hash cache and partial downloads live at the current directory
+            os.chdir(files_directory)
+
+            for mode in args.modes:
+                results.extend(run(mode, sizes, args.seeders, args.downloaders, files_directory))
+
+        finally:
+            server.terminate()
+            server.wait()
+
+    with open(output_path, "w") as output_file:
+        json.dump({"revision": revision(), "config": vars(args), "results": results}, output_file, indent=2)
+
+    print(f"{args.seeders} seeder(s), {args.downloaders} downloader(s) at once")
+    print(f"{'mode':>5} {'bytes':>12} {'MB/s':>8} {'cpu s':>7} {'peak MB':>8} {'ttfb ms':>8}  hash")
+    for result in results:
+        print(f"{result['mode']:>5} {result['size']:>12} {result['mb_s']:>8.1f} {result['cpu_seconds']:>7.2f} "
+              f"{result['peak_memory_mb']:>8.0f} {result['ttfb_ms']:>8.1f}  {'ok' if result['hash_ok'] else 'FAILED'}")
+    print(f"written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            failures = regressions(results, json.load(baseline_file), args.tolerance)
+
+        for failure in failures:
+            print(f"regression: {failure}")
+
+        sys.exit(1 if failures else 0)
+
+    sys.exit(0 if all(result["hash_ok"] for result in results) else 1)
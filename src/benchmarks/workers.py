@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that benchmarks central server's requests per second by serving mode and number of worker processes
+
+Each mode serves a fresh database (at a temporary directory) filled with the same resources, while client
+processes look resources up by name over keep-alive connections for a fixed time. The development server
+('dev') answers from its in-memory index, worker processes ('workers=N') from the shared database.
+
+Usage (at CentralizedP2P/src/):
+
+    $ python -m benchmarks.workers [--workers 1 2 4] [--clients 8] [--seconds 10]
+"""
+
+# built-in dependencies
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+# external dependencies
+import requests
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server.py")
+URL = "http://127.0.0.1:5000/resource"
+
+
+def wait_server(timeout: float = 30) -> None:
+    """
+    Waits until the server answers
+    """
+
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            requests.get(URL, params={"limit": 1}, timeout=1)
+            return
+        except requests.exceptions.ConnectionError:
+            time.sleep(0.2)
+
+    raise TimeoutError("server did not start")
+
+
+def fill(resources: int) -> list:
+    """
+    Registers resources of a single peer
+
+    :return: Registered resources' names
+    """
+
+    peer_id = str(uuid.uuid4())
+    names = [f"resource_{i}.bin" for i in range(resources)]
+
+    for start in range(0, resources, 1000):
+        requests.post(URL, data=json.dumps([
+            {
+                "peer_id": peer_id,
+                "peer_ip": "127.0.0.1",
+                "peer_port": 5000,
+                "resource_name": name,
+                "resource_path": "files",
+                "resource_hash": f"{hash(name) & 0xffffffffffffffff:032x}",
+                "resource_size": 1024,
+                "transfer_mode": "udp",
+            }
+            for name in names[start:start + 1000]
+        ]), headers={"content-type": "application/json"}).raise_for_status()
+
+    return names
+
+
+def client(names: list, seconds: float, done: multiprocessing.Value) -> None:
+    """
+    Looks resources up over a keep-alive connection (client process)
+    """
+
+    session = requests.Session()
+    headers = {"content-type": "application/json", "accept": "application/msgpack"}
+    count = 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        session.get(URL, data=json.dumps({"resource_name": names[count % len(names)]}), headers=headers)
+        count += 1
+
+    with done.get_lock():
+        done.value += count
+
+
+def run(arguments: list, names_count: int, clients: int, seconds: float) -> float:
+    """
+    Starts a server (fresh database), fills it and loads it
+
+    :param arguments: Server's arguments
+    :return: Requests per second
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([sys.executable, SERVER] + arguments, cwd=directory,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_server()
+            names = fill(names_count)
+
+            done = multiprocessing.Value("q", 0)
+            processes = [multiprocessing.Process(target=client, args=(names, seconds, done)) for _ in range(clients)]
+
+            start = time.perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            return done.value / (time.perf_counter() - start)
+
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark central server's requests per second by workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--resources", type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cpu(s), {args.clients} client processes, {args.resources} resources")
+    print(f"{'mode':>10} {'requests/s':>11}")
+
+    print(f"{'dev':>10} {run([], args.resources, args.clients, args.seconds):>11.0f}")
+
+    for workers in args.workers:
+        rate = run(["--workers", str(workers)], args.resources, args.clients, args.seconds)
+        print(f"{f'workers={workers}':>10} {rate:>11.0f}")
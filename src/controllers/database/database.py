@@ -11,27 +11,91 @@ import typing
 
 # external dependencies
 import sqlalchemy
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 # project dependencies
-from database.table import ResourceTable
+from controllers.database.selection import (
+    Strategy,
+    two_choices
+)
+from controllers.server.utils.metrics import timed
+from database.engine import get_engine
+from database.table import (
+    LivenessTable,
+    ResourceMetadataTable,
+    ResourceTable
+)
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "24/10/2020"
 
+_resources = ResourceTable.__table__
+_earlier = _resources.alias("earlier")
+_liveness = LivenessTable.__table__
+_metadata = ResourceMetadataTable.__table__
+_record_columns = [
+    _resources.c.peerIp,
+    _resources.c.peerPort,
+    _resources.c.resourcePath,
+    _resources.c.resourceName,
+    _resources.c.resourceHash,
+    _resources.c.resourceSize,
+    _resources.c.transferMode
+]
+
+# one register per peer holding the content of the first register with such name, with its latest load
+AVAILABLE_PEERS_QUERY = sqlalchemy\
+    .select(_record_columns + [_liveness.c.activeUploads, _liveness.c.uploadRate])\
+    .select_from(_resources.outerjoin(_liveness, _liveness.c.peerId == _resources.c.peerId))\
+    .where(_resources.c.resourceHash == sqlalchemy
+           .select([_earlier.c.resourceHash])
+           .where(_earlier.c.resourceName == sqlalchemy.bindparam("resource_name"))
+           .limit(1)
+           .as_scalar())\
+    .group_by(_resources.c.peerId)
+
+# keyset page of the first register of each 'peer x content'
+RESOURCES_PAGE_QUERY = sqlalchemy\
+    .select([_resources.c.id] + _record_columns)\
+    .where(_resources.c.id > sqlalchemy.bindparam("after"))\
+    .where(~sqlalchemy.exists()
+           .where(_earlier.c.peerId == _resources.c.peerId)
+           .where(_earlier.c.resourceHash == _resources.c.resourceHash)
+           .where(_earlier.c.id < _resources.c.id))\
+    .order_by(_resources.c.id)\
+    .limit(sqlalchemy.bindparam("limit"))
+
+# names containing a pattern (one row per name, with its first register's content), exact and prefix
+# matches first (SQLite's LIKE is case insensitive)
+SEARCH_QUERY = sqlalchemy.text(
+    "SELECT resourceName, resourceHash, resourceSize, COUNT(DISTINCT peerId), MIN(id), "
+    "CASE WHEN resourceName LIKE :exact ESCAPE '\\' THEN 0 WHEN resourceName LIKE :prefix ESCAPE '\\' THEN 1 "
+    "ELSE 2 END AS tier "
+    "FROM resources WHERE resourceName LIKE :substring ESCAPE '\\' GROUP BY resourceName "
+    "ORDER BY tier, LENGTH(resourceName), resourceName LIMIT :limit OFFSET :offset"
+)
+SEARCH_MATCHES = ("exact", "prefix", "substring")
+
 
 class _DatabaseResourceTableController:
     """
     Controller for resource table access
     """
 
-    def __init__(self):
+    def __init__(self, engine: typing.Optional[Engine] = None):
+        """
+        :param engine: Database's engine (defaults to central server's shared engine)
+        """
+
         # sqlalchemy
-        self.engine = sqlalchemy.create_engine("sqlite:///db.sqlite3")
+        self.engine = engine or get_engine()
         self.session = sessionmaker(bind=self.engine)
 
+    @timed("resources")
     def register_peer(self, peer_id: str, peer_ip: str, peer_port: int,
-                      resource_name: str, resource_path: str, resource_hash: str) -> None:
+                      resource_name: str, resource_path: str, resource_hash: str,
+                      resource_size: typing.Optional[int] = None, transfer_mode: str = "udp") -> int:
         """
         Register 'peer x resource' relationship at database
 
@@ -41,6 +105,9 @@ class _DatabaseResourceTableController:
         :param resource_name: Resource's name
         :param resource_path: Resource's path
         :param resource_hash: Resource's MD5
+        :param resource_size: Resource's size in bytes
+        :param transfer_mode: Peer's transfer mode ('udp' or 'tcp')
+        :return: Register's id
         """
 
         session = self.session()
@@ -54,72 +121,205 @@ class _DatabaseResourceTableController:
             new_resource.resourceName = resource_name
             new_resource.resourcePath = resource_path
             new_resource.resourceHash = resource_hash
+            new_resource.resourceSize = resource_size
+            new_resource.transferMode = transfer_mode
 
             session.add(new_resource)
+            session.flush()
+            resource_id = new_resource.id
             session.commit()
 
+            return resource_id
+
         finally:
             session.close()
 
-    def get_available_peer(self, resource_name: str) -> typing.List:
+    @timed("resources")
+    def register_resources(self, resources: typing.List[dict]) -> typing.List[int]:
         """
-        Get peer's ip and port and resource's path, name and hash
-        that contains same resource name
+        Register many 'peer x resource' relationships (and their contents' piece hashes) at database
+        with bulk inserts in a single transaction
 
-        :param resource_name: Name of the resource to be searched at database
-        :return: List containing matching peer's and resource's info
+        :param resources: Resources' info, with the same fields as 'register_peer' and, for contents with piece
+        hashes, 'piece_size', 'merkle_root' and 'piece_hashes' (SHA-256 hash of every piece, in order)
+        :return: Registers' ids, in the same order
         """
 
         session = self.session()
 
         try:
-            available_peers = session\
-                .query(
-                    ResourceTable.peerIp,
-                    ResourceTable.peerPort,
-                    ResourceTable.resourcePath,
-                    ResourceTable.resourceName,
-                    ResourceTable.resourceHash
-                )\
-                .filter(ResourceTable.resourceName == resource_name)\
-                .group_by(ResourceTable.peerId)\
-                .all()
+            mappings = [
+                {
+                    "peerId": resource["peer_id"],
+                    "peerIp": resource["peer_ip"],
+                    "peerPort": resource["peer_port"],
+                    "resourceName": resource["resource_name"],
+                    "resourcePath": resource["resource_path"],
+                    "resourceHash": resource["resource_hash"],
+                    "resourceSize": resource.get("resource_size"),
+                    "transferMode": resource.get("transfer_mode", "udp"),
+                }
+                for resource in resources
+            ]
+            session.bulk_insert_mappings(ResourceTable, mappings)
+
+            # a single batched insert within the transaction (which holds the database's write lock) takes
+            # a contiguous block of ids, as AUTOINCREMENT ids only grow, ending at the greatest one
+            last_id = session.query(sqlalchemy.func.max(ResourceTable.id)).scalar() or 0
+            resource_ids = list(range(last_id - len(mappings) + 1, last_id + 1))
+
+            # piece hashes once per content, ignoring contents already registered (even concurrently)
+            new_metadata = {
+                resource["resource_hash"]: resource
+                for resource in resources if resource.get("piece_hashes") is not None
+            }
+
+            if new_metadata:
+                session.execute(_metadata.insert().prefix_with("OR IGNORE"), [
+                    {
+                        "resourceHash": resource_hash,
+                        "pieceSize": resource["piece_size"],
+                        "merkleRoot": resource["merkle_root"],
+                        "pieceHashes": "".join(resource["piece_hashes"]),
+                    }
+                    for resource_hash, resource in new_metadata.items()
+                ])
 
-            if available_peers:
-                return available_peers[0]
+            session.commit()
 
-            else:
-                return []
+            return resource_ids
 
         finally:
             session.close()
 
-    def get_all_resources(self) -> typing.List:
+    @timed("resources")
+    def get_metadata(self, resource_hash: str) -> typing.Optional[typing.Tuple]:
         """
-        Get every register of peer's ip and port and resource's path, name and hash
+        Get a resource's piece size, Merkle root and piece hashes
 
-        :return: List of every 'peer x resource' info
+        :param resource_hash: Resource's MD5
+        :return: Tuple (piece size, Merkle root, concatenated piece hashes) or None when not registered
         """
 
         session = self.session()
 
         try:
-            available_peers = session\
+            return session\
                 .query(
+                    ResourceMetadataTable.pieceSize,
+                    ResourceMetadataTable.merkleRoot,
+                    ResourceMetadataTable.pieceHashes
+                )\
+                .filter(ResourceMetadataTable.resourceHash == resource_hash)\
+                .first()
+
+        finally:
+            session.close()
+
+    @timed("resources")
+    def get_available_peer(self, resource_name: str, rank: Strategy = two_choices) -> typing.List:
+        """
+        Get peer's ip and port, resource's path, name, hash and size and peer's transfer mode
+        of every peer that holds the same content as the resource with such name
+
+        :param resource_name: Name of the resource to be searched at database
+        :param rank: Strategy that ranks holders by their latest reported load
+        :return: List containing every matching peer's and resource's info, ranked
+        """
+
+        # single core statement (no ORM session), as it answers every lookup of multi-process servers
+        with self.engine.connect() as connection:
+            rows = connection.execute(AVAILABLE_PEERS_QUERY, resource_name=resource_name).fetchall()
+
+        return rank([
+            (tuple(row[:-2]), None if row[-2] is None else (row[-2], row[-1]))
+            for row in rows
+        ])
+
+    @timed("resources")
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> typing.List[typing.Tuple]:
+        """
+        Search resources' names by prefix or substring (no typo tolerance, unlike the in-memory index),
+        exact and prefix matches first
+
+        :param query: Searched text (case insensitive)
+        :param limit: Maximum number of results
+        :param offset: Number of best results skipped (pagination)
+        :return: List of (resource name, resource hash, resource size, number of holders, match, score)
+        """
+
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                SEARCH_QUERY,
+                exact=escaped,
+                prefix=f"{escaped}%",
+                substring=f"%{escaped}%",
+                limit=limit,
+                offset=offset
+            ).fetchall()
+
+        return [
+            (name, resource_hash, resource_size, holders, SEARCH_MATCHES[tier], round(len(query) / len(name), 3))
+            for name, resource_hash, resource_size, holders, _, tier in rows
+        ]
+
+    @timed("resources")
+    def get_resources_page(self, after: int = 0, limit: int = 1000) -> typing.List[typing.Tuple]:
+        """
+        Get a page of one register per 'peer x content' (its first one), in registers' ids order, the
+        same page as the in-memory index's
+
+        :param after: Last register's id of the previous page ('0' for the first page)
+        :param limit: Maximum number of registers
+        :return: List of (register's id, record), the last id is the cursor for the next page
+        """
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(RESOURCES_PAGE_QUERY, after=after, limit=limit).fetchall()
+
+        return [(row[0], tuple(row[1:])) for row in rows]
+
+    @timed("resources")
+    def get_all_records(self) -> typing.Iterator:
+        """
+        Get every register, in insertion order, with its id and peer's id followed by the same columns
+        as each record of 'get_resources_page'
+
+        :return: Iterator over every register
+        """
+
+        # plain DBAPI cursor (no ORM nor result processing), as it loads the whole table
+        connection = self.engine.raw_connection()
+
+        try:
+            cursor = connection.cursor()
+            cursor.execute(str(
+                sqlalchemy.select([
+                    ResourceTable.id,
+                    ResourceTable.peerId,
                     ResourceTable.peerIp,
                     ResourceTable.peerPort,
                     ResourceTable.resourcePath,
                     ResourceTable.resourceName,
-                    ResourceTable.resourceHash
-                )\
-                .group_by(ResourceTable.peerId, ResourceTable.resourceHash)\
-                .all()
+                    ResourceTable.resourceHash,
+                    ResourceTable.resourceSize,
+                    ResourceTable.transferMode
+                ]).order_by(ResourceTable.id).compile(dialect=self.engine.dialect)
+            ))
+
+            rows = cursor.fetchmany(10000)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(10000)
 
-            return available_peers
+            cursor.close()
 
         finally:
-            session.close()
+            connection.close()
 
+    @timed("resources")
     def drop_peer(self, peer_id: str) -> None:
         """
         Delete every record that contains same peer's id
@@ -138,6 +338,33 @@ class _DatabaseResourceTableController:
         finally:
             session.close()
 
+    @timed("resources")
+    def drop_peers(self, peer_ids: typing.List[str]) -> None:
+        """
+        Delete every record that belongs to any of the given peer's ids in a single transaction
+
+        :param peer_ids: Peer's ids to be used as filter
+        """
+
+        if not peer_ids:
+            return
+
+        session = self.session()
+        try:
+            session\
+                .query(ResourceTable)\
+                .filter(ResourceTable.peerId.in_(peer_ids))\
+                .delete(synchronize_session=False)
+            session.commit()
+
+        finally:
+            session.close()
+
+    @timed("resources")
+    def __len__(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(sqlalchemy.select([sqlalchemy.func.count()]).select_from(_resources)).scalar()
+
 
 @functools.lru_cache()
 def get_database_resource_table_controller() -> [_DatabaseResourceTableController]:
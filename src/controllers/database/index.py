@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines an in-memory index over the resources table, answering lookups ahead of the database
+"""
+
+# built-in dependencies
+import bisect
+import functools
+import gc
+import threading
+import typing
+
+# project dependencies
+from controllers.database.database import (
+    _DatabaseResourceTableController,
+    get_database_resource_table_controller
+)
+from controllers.database.selection import (
+    Strategy,
+    two_choices
+)
+from controllers.database.trigram import (
+    EXACT,
+    FUZZY,
+    PREFIX,
+    SUBSTRING,
+    TrigramIndexController
+)
+from protocol.heartbeat import Load
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+COMPACTION_THRESHOLD = 1024  # removed ids tolerated at the sorted listing before compacting it
+
+# (peer ip, peer port, resource path, resource name, resource hash, resource size, transfer mode),
+# the same columns returned by the database's lookups
+Record = typing.Tuple[str, int, str, str, str, typing.Optional[int], str]
+
+# (resource name, resource hash, resource size, number of holders, match, score), a search result
+SearchResult = typing.Tuple[str, str, typing.Optional[int], int, str, float]
+
+MATCHES = {EXACT: "exact", PREFIX: "prefix", SUBSTRING: "substring", FUZZY: "fuzzy"}
+
+
+class _ResourceIndexController:
+    """
+    Controller for an in-memory index of every 'peer x resource' relationship
+
+    Writes go to the database first and then to the index (write-through), so the database stays the
+    source of truth and the index is rebuilt from it at startup. Lookups never touch the database.
+
+        name -> hash -> holders' ids (hash registered first for a name answers lookups by such name)
+        hash -> holder's id -> holder's first record of such content
+        peer -> every (register's id, record) of such peer
+        register's id -> holder's first record of such content, listed in ids' order (keyset pagination)
+        names' trigrams -> names (search)
+        peer -> latest load reported along with its heartbeats (holders' ranking)
+    """
+
+    def __init__(self, db_access: _DatabaseResourceTableController):
+        """
+        :param db_access: Database's controller, written through
+        """
+
+        self.db_access = db_access
+
+        self.by_name = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Set[str]]]
+        self.by_hash = dict()  # type: typing.Dict[str, typing.Dict[str, Record]]
+        self.by_peer = dict()  # type: typing.Dict[str, typing.List[typing.Tuple[int, Record]]]
+        self.listed = dict()  # type: typing.Dict[int, Record]
+        self.listed_ids = list()  # sorted, may hold ids removed from 'listed' until next compaction
+        self.names = TrigramIndexController()
+        self.loads = dict()  # type: typing.Dict[str, Load]
+        self.lock = threading.Lock()
+
+    def rebuild(self) -> None:
+        """
+        Rebuilds the whole index from the database
+        """
+
+        with self.lock:
+            self.by_name.clear()
+            self.by_hash.clear()
+            self.by_peer.clear()
+            self.listed.clear()
+            self.listed_ids.clear()
+            self.names = TrigramIndexController()
+
+            # millions of new containers would trigger the cyclic garbage collector over and over
+            gc.disable()
+            try:
+                for row in self.db_access.get_all_records():
+                    self.__add(row[0], row[1], tuple(row[2:]))
+            finally:
+                gc.enable()
+
+    def register_peer(self, peer_id: str, peer_ip: str, peer_port: int,
+                      resource_name: str, resource_path: str, resource_hash: str,
+                      resource_size: typing.Optional[int] = None, transfer_mode: str = "udp") -> None:
+        """
+        Register 'peer x resource' relationship at database and index (same parameters as the database's)
+        """
+
+        resource_id = self.db_access.register_peer(
+            peer_id=peer_id,
+            peer_ip=peer_ip,
+            peer_port=peer_port,
+            resource_name=resource_name,
+            resource_path=resource_path,
+            resource_hash=resource_hash,
+            resource_size=resource_size,
+            transfer_mode=transfer_mode
+        )
+
+        with self.lock:
+            self.__add(resource_id, peer_id, (peer_ip, peer_port, resource_path, resource_name, resource_hash,
+                                              resource_size, transfer_mode))
+
+    def register_resources(self, resources: typing.List[dict]) -> None:
+        """
+        Register many 'peer x resource' relationships at database (in a single transaction) and index
+
+        :param resources: Resources' info, as accepted by the database's 'register_resources'
+        """
+
+        resource_ids = self.db_access.register_resources(resources=resources)
+
+        with self.lock:
+            for resource_id, resource in zip(resource_ids, resources):
+                self.__add(resource_id, resource["peer_id"], (
+                    resource["peer_ip"], resource["peer_port"], resource["resource_path"], resource["resource_name"],
+                    resource["resource_hash"], resource.get("resource_size"), resource.get("transfer_mode", "udp")
+                ))
+
+    def drop_peer(self, peer_id: str) -> None:
+        """
+        Delete every record of a peer from database and index
+
+        :param peer_id: Peer's id
+        """
+
+        self.drop_peers([peer_id])
+
+    def drop_peers(self, peer_ids: typing.List[str]) -> None:
+        """
+        Delete every record of many peers from database (in a single transaction) and index
+
+        :param peer_ids: Peers' ids
+        """
+
+        self.db_access.drop_peers(peer_ids)
+
+        with self.lock:
+            for peer_id in peer_ids:
+                self.__remove(peer_id)
+                self.loads.pop(peer_id, None)
+
+            # compact removed ids once they are most of the list
+            if len(self.listed_ids) > 2 * len(self.listed) + COMPACTION_THRESHOLD:
+                self.listed_ids = [resource_id for resource_id in self.listed_ids if resource_id in self.listed]
+
+    def report_loads(self, loads: typing.Dict[str, Load]) -> None:
+        """
+        Keeps the latest load reported by many peers
+
+        :param loads: Peer's id -> reported load
+        """
+
+        with self.lock:
+            self.loads.update(loads)
+
+    def get_available_peer(self, resource_name: str, rank: Strategy = two_choices) -> typing.List[Record]:
+        """
+        Get one record per peer that holds the same content as the resource with such name
+
+        :param resource_name: Resource's name
+        :param rank: Strategy that ranks holders by their latest reported load
+        :return: List of matching records, ranked
+        """
+
+        with self.lock:
+            hashes = self.by_name.get(resource_name)
+
+            if not hashes:
+                return []
+
+            loads = self.loads
+            holders = [
+                (record, loads.get(peer_id))
+                for peer_id, record in self.by_hash[next(iter(hashes))].items()
+            ]
+
+        return rank(holders)
+
+    def get_resources_page(self, after: int = 0,
+                           limit: int = 1000) -> typing.List[typing.Tuple[int, Record]]:
+        """
+        Get a page of one record per 'peer x content', in registers' ids order
+
+        :param after: Last register's id of the previous page ('0' for the first page)
+        :param limit: Maximum number of records
+        :return: List of (register's id, record), the last id is the cursor for the next page
+        """
+
+        with self.lock:
+            page = list()
+            position = bisect.bisect_right(self.listed_ids, after)
+
+            while len(page) < limit and position < len(self.listed_ids):
+                resource_id = self.listed_ids[position]
+                record = self.listed.get(resource_id)
+                if record is not None:
+                    page.append((resource_id, record))
+                position += 1
+
+            return page
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> typing.List[SearchResult]:
+        """
+        Search resources' names by prefix, substring or similarity (typos), best matches first
+
+        :param query: Searched text (case insensitive)
+        :param limit: Maximum number of results
+        :param offset: Number of best results skipped (pagination)
+        :return: List of results, one per name (described by the content that answers lookups by it)
+        """
+
+        with self.lock:
+            results = list()
+
+            for name, tier, score in self.names.search(query, limit, offset):
+                resource_hash = next(iter(self.by_name[name]))
+                holders = self.by_hash[resource_hash]
+                resource_size = next(iter(holders.values()))[5]
+
+                results.append((name, resource_hash, resource_size, len(holders), MATCHES[tier], score))
+
+            return results
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(records) for records in self.by_peer.values())
+
+    def __add(self, resource_id: int, peer_id: str, record: Record) -> None:
+        """
+        Adds a record to every map (caller holds the lock)
+        """
+
+        resource_name, resource_hash = record[3], record[4]
+
+        # no 'setdefault', which would allocate an empty container at every call
+        records = self.by_peer.get(peer_id)
+        if records is None:
+            records = self.by_peer[peer_id] = []
+        records.append((resource_id, record))
+
+        holders = self.by_hash.get(resource_hash)
+        if holders is None:
+            holders = self.by_hash[resource_hash] = {}
+        if peer_id not in holders:
+            holders[peer_id] = record
+            self.listed[resource_id] = record
+
+            # ids grow with every register (AUTOINCREMENT never reuses them), so they are almost always
+            # appended; an id still listed since its removal (until compaction) is not listed twice
+            if not self.listed_ids or resource_id > self.listed_ids[-1]:
+                self.listed_ids.append(resource_id)
+            else:
+                position = bisect.bisect_left(self.listed_ids, resource_id)
+                if position == len(self.listed_ids) or self.listed_ids[position] != resource_id:
+                    self.listed_ids.insert(position, resource_id)
+
+        hashes = self.by_name.get(resource_name)
+        if hashes is None:
+            hashes = self.by_name[resource_name] = {}
+            self.names.add(resource_name)
+        peer_ids = hashes.get(resource_hash)
+        if peer_ids is None:
+            peer_ids = hashes[resource_hash] = set()
+        peer_ids.add(peer_id)
+
+    def __remove(self, peer_id: str) -> None:
+        """
+        Removes every record of a peer from every map (caller holds the lock)
+        """
+
+        for resource_id, record in self.by_peer.pop(peer_id, []):
+            resource_name, resource_hash = record[3], record[4]
+            self.listed.pop(resource_id, None)
+
+            holders = self.by_hash.get(resource_hash)
+            if holders is not None:
+                holders.pop(peer_id, None)
+                if not holders:
+                    del self.by_hash[resource_hash]
+
+            hashes = self.by_name.get(resource_name)
+            if hashes is not None and resource_hash in hashes:
+                hashes[resource_hash].discard(peer_id)
+                if not hashes[resource_hash]:
+                    del hashes[resource_hash]
+                if not hashes:
+                    del self.by_name[resource_name]
+                    self.names.remove(resource_name)
+
+
+@functools.lru_cache()
+def get_resource_index_controller() -> [_ResourceIndexController]:
+    """
+    Singleton for ResourceIndexController class
+
+    :return: Same instance for ResourceIndexController class
+    """
+
+    return _ResourceIndexController(get_database_resource_table_controller())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for peers' liveness at database, shared by every server's process
+"""
+
+# built-in dependencies
+import functools
+import typing
+
+# external dependencies
+import sqlalchemy
+from sqlalchemy.engine import Engine
+
+# project dependencies
+from controllers.server.utils.metrics import timed
+from database.engine import get_engine
+from database.table import (
+    LivenessTable,
+    ResourceTable
+)
+from protocol.heartbeat import Load
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+# refreshes a peer's deadline and load, unless a UDP beat arrived duplicated or out of order
+UPSERT_BEAT = sqlalchemy.text(
+    "INSERT INTO liveness (peerId, deadline, sequence, activeUploads, uploadRate) "
+    "VALUES (:peer_id, :deadline, :sequence, :uploads, :rate) "
+    "ON CONFLICT (peerId) DO UPDATE SET deadline = excluded.deadline, sequence = excluded.sequence, "
+    "activeUploads = excluded.activeUploads, uploadRate = excluded.uploadRate "
+    "WHERE excluded.sequence IS NULL OR liveness.sequence IS NULL OR excluded.sequence > liveness.sequence"
+)
+
+
+class _DatabaseLivenessTableController:
+    """
+    Controller for liveness table access
+
+    Every server's process refreshes deadlines and expires peers through the same table, and a peer
+    is expired (its liveness row and resources deleted) by exactly one process: deletes are conditional
+    on the deadline and run in a single write transaction, so a process that loses the race deletes
+    nothing and a peer that beats meanwhile is kept
+    """
+
+    def __init__(self, engine: typing.Optional[Engine] = None):
+        """
+        :param engine: Database's engine (defaults to central server's shared engine)
+        """
+
+        self.engine = engine or get_engine()
+
+    @timed("liveness")
+    def beat_many(self, beats: typing.Iterable[typing.Tuple[str, typing.Optional[int], typing.Optional[Load]]],
+                  deadline: float) -> None:
+        """
+        Refreshes many peers' deadlines and loads in a single transaction, starting the monitoring of
+        new peers
+
+        :param beats: Tuples (peer's id, beat's sequence number or None for REST beats, reported load or None)
+        :param deadline: New deadline (unix time)
+        """
+
+        parameters = [
+            {
+                "peer_id": peer_id,
+                "deadline": deadline,
+                "sequence": sequence,
+                "uploads": None if load is None else load[0],
+                "rate": None if load is None else load[1]
+            }
+            for peer_id, sequence, load in beats
+        ]
+
+        if parameters:
+            with self.engine.begin() as connection:
+                connection.execute(UPSERT_BEAT, parameters)
+
+    @timed("liveness")
+    def expire(self, now: float, limit: int = 500) -> typing.List[str]:
+        """
+        Deletes peers whose deadline has passed, along with every resource they hold
+
+        :param now: Current unix time
+        :param limit: Maximum number of peers expired at once
+        :return: List of peers' ids expired by this call
+        """
+
+        table = LivenessTable.__table__
+
+        with self.engine.connect() as connection:
+            candidates = [
+                peer_id for (peer_id,) in connection.execute(
+                    sqlalchemy.select([table.c.peerId]).where(table.c.deadline <= now).limit(limit)
+                )
+            ]
+
+            if not candidates:
+                return []
+
+            # first delete takes the writer lock, so concurrent processes expire each peer once
+            expired = list()
+            with connection.begin():
+                for peer_id in candidates:
+                    deleted = connection.execute(
+                        table.delete().where(table.c.peerId == peer_id).where(table.c.deadline <= now)
+                    )
+                    if deleted.rowcount:
+                        expired.append(peer_id)
+
+                if expired:
+                    connection.execute(
+                        ResourceTable.__table__.delete().where(ResourceTable.__table__.c.peerId.in_(expired))
+                    )
+
+            return expired
+
+    @timed("liveness")
+    def next_deadline(self) -> typing.Optional[float]:
+        """
+        :return: Earliest deadline (unix time), or None when no peer is monitored
+        """
+
+        table = LivenessTable.__table__
+
+        with self.engine.connect() as connection:
+            return connection.execute(sqlalchemy.select([sqlalchemy.func.min(table.c.deadline)])).scalar()
+
+    @timed("liveness")
+    def __len__(self) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(sqlalchemy.select([sqlalchemy.func.count()]).select_from(
+                LivenessTable.__table__
+            )).scalar()
+
+
+@functools.lru_cache()
+def get_database_liveness_table_controller() -> [_DatabaseLivenessTableController]:
+    """
+    Singleton for DatabaseLivenessTableController class
+
+    :return: Same instance for DatabaseLivenessTableController class
+    """
+
+    return _DatabaseLivenessTableController()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines strategies to rank the holders of a content by their reported load
+"""
+
+# built-in dependencies
+import random
+import typing
+
+# project dependencies
+from protocol.heartbeat import Load
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+# (holder's record, holder's latest load or None when it never reported one)
+Holder = typing.Tuple[tuple, typing.Optional[Load]]
+
+# ranks holders, the first ones being the preferred sources of a download
+Strategy = typing.Callable[[typing.List[Holder]], typing.List[tuple]]
+
+IDLE = (0, 0)  # load assumed for holders that never reported one
+
+
+def _load(holder: Holder) -> Load:
+    """
+    :return: Holder's load, uploads in progress first and then upload rate
+    """
+
+    return holder[1] or IDLE
+
+
+def arbitrary(holders: typing.List[Holder]) -> typing.List[tuple]:
+    """
+    Keeps the registry's order, regardless of load
+
+    :param holders: Holders of a content
+    :return: Holders' records
+    """
+
+    return [record for record, _ in holders]
+
+
+def least_loaded(holders: typing.List[Holder]) -> typing.List[tuple]:
+    """
+    Ranks the least loaded holders first (ties in random order)
+
+    :param holders: Holders of a content
+    :return: Holders' records, least loaded first
+    """
+
+    shuffled = random.sample(holders, len(holders))
+    return [record for record, _ in sorted(shuffled, key=_load)]
+
+
+def two_choices(holders: typing.List[Holder]) -> typing.List[tuple]:
+    """
+    Ranks holders by the power of two choices: each position goes to the less loaded of two holders
+    sampled at random among the ones left
+
+    Loads are only as fresh as the latest heartbeats, so 'least_loaded' sends every download started
+    between two beats to the same holder, while two random choices still spread them and avoid the
+    busiest holders
+
+    :param holders: Holders of a content
+    :return: Holders' records, ranked
+    """
+
+    left = list(holders)
+    ranked = list()
+
+    while len(left) > 1:
+        first, second = random.sample(range(len(left)), 2)
+        chosen = first if _load(left[first]) <= _load(left[second]) else second
+
+        ranked.append(left[chosen][0])
+        left[chosen] = left[-1]
+        left.pop()
+
+    ranked.extend(record for record, _ in left)
+    return ranked
+
+
+STRATEGIES = {
+    "arbitrary": arbitrary,
+    "least-loaded": least_loaded,
+    "two-choices": two_choices,
+}  # type: typing.Dict[str, Strategy]
+
+DEFAULT_STRATEGY = "two-choices"
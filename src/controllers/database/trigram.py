@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines an in-memory trigram index over resources' names, for prefix, substring and fuzzy search
+"""
+
+# built-in dependencies
+import array
+import collections
+import heapq
+import math
+import typing
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+SIMILARITY_THRESHOLD = 0.3  # minimum share of the query's trigrams a fuzzy match holds
+MAX_FUZZY_POSTINGS = 20000  # posting entries counted per query when looking for typos (rarest trigrams first)
+MIN_FUZZY_LENGTH = 3  # shorter queries are only matched by prefix or substring
+MAX_FUZZY_CANDIDATES = 256  # names scored by similarity per query, when looking for typos
+INTERSECTION_RATIO = 8  # posting arrays longer than this many times the candidates are not intersected
+COMPACTION_THRESHOLD = 1024  # removed names tolerated at posting lists before compacting them
+
+# match tiers, best first
+EXACT, PREFIX, SUBSTRING, FUZZY = 0, 1, 2, 3
+
+_EMPTY = array.array("I")
+
+
+def trigrams(text: str) -> typing.Set[str]:
+    """
+    Trigrams of a (lowercase) text, padded so its start and end have trigrams of their own
+
+    :param text: Text
+    :return: Set of trigrams
+    """
+
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _rank(result: typing.Tuple[int, float, str]) -> typing.Tuple[int, float, int, str]:
+    """
+    Ranking key of a search result: tier, then score, then shorter and alphabetically first names
+    """
+
+    tier, negative_score, name = result
+    return tier, negative_score, len(name), name
+
+
+class TrigramIndexController:
+    """
+    Controller for an incrementally maintained trigram index over distinct names
+
+    Every name gets an id, and each trigram of a lowercase name maps to the (growing) array of ids
+    holding it. A query only walks the shortest posting arrays of its trigrams: any name sharing
+    enough trigrams to be a match shares at least one of them (pigeonhole), and each candidate is
+    then verified and scored. Results are ranked by tier (exact, prefix, substring, fuzzy), then by
+    score: the share of the name covered by the query, or the trigram similarity of typos. Removed
+    names leave a hole in the posting arrays until they are compacted.
+
+    Not thread-safe, callers hold their own lock.
+    """
+
+    def __init__(self):
+        self.names = list()  # type: typing.List[typing.Optional[str]]
+        self.ids = dict()  # type: typing.Dict[str, int]
+        self.postings = dict()  # type: typing.Dict[str, array.array]
+        self.removed = 0
+
+    def add(self, name: str) -> None:
+        """
+        :param name: Name to be indexed (ignored if already indexed)
+        """
+
+        if name in self.ids:
+            return
+
+        name_id = self.ids[name] = len(self.names)
+        self.names.append(name)
+
+        for trigram in trigrams(name.lower()):
+            posting = self.postings.get(trigram)
+            if posting is None:
+                posting = self.postings[trigram] = array.array("I")
+            posting.append(name_id)
+
+    def remove(self, name: str) -> None:
+        """
+        :param name: Name to be removed from the index (ignored if not indexed)
+        """
+
+        name_id = self.ids.pop(name, None)
+
+        if name_id is None:
+            return
+
+        self.names[name_id] = None
+        self.removed += 1
+
+        if self.removed > len(self.ids) + COMPACTION_THRESHOLD:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rebuilds the index with its current names only
+        """
+
+        names = list(self.ids)
+
+        self.names.clear()
+        self.ids.clear()
+        self.postings.clear()
+        self.removed = 0
+
+        for name in names:
+            self.add(name)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> typing.List[typing.Tuple[str, int, float]]:
+        """
+        Ranked names matching a query by prefix, substring or trigram similarity
+
+        :param query: Searched text (case insensitive)
+        :param limit: Maximum number of results
+        :param offset: Number of best results skipped (pagination)
+        :return: List of (name, tier, score), best first
+        """
+
+        query = query.lower()
+        wanted = offset + limit
+
+        ranked = self.__search_substring(query)
+
+        # typos are only looked for when exact, prefix and substring matches do not fill the page
+        if len(ranked) < wanted and len(query) >= MIN_FUZZY_LENGTH:
+            matched = {name for _, _, name in ranked}
+            ranked.extend(
+                (FUZZY, -similarity, name)
+                for similarity, name in self.__search_fuzzy(query, wanted - len(ranked), matched)
+            )
+
+        return [
+            (name, tier, round(-negative_score, 3))
+            for tier, negative_score, name in heapq.nsmallest(wanted, ranked, key=_rank)[offset:]
+        ]
+
+    def __search_substring(self, query: str) -> typing.List[typing.Tuple[int, float, str]]:
+        """
+        Names holding the query, scored by how much of them it covers
+
+        A name holding the query holds every one of its inner trigrams (or, for queries shorter than a
+        trigram, starts with it), so candidates are the intersection of their posting arrays, shortest
+        first, and are then verified.
+        """
+
+        if len(query) >= 3:
+            required = {query[i:i + 3] for i in range(len(query) - 2)}
+        else:
+            required = {f"  {query}"[-3:]}
+
+        # every candidate is verified, so the best matches are found wherever they were indexed
+        postings = sorted((self.postings.get(trigram, _EMPTY) for trigram in required), key=len)
+        candidates = set(postings[0])
+
+        # intersecting is only worth it while candidates outnumber the next posting array
+        for posting in postings[1:]:
+            if len(candidates) * INTERSECTION_RATIO < len(posting):
+                break
+            candidates.intersection_update(posting)
+
+        ranked = list()
+        for name_id in candidates:
+            name = self.names[name_id]
+            if name is None:
+                continue
+
+            lowered = name.lower()
+            position = lowered.find(query)
+
+            if position < 0:
+                continue
+
+            tier = SUBSTRING if position else (EXACT if len(lowered) == len(query) else PREFIX)
+            ranked.append((tier, -len(query) / len(name), name))
+
+        return ranked
+
+    def __search_fuzzy(self, query: str, wanted: int,
+                       matched: typing.Set[str]) -> typing.List[typing.Tuple[float, str]]:
+        """
+        Names similar enough to the query, most similar first
+
+        Similarity is the share of the query's trigrams (but the one padding its end, as the query may
+        be any part of the name) the name holds, so long names are not penalized for their length.
+
+        A similar name shares at least 'required' of the query's trigrams, so it is in at least one of
+        its 'len - required + 1' shortest posting arrays (as long as they fit 'MAX_FUZZY_POSTINGS', so
+        that very common trigrams do not make every name a candidate). Candidates sharing the most of
+        those trigrams are verified first.
+        """
+
+        query_trigrams = trigrams(query)
+        query_trigrams.discard(f"  {query} "[-3:])
+        postings = sorted((self.postings.get(trigram, _EMPTY) for trigram in query_trigrams), key=len)
+        required = max(1, math.ceil(SIMILARITY_THRESHOLD * len(postings)))
+
+        hits = collections.Counter()
+        counted_entries = counted_postings = 0
+        for posting in postings[:len(postings) - required + 1]:
+            counted_entries += len(posting)
+            if counted_entries > MAX_FUZZY_POSTINGS and hits:
+                break
+            hits.update(posting)
+            counted_postings += 1
+
+        # trigrams at the posting arrays not counted may add at most one hit each
+        uncounted = len(postings) - counted_postings
+
+        similar = list()
+        best = list()  # min-heap of the 'wanted' best similarities, bounding the candidates left
+        for name_id, count in self.__fuzzy_candidates(hits, required - uncounted):
+            # candidates come by descending hits, whose similarity cannot exceed 'shared / query trigrams'
+            if count + uncounted < required or \
+                    (len(best) == wanted and best[0] > (count + uncounted) / len(query_trigrams)):
+                break
+
+            name = self.names[name_id]
+            if name is None or name in matched:
+                continue
+
+            name_trigrams = trigrams(name.lower())
+            similarity = len(query_trigrams & name_trigrams) / len(query_trigrams)
+
+            if similarity < SIMILARITY_THRESHOLD:
+                continue
+
+            similar.append((similarity, name))
+
+            if len(best) < wanted:
+                heapq.heappush(best, similarity)
+            else:
+                heapq.heappushpop(best, similarity)
+
+        # as equally similar names are ranked: shorter and alphabetically first
+        return heapq.nsmallest(wanted, similar, key=lambda match: (-match[0], len(match[1]), match[1]))
+
+    def __fuzzy_candidates(self, hits: collections.Counter,
+                           minimum: int) -> typing.Iterator[typing.Tuple[int, int]]:
+        """
+        Up to 'MAX_FUZZY_CANDIDATES' names with the most hits, by descending hits. Names tied with the
+        last one taken compete for the places left as they are ranked (shorter and alphabetically first),
+        only when they are reached and hold at least 'minimum' hits (fewer can not be similar enough)
+        """
+
+        top = hits.most_common(MAX_FUZZY_CANDIDATES)
+
+        if len(top) < MAX_FUZZY_CANDIDATES:
+            yield from top
+            return
+
+        floor = top[-1][1]
+        above = [hit for hit in top if hit[1] > floor]
+        yield from above
+
+        if floor < minimum:
+            return
+
+        names = self.names
+        tied = [name_id for name_id, count in hits.items() if count == floor and names[name_id] is not None]
+
+        for name_id in heapq.nsmallest(MAX_FUZZY_CANDIDATES - len(above), tied,
+                                       key=lambda name_id: (len(names[name_id]), names[name_id])):
+            yield name_id, floor
+
+    def __len__(self) -> int:
+        return len(self.ids)
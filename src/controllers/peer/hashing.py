@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for hashing peer's resources
+"""
+
+# built-in dependencies
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+import threading
+import typing
+
+# project dependencies
+from protocol import merkle
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_CACHE_FILE = "hash_cache.sqlite3"  # lives next to the 'downloads' directory
+LOOKUP_BATCH_SIZE = 500  # paths per 'IN' clause, below SQLite's host parameters limit
+
+
+class ResourceHashes(typing.NamedTuple):
+    """
+    Every hash of a resource
+    """
+
+    resource_hash: str  # MD5 over whole content
+    piece_size: int
+    piece_hashes: typing.List[str]  # SHA-256 of every piece
+
+    @property
+    def merkle_root(self) -> str:
+        return merkle.merkle_root(self.piece_hashes)
+
+
+def generate_hashes(resource: str) -> ResourceHashes:
+    """
+    Generates a MD5 hash over a resource's content and a SHA-256 hash over each of its pieces,
+    reading it one piece at a time
+
+    :param resource: Resource's path
+    :return: Resource's hashes
+    """
+
+    md5_hash = hashlib.md5()
+    piece_size = merkle.piece_size_for(os.path.getsize(resource))
+    piece_hashes = list()
+    buffer = memoryview(bytearray(piece_size))
+
+    with open(resource, "rb", buffering=0) as resource_file:
+        read = resource_file.readinto(buffer)
+        while read:
+            md5_hash.update(buffer[:read])
+            piece_hashes.append(merkle.hash_piece(buffer[:read]))
+            read = resource_file.readinto(buffer)
+
+    return ResourceHashes(
+        resource_hash=md5_hash.hexdigest(),
+        piece_size=piece_size,
+        piece_hashes=piece_hashes
+    )
+
+
+class HashCacheController:
+    """
+    Controller for a persistent cache of resource's hashes
+
+    Entries are keyed by (absolute path, size, mtime_ns, inode), so a file is only hashed again when
+    it changes
+    """
+
+    columns = {
+        "path": "TEXT PRIMARY KEY",
+        "size": "INTEGER",
+        "mtime_ns": "INTEGER",
+        "inode": "INTEGER",
+        "hash": "TEXT",
+        "piece_size": "INTEGER",
+        "pieces": "TEXT",  # concatenated piece hashes
+    }
+
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE):
+        self.connection = sqlite3.connect(cache_file, check_same_thread=False)
+        self.lock = threading.Lock()
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS hashes "
+                f"({', '.join(f'{name} {kind}' for name, kind in self.columns.items())})"
+            )
+
+            # add columns missing at a cache created by an older version
+            existing_columns = {row[1] for row in self.connection.execute("PRAGMA table_info(hashes)")}
+            for name, kind in self.columns.items():
+                if name not in existing_columns:
+                    self.connection.execute(f"ALTER TABLE hashes ADD COLUMN {name} {kind}")
+
+            # content's hash -> paths, for resources already held (see 'find')
+            self.connection.execute("CREATE INDEX IF NOT EXISTS hashes_by_hash ON hashes (hash)")
+
+    def get_hashes(self, resource: str) -> ResourceHashes:
+        """
+        Gets every hash of a resource, computing them only when resource is not cached or has changed
+
+        :param resource: Resource's path
+        :return: Resource's hashes
+        :raises FileNotFoundError: When resource does not exist
+        """
+
+        path = os.path.abspath(resource)
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+        cached = self.__lookup(path)
+
+        if cached is not None and cached[:3] == key and cached[4] is not None:
+            return ResourceHashes(
+                resource_hash=cached[3],
+                piece_size=cached[4],
+                piece_hashes=[cached[5][i:i + 64] for i in range(0, len(cached[5]), 64)]
+            )
+
+        resource_hashes = generate_hashes(path)
+        self.store(path, key, resource_hashes)
+
+        return resource_hashes
+
+    def get_many_hashes(self, resources: typing.List[str],
+                        max_workers: typing.Optional[int] = None) -> typing.List[ResourceHashes]:
+        """
+        Gets every hash of many resources, computing the ones not cached (or changed) in parallel and
+        caching them in a single transaction
+
+        :param resources: Resources' paths
+        :param max_workers: Number of hashing threads (defaults to the number of CPUs)
+        :return: Every resource's hashes, in the same order
+        :raises FileNotFoundError: When a resource does not exist
+        """
+
+        paths = [os.path.abspath(resource) for resource in resources]
+        keys = list()
+        resources_hashes = list()
+
+        with self.lock:
+            cached_entries = dict()
+            for i in range(0, len(paths), LOOKUP_BATCH_SIZE):
+                batch = paths[i:i + LOOKUP_BATCH_SIZE]
+                cached_entries.update(
+                    (row[0], row[1:]) for row in self.connection.execute(
+                        f"SELECT path, size, mtime_ns, inode, hash, piece_size, pieces FROM hashes "
+                        f"WHERE path IN ({', '.join('?' * len(batch))})",
+                        batch
+                    )
+                )
+
+        for path in paths:
+            stat = os.stat(path)
+            key = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            cached = cached_entries.get(path)
+
+            keys.append(key)
+            resources_hashes.append(
+                ResourceHashes(
+                    resource_hash=cached[3],
+                    piece_size=cached[4],
+                    piece_hashes=[cached[5][i:i + 64] for i in range(0, len(cached[5]), 64)]
+                ) if cached is not None and cached[:3] == key and cached[4] is not None else None
+            )
+
+        missing = [i for i, resource_hashes in enumerate(resources_hashes) if resource_hashes is None]
+
+        # hashlib releases the GIL while hashing, so threads hash files in parallel
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            for i, resource_hashes in zip(missing, executor.map(generate_hashes, [paths[i] for i in missing])):
+                resources_hashes[i] = resource_hashes
+
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, inode, hash, piece_size, pieces) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (paths[i], *keys[i], resources_hashes[i].resource_hash, resources_hashes[i].piece_size,
+                     "".join(resources_hashes[i].piece_hashes))
+                    for i in missing
+                ]
+            )
+
+        return resources_hashes
+
+    def find(self, resource_hash: str, name: typing.Optional[str] = None) -> typing.Optional[str]:
+        """
+        Finds a cached resource with such content, skipping the ones changed (or removed) since they were
+        hashed
+
+        :param resource_hash: Content's MD5 hash
+        :param name: File name of the resources preferred among the ones with such content
+        :return: Resource's absolute path or None when no cached resource holds such content
+        """
+
+        with self.lock:
+            candidates = self.connection.execute(
+                "SELECT path, size, mtime_ns, inode FROM hashes WHERE hash = ?",
+                (resource_hash,)
+            ).fetchall()
+
+        if name is not None:
+            candidates.sort(key=lambda candidate: os.path.basename(candidate[0]) != name)
+
+        for path, *key in candidates:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == tuple(key):
+                return path
+
+        return None
+
+    def store(self, path: str, key: typing.Tuple[int, int, int], resource_hashes: ResourceHashes) -> None:
+        """
+        Stores a resource's hashes
+
+        :param path: Resource's absolute path
+        :param key: Resource's (size, mtime_ns, inode) when hashes were computed
+        :param resource_hashes: Resource's hashes
+        """
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, inode, hash, piece_size, pieces) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, *key, resource_hashes.resource_hash, resource_hashes.piece_size,
+                 "".join(resource_hashes.piece_hashes))
+            )
+
+    def __lookup(self, path: str) -> typing.Optional[typing.Tuple]:
+        """
+        Looks up a cached entry
+
+        :param path: Resource's absolute path
+        :return: Tuple (size, mtime_ns, inode, hash, piece_size, pieces) or None when not cached
+        """
+
+        with self.lock:
+            return self.connection.execute(
+                "SELECT size, mtime_ns, inode, hash, piece_size, pieces FROM hashes WHERE path = ?",
+                (path,)
+            ).fetchone()
+
+
+class StreamingHashController:
+    """
+    Controller for hashing a resource while its ranges are being downloaded
+
+    Bytes are hashed live when they are written exactly at the hashed frontier (every byte before
+    it is already hashed), which covers single-source downloads entirely. Ranges completed ahead of
+    the frontier (by other sources) are read back from the file only when the frontier reaches them.
+    """
+
+    def __init__(self, fd: int, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        :param fd: File descriptor of the file being downloaded, open for reading
+        :param block_size: Size of each block read back from disk
+        """
+
+        self.fd = fd
+        self.block_size = block_size
+
+        self.md5_hash = hashlib.md5()
+        self.frontier = 0  # every byte before it is hashed
+        self.completed = dict()  # start -> end of completed ranges ahead of the frontier
+        self.lock = threading.Lock()
+
+    def update(self, offset: int, data: bytes) -> None:
+        """
+        Hashes data that was just written, if it lies exactly at the frontier
+
+        :param offset: Position where data was written
+        :param data: Written data
+        """
+
+        with self.lock:
+            if offset == self.frontier:
+                self.md5_hash.update(data)
+                self.frontier += len(data)
+
+    def complete(self, start: int, end: int) -> None:
+        """
+        Marks a range as completely written, hashing every completed range the frontier reaches
+
+        :param start: First byte of the range
+        :param end: Range's end (exclusive)
+        """
+
+        with self.lock:
+            if end > self.frontier:
+                self.completed[start] = end
+            self.__drain()
+
+    def hexdigest(self, size: int) -> str:
+        """
+        Finishes hashing, reading back whatever was not hashed yet
+
+        :param size: Resource's size in bytes
+        :return: MD5 hash over resource's content
+        """
+
+        with self.lock:
+            self.__drain()
+            self.__read_back(size)
+
+            return self.md5_hash.hexdigest()
+
+    def __drain(self) -> None:
+        """
+        Advances the frontier through every completed range that contains it
+        """
+
+        advanced = True
+
+        while advanced:
+            advanced = False
+
+            for start, end in list(self.completed.items()):
+                if end <= self.frontier:
+                    del self.completed[start]
+
+                elif start <= self.frontier:
+                    del self.completed[start]
+                    self.__read_back(end)
+                    advanced = True
+
+    def __read_back(self, end: int) -> None:
+        """
+        Hashes file's content from the frontier up to 'end'
+
+        :param end: Position to stop (exclusive)
+        """
+
+        while self.frontier < end:
+            block = os.pread(self.fd, min(self.block_size, end - self.frontier), self.frontier)
+            if not block:
+                break
+            self.md5_hash.update(block)
+            self.frontier += len(block)
+
+
+class PieceHashController:
+    """
+    Controller for a resource's piece hashes, used to verify pieces as they are downloaded
+    """
+
+    def __init__(self, size: int, piece_size: int, piece_hashes: typing.List[str]):
+        """
+        :param size: Resource's size in bytes
+        :param piece_size: Piece size in bytes
+        :param piece_hashes: Expected SHA-256 hash of every piece, in order
+        """
+
+        self.size = size
+        self.piece_size = piece_size
+        self.piece_hashes = piece_hashes
+
+    def piece_range(self, index: int) -> typing.Tuple[int, int]:
+        """
+        Byte range of a piece
+
+        :param index: Piece's index
+        :return: Tuple (offset, length)
+        """
+
+        offset = index * self.piece_size
+        return offset, min(self.piece_size, self.size - offset)
+
+    def checker(self, offset: int) -> "PieceCheckController":
+        """
+        Creates a checker for a range starting at a piece boundary
+
+        :param offset: Range's first byte
+        :return: Checker that verifies the range's pieces as its data arrives
+        """
+
+        return PieceCheckController(self, offset)
+
+
+class PieceCheckController:
+    """
+    Controller for verifying the pieces of a single range as its data arrives, in order
+    """
+
+    def __init__(self, pieces: PieceHashController, offset: int):
+        self.pieces = pieces
+
+        self.position = offset
+        self.index = offset // pieces.piece_size
+        self.piece_hash = hashlib.sha256()
+
+        # indexes of verified pieces
+        self.good = list()
+        self.bad = list()
+
+    def update(self, data: bytes) -> None:
+        """
+        Hashes range's next data, verifying every piece it completes
+
+        :param data: Range's next data
+        """
+
+        view = memoryview(data)
+
+        while view and self.index < len(self.pieces.piece_hashes):
+            piece_offset, piece_length = self.pieces.piece_range(self.index)
+            piece_end = piece_offset + piece_length
+
+            taken = min(len(view), piece_end - self.position)
+            self.piece_hash.update(view[:taken])
+            self.position += taken
+            view = view[taken:]
+
+            if self.position == piece_end:
+                if self.piece_hash.hexdigest() == self.pieces.piece_hashes[self.index]:
+                    self.good.append(self.index)
+                else:
+                    self.bad.append(self.index)
+
+                self.index += 1
+                self.piece_hash = hashlib.sha256()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for peer's cache of central server's lookups
+"""
+
+# built-in dependencies
+import collections
+import threading
+import time
+import typing
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 30  # seconds a resolved lookup is reused
+DEFAULT_NEGATIVE_TTL = 5  # seconds a 'no peers found' lookup is reused (resource may be uploaded soon)
+
+
+class LookupCacheController:
+    """
+    Controller for a bounded LRU cache of resources' holders, by resource's name
+
+    Resolved lookups expire after 'ttl' seconds and empty ones ('no peers found') after 'negative_ttl'
+    seconds, so both new holders and gone holders are noticed without asking central server at every
+    download. Holders that fail a transfer invalidate every lookup that lists them.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        :param max_entries: Maximum number of cached lookups (least recently used ones are evicted)
+        :param ttl: Seconds a lookup with holders is reused
+        :param negative_ttl: Seconds a lookup with no holders is reused
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        # resource's name -> (expiration, holders' info), in least to most recently used order
+        self.entries = collections.OrderedDict()  # type: typing.OrderedDict[str, typing.Tuple[float, list]]
+        self.lock = threading.Lock()
+
+    def get(self, resource_name: str) -> typing.Optional[typing.List[dict]]:
+        """
+        :param resource_name: Resource's name
+        :return: Cached holders' info (empty when no peer held it), or None when not cached or expired
+        """
+
+        with self.lock:
+            entry = self.entries.get(resource_name)
+
+            if entry is None:
+                return None
+
+            expiration, holders = entry
+
+            if expiration <= time.monotonic():
+                del self.entries[resource_name]
+                return None
+
+            self.entries.move_to_end(resource_name)
+            return list(holders)
+
+    def put(self, resource_name: str, holders: typing.List[dict]) -> None:
+        """
+        :param resource_name: Resource's name
+        :param holders: Holders' info answered by central server (may be empty)
+        """
+
+        expiration = time.monotonic() + (self.ttl if holders else self.negative_ttl)
+
+        with self.lock:
+            self.entries[resource_name] = (expiration, list(holders))
+            self.entries.move_to_end(resource_name)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, resource_name: str) -> None:
+        """
+        :param resource_name: Resource's name
+        """
+
+        with self.lock:
+            self.entries.pop(resource_name, None)
+
+    def invalidate_holder(self, holder: dict) -> None:
+        """
+        Invalidates every lookup that lists a holder (e.g. after a transfer from it failed)
+
+        :param holder: Holder's info, as answered by central server
+        """
+
+        address = (holder.get("peer_ip"), holder.get("peer_port"))
+
+        with self.lock:
+            for resource_name in [
+                resource_name for resource_name, (_, holders) in self.entries.items()
+                if any((cached.get("peer_ip"), cached.get("peer_port")) == address for cached in holders)
+            ]:
+                del self.entries[resource_name]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for partial downloads' on-disk state
+
+A partial download is kept as a preallocated '.part' file plus a '.bitmap' sidecar:
+
+    [magic][resource's size][piece size][bitmap]
+
+where bit 'i' (little-endian inside each byte) is set once piece 'i' was written and verified
+against its hash. Bits are written straight to the sidecar as pieces complete, so whatever
+was verified before an interruption survives it and is not downloaded again.
+"""
+
+# built-in dependencies
+import os
+import struct
+import threading
+import typing
+
+# project dependencies
+from controllers.peer.hashing import PieceHashController
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+MAGIC = b"P2PBMAP1"
+HEADER = struct.Struct("!8sQI")
+
+Segment = typing.Tuple[int, int]  # (offset, length)
+
+
+class PartialDownloadController:
+    """
+    Controller for a resumable download's partial file and its bitmap of verified pieces
+    """
+
+    def __init__(self, partial_file: str, pieces: PieceHashController):
+        """
+        Opens (or creates) a partial download, starting from scratch when the existing sidecar does
+        not match the resource's size and piece size
+
+        :param partial_file: Path of the partial '.part' file, sidecar lives next to it
+        :param pieces: Resource's piece hashes
+        """
+
+        self.partial_file = partial_file
+        self.bitmap_file = f"{os.path.splitext(partial_file)[0]}.bitmap"
+        self.pieces = pieces
+        self.count = len(pieces.piece_hashes)
+        self.lock = threading.Lock()
+
+        header = HEADER.pack(MAGIC, pieces.size, pieces.piece_size)
+        bitmap_size = (self.count + 7) // 8
+
+        self.bitmap_fd = os.open(self.bitmap_file, os.O_RDWR | os.O_CREAT, 0o644)
+        existing = os.pread(self.bitmap_fd, HEADER.size + bitmap_size, 0)
+
+        if existing[:HEADER.size] == header and len(existing) == HEADER.size + bitmap_size \
+                and os.path.exists(partial_file):
+            self.bitmap = bytearray(existing[HEADER.size:])
+            self.fd = os.open(partial_file, os.O_RDWR)
+        else:
+            self.bitmap = bytearray(bitmap_size)
+            self.fd = os.open(partial_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.ftruncate(self.bitmap_fd, 0)
+            os.pwrite(self.bitmap_fd, header + self.bitmap, 0)
+
+        # preallocate whole resource (no-op when resuming)
+        os.ftruncate(self.fd, pieces.size)
+
+    def has(self, index: int) -> bool:
+        """
+        :param index: Piece's index
+        :return: Whether piece was already verified
+        """
+
+        return bool(self.bitmap[index // 8] & (1 << (index % 8)))
+
+    def mark(self, index: int) -> None:
+        """
+        Marks a piece as verified, persisting its bit at the sidecar
+
+        :param index: Piece's index
+        """
+
+        with self.lock:
+            if self.bitmap_fd is None or self.has(index):
+                return
+
+            self.bitmap[index // 8] |= 1 << (index % 8)
+            os.pwrite(self.bitmap_fd, self.bitmap[index // 8:index // 8 + 1], HEADER.size + index // 8)
+
+    def ranges(self, verified: bool) -> typing.List[Segment]:
+        """
+        Byte ranges made of consecutive pieces that are (or are not) verified yet
+
+        :param verified: Whether to list verified or missing ranges
+        :return: List of (offset, length) ranges, in order
+        """
+
+        ranges = list()
+        start = None
+
+        for index in range(self.count + 1):
+            if index < self.count and self.has(index) == verified:
+                if start is None:
+                    start = index
+                continue
+
+            if start is not None:
+                offset = self.pieces.piece_range(start)[0]
+                end = sum(self.pieces.piece_range(index - 1))
+                ranges.append((offset, end - offset))
+                start = None
+
+        return ranges
+
+    def close(self) -> None:
+        """
+        Closes partial file and sidecar, keeping both to resume later
+        """
+
+        with self.lock:
+            if self.bitmap_fd is not None:
+                os.close(self.bitmap_fd)
+                os.close(self.fd)
+                self.bitmap_fd = None
+
+    def discard(self) -> None:
+        """
+        Closes and removes partial file and sidecar
+        """
+
+        self.close()
+
+        for path in (self.partial_file, self.bitmap_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def finish(self, download_file: str) -> None:
+        """
+        Closes partial download and publishes it at its final path, removing its sidecar
+
+        :param download_file: Final path
+        """
+
+        self.close()
+
+        os.replace(self.partial_file, download_file)
+        os.remove(self.bitmap_file)
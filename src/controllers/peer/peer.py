@@ -7,114 +7,341 @@ Module that defines a controller for peer's operations
 
 # built-in dependencies
 import errno
-import hashlib
 import json
 import os
 import queue
 import socket
+import threading
+import typing
 import uuid
 
+# external dependencies
+import requests
+
 # project dependencies
+from controllers.peer.hashing import (
+    HashCacheController,
+    PieceHashController,
+    ResourceHashes,
+    StreamingHashController
+)
+from controllers.peer.lookup import (
+    DEFAULT_NEGATIVE_TTL,
+    DEFAULT_TTL,
+    LookupCacheController
+)
+from controllers.peer.partial import PartialDownloadController
 from controllers.peer.peer_rest import PeerRESTController
-from threads.peer.listen import PeerListenSocketThread
+from controllers.peer.rest_client import (
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    RESTClientController
+)
+from controllers.peer.store import ContentStoreController
+from controllers.peer.swarm import (
+    DEFAULT_MAX_SOURCES,
+    DEFAULT_SEGMENT_SIZE,
+    SwarmDownloadController
+)
+from controllers.profiling import (
+    SAMPLER,
+    ProfilerController
+)
+from protocol import (
+    merkle,
+    tcp,
+    udp
+)
+from protocol.base import TransferError
+from threads.peer.listen import (
+    DEFAULT_MAX_TRANSFERS,
+    PeerListenSocketThread
+)
 from threads.peer.heartbeat import PeerHeartBeatThread
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "24/10/2020"
 
+# limits of each batch of resources sent by a directory upload
+UPLOAD_BATCH_SIZE = 1000
+UPLOAD_BATCH_PIECES = 100000
+
+# operations profiled while the peer's profiler is on
+PROFILED_OPERATIONS = ("download", "upload")
+
 
 class PeerController:
 
-    def __init__(self, peer_ip: str, server_ip: str, action_port: int, listen_port: int):
+    def __init__(self, peer_ip: str, server_ip: str, action_port: int, listen_port: int,
+                 transfer_mode: str = "udp", chunk_size: int = udp.DEFAULT_CHUNK_SIZE,
+                 window: int = udp.DEFAULT_WINDOW, buffer_size: int = tcp.DEFAULT_BUFFER_SIZE,
+                 max_sources: int = DEFAULT_MAX_SOURCES, segment_size: int = DEFAULT_SEGMENT_SIZE,
+                 max_transfers: int = DEFAULT_MAX_TRANSFERS,
+                 http_timeout: typing.Union[float, typing.Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 http_retries: int = DEFAULT_RETRIES, udp_heartbeat: bool = False,
+                 lookup_ttl: float = DEFAULT_TTL, lookup_negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 seed_downloads: bool = True):
         # arguments
         self.peer_ip = peer_ip
         self.action_port = action_port
         self.server_ip = server_ip
         self.listen_port = listen_port
+        self.transfer_mode = transfer_mode
+        self.chunk_size = chunk_size
+        self.window = window
+        self.buffer_size = buffer_size
+        self.max_sources = max_sources
+        self.segment_size = segment_size
+        self.max_transfers = max_transfers
+        self.http_timeout = http_timeout
+        self.http_retries = http_retries
+        self.udp_heartbeat = udp_heartbeat
+        self.lookup_ttl = lookup_ttl
+        self.lookup_negative_ttl = lookup_negative_ttl
+        self.seed_downloads = seed_downloads
 
         self.peer_id = str(uuid.uuid4())
 
         # socket
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.bind((self.peer_ip, self.action_port))
+        self.socket_lock = threading.Lock()
 
         # threads (will be started at peer's main thread at project's root)
         self.thread_exceptions = queue.Queue()
         self.listen_thread = PeerListenSocketThread(
             peer_ip=self.peer_ip,
             listen_port=self.listen_port,
-            exceptions=self.thread_exceptions
+            exceptions=self.thread_exceptions,
+            transfer_mode=self.transfer_mode,
+            max_transfers=self.max_transfers
         )
         self.heartbeat_thread = PeerHeartBeatThread(
             peer_id=self.peer_id,
             server_ip=self.server_ip,
-            exceptions=self.thread_exceptions
+            exceptions=self.thread_exceptions,
+            timeout=self.http_timeout,
+            retries=self.http_retries,
+            udp=self.udp_heartbeat,
+            load=self.listen_thread.load
+        )
+
+        # rest (one pooled keep-alive session for every call to central server)
+        self.rest_controller = PeerRESTController(
+            RESTClientController(timeout=self.http_timeout, retries=self.http_retries)
         )
 
-        # rest
-        self.rest_controller = PeerRESTController()
+        # holders of recently looked up resources (repeated downloads do not ask central server again)
+        self.lookup_cache = LookupCacheController(ttl=self.lookup_ttl, negative_ttl=self.lookup_negative_ttl)
 
         # method calls
         self.__create_downloads_dir()
 
+        # hashes (cache file lives next to 'downloads' directory and survives restarts)
+        self.hash_cache = HashCacheController()
+
+        # resources already held, by content (uploaded or downloaded ones), so they are not downloaded again
+        self.content_store = ContentStoreController(self.hash_cache)
+
+        # a fraction of downloads and uploads is profiled when 'P2P_PROFILE' is set or through 'profile'
+        # (stacks are sampled by default, so a download's source threads are profiled too)
+        self.profiler = ProfilerController.from_environment(default_method=SAMPLER)
+        self.profile(self.profiler.rate)
+
     @staticmethod
     def __create_downloads_dir() -> None:
         """
-        Creates a 'downloads' directory if not exists
+        Creates 'downloads' and 'partial' (downloads in progress) directories if not exist
         """
 
-        if not os.path.exists(os.path.dirname("downloads/")):
-            try:
-                os.makedirs(os.path.dirname("downloads/"))
-            except OSError as exc:  # Guard against race condition
-                if exc.errno != errno.EEXIST:
-                    raise
+        for directory in ("downloads/", "partial/"):
+            if not os.path.exists(os.path.dirname(directory)):
+                try:
+                    os.makedirs(os.path.dirname(directory))
+                except OSError as exc:  # Guard against race condition
+                    if exc.errno != errno.EEXIST:
+                        raise
 
-    def list(self) -> str:
+    def profile(self, rate: float, method: typing.Optional[str] = None) -> str:
         """
-        Lists all available resources at central server
+        Changes the fraction of downloads and uploads profiled ('0' turns profiling off)
 
-        :return String response for the client at peer's main thread
+        :param rate: Fraction of operations profiled, between 0 and 1
+        :param method: Profiling method, 'cprofile' or 'sampler' (unchanged when None)
+        :return: String response for the client at peer's main thread
+        """
+
+        try:
+            self.profiler.configure(rate, method)
+        except ValueError as error:
+            return f"could not profile: {error}!"
+
+        # operations only go through the profiler while it is on
+        for operation in PROFILED_OPERATIONS:
+            if self.profiler.enabled:
+                unprofiled = getattr(PeerController, operation).__get__(self)
+                setattr(self, operation, self.profiler.wrap(f"peer_{operation}", unprofiled))
+            else:
+                self.__dict__.pop(operation, None)
+
+        if not self.profiler.enabled:
+            return "profiling is off!"
+
+        return f"profiling {self.profiler.rate:.1%} of downloads and uploads with {self.profiler.method}, " \
+               f"written to '{self.profiler.directory}/'!"
+
+    def list(self) -> typing.Iterator[dict]:
+        """
+        Lists all available resources at central server, streamed so only one resource is held
+        in memory at a time
+
+        :return Iterator over every resource's info for the client at peer's main thread
         """
 
         # call central server
-        response = self.rest_controller.call_server_get_all_resources(
-            server_ip=self.server_ip
-        )
+        with self.rest_controller.call_server_stream_all_resources(server_ip=self.server_ip) as response:
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def search(self, query: str, limit: typing.Optional[int] = None, offset: int = 0) -> dict:
+        """
+        Searches resources' names at central server, best matches first
+
+        :param query: Searched text (prefix, substring or misspelled name)
+        :param limit: Maximum number of results (server's default when not given)
+        :param offset: Number of best results skipped ('next' of the previous page)
+        :return: Central server's response, whose data has a page of results and the offset of the next
+        one ('None' at the last page)
+        """
 
-        return response.json().get("data")
+        # call central server
+        return self.rest_controller.content(self.rest_controller.call_server_search(
+            query=query,
+            server_ip=self.server_ip,
+            limit=limit,
+            offset=offset
+        ))
 
     def upload(self, resource: str) -> str:
         """
-        Uploads a local resource to the central server
+        Uploads a local resource (or every resource inside a local directory) to the central server
 
-        :param resource: Local resource to be published with format: [<path>/]<name>
+        :param resource: Local resource or directory to be published with format: [<path>/]<name>
         :return: String response for the client at peer's main thread
         """
 
-        try:
-            resource_path = os.path.dirname(resource)
-            resource_name = os.path.basename(resource)
+        if os.path.isdir(resource):
+            return self.__upload_directory(resource)
 
-            # call central server
-            response = self.rest_controller.call_server_post_resource(
-                peer_id=self.peer_id,
-                peer_ip=self.peer_ip,
-                listen_port=self.listen_port,
-                resource_path=resource_path,
-                resource_name=resource_name,
-                resource_hash=self.__generate_hash(resource_path, resource_name),
-                server_ip=self.server_ip
-            ).json()
+        try:
+            response = self.rest_controller.content(self.__register_resource(resource))
 
             if response.get("success"):
-                return f"resource '{resource_name}' uploaded!"
+                return f"resource '{os.path.basename(resource)}' uploaded!"
             else:
                 return f"could not upload, server said: '{response.get('data')}'!"
 
         except FileNotFoundError:
             return f"resource '{resource}' not found!"
 
+    def __register_resource(self, resource: str) -> requests.Response:
+        """
+        Registers a local resource at the central server, under its own name and path
+
+        :param resource: Local resource with format: [<path>/]<name>
+        :return: Central server's response
+        """
+
+        resource_path = os.path.dirname(resource)
+        resource_name = os.path.basename(resource)
+        resource_hashes = self.__generate_hashes(resource_path, resource_name)
+
+        # call central server
+        return self.rest_controller.call_server_post_resource(
+            peer_id=self.peer_id,
+            peer_ip=self.peer_ip,
+            listen_port=self.listen_port,
+            resource_path=resource_path,
+            resource_name=resource_name,
+            resource_hash=resource_hashes.resource_hash,
+            resource_size=os.path.getsize(resource),
+            transfer_mode=self.transfer_mode,
+            server_ip=self.server_ip,
+            piece_size=resource_hashes.piece_size,
+            piece_hashes=resource_hashes.piece_hashes,
+            merkle_root=resource_hashes.merkle_root
+        )
+
+    def __upload_directory(self, directory: str) -> str:
+        """
+        Uploads every resource inside a local directory (recursively) to the central server, hashing them
+        in parallel and registering them in batches
+
+        :param directory: Local directory to be published
+        :return: String response for the client at peer's main thread
+        """
+
+        resources = sorted(
+            os.path.join(path, name)
+            for path, _, names in os.walk(directory)
+            for name in names
+            if os.path.isfile(os.path.join(path, name))
+        )
+
+        if not resources:
+            return f"directory '{directory}' has no resources!"
+
+        try:
+            resources_hashes = self.hash_cache.get_many_hashes(resources)
+
+            bodies = [
+                {
+                    "peer_id": self.peer_id,
+                    "peer_ip": self.peer_ip,
+                    "peer_port": self.listen_port,
+                    "resource_path": os.path.dirname(resource),
+                    "resource_name": os.path.basename(resource),
+                    "resource_hash": resource_hashes.resource_hash,
+                    "resource_size": os.path.getsize(resource),
+                    "transfer_mode": self.transfer_mode,
+                    "piece_size": resource_hashes.piece_size,
+                    "piece_hashes": resource_hashes.piece_hashes,
+                    "merkle_root": resource_hashes.merkle_root,
+                }
+                for resource, resource_hashes in zip(resources, resources_hashes)
+            ]
+
+        except FileNotFoundError as error:
+            return f"resource '{error.filename}' not found!"
+
+        uploaded = 0
+
+        while uploaded < len(bodies):
+            # batch limited by number of resources and of piece hashes
+            batch = [bodies[uploaded]]
+            pieces = len(bodies[uploaded]["piece_hashes"])
+
+            for body in bodies[uploaded + 1:uploaded + UPLOAD_BATCH_SIZE]:
+                pieces += len(body["piece_hashes"])
+                if pieces > UPLOAD_BATCH_PIECES:
+                    break
+                batch.append(body)
+
+            # call central server
+            response = self.rest_controller.content(self.rest_controller.call_server_post_resources(
+                resources=batch,
+                server_ip=self.server_ip
+            ))
+
+            if not response.get("success"):
+                return f"{uploaded} of {len(bodies)} resources uploaded, " \
+                       f"then server said: '{response.get('data')}'!"
+
+            uploaded += len(batch)
+
+        return f"{uploaded} resources from directory '{directory}' uploaded!"
+
     def download(self, resource_name) -> str:
         """
         Downloads a resource from another peer discovered through a call to the central server
@@ -123,122 +350,293 @@ class PeerController:
         :return String response for the client at peer's main thread
         """
 
-        # call central server
-        response = self.rest_controller.call_server_get_resource(
-            resource_name=resource_name,
-            server_ip=self.server_ip
-        ).json()
+        peers_info = self.lookup_cache.get(resource_name)
 
-        if response.get("success"):
+        if peers_info is None:
+            # call central server
+            response = self.rest_controller.content(self.rest_controller.call_server_get_resource(
+                resource_name=resource_name,
+                server_ip=self.server_ip
+            ))
 
-            peer_info = json.loads(response.get("data"))
+            if not response.get("success"):
+                return f"could not download, server said: {response.get('data')}"
 
-            if not peer_info:
-                return f"no peers found for resource '{resource_name}'!"
+            peers_info = response.get("data")
+            self.lookup_cache.put(resource_name, peers_info)
 
-            peer_ip = peer_info.get("peer_ip")
-            peer_port = peer_info.get("peer_port")
-            peer_resource_path = peer_info.get("resource_path")
-            peer_resource_name = peer_info.get("resource_name")
-            peer_resource_hash = peer_info.get("resource_hash")
+        if not peers_info:
+            return f"no peers found for resource '{resource_name}'!"
 
-            resource = f"{peer_resource_path}/{peer_resource_name}"
+        sources = peers_info[:self.max_sources]
 
-            resource_data = self.__socket_download(
-                resource=resource,
-                peer_ip=peer_ip,
-                peer_port=peer_port
+        peer_ip = sources[0].get("peer_ip")
+        peer_resource_hash = sources[0].get("resource_hash")
+        peer_resource_size = sources[0].get("resource_size")
+
+        # one directory per source peer, so the resource keeps its name (and is seeded under it)
+        download_file_path = f"downloads/{peer_ip}"
+        download_file_name = resource_name
+        download_file = f"{download_file_path}/{download_file_name}"
+
+        # content already held (under another name or downloaded from another peer) is not transferred
+        held = self.content_store.find(peer_resource_hash, name=download_file_name)
+
+        # nor placed again when downloaded before, whichever peer ranks first now (and names the directory)
+        if held is not None and self.content_store.downloaded(held) and os.path.basename(held) == download_file_name:
+            return f"resource '{download_file_name}' is already at path '{os.path.relpath(os.path.dirname(held))}/'!"
+
+        os.makedirs(download_file_path, exist_ok=True)
+
+        if held is not None:
+            how = self.content_store.place(
+                source=held,
+                resource_hash=peer_resource_hash,
+                target=download_file,
+                temporary=f"partial/{peer_ip}_{download_file_name}.place"
             )
 
-            if not resource_data:
-                return f"it looks like peer '{peer_ip}:{peer_port}' is not responding, " \
-                        f"interrupting connection!"
+            if how is not None:
+                return f"resource '{download_file_name}' placed at path '{download_file_path}/' from '{held}' " \
+                       f"({how}, nothing transferred)!{self.__seed(download_file)}"
 
-            else:
+        pieces = self.__get_pieces(peer_resource_hash, peer_resource_size)
+        resume = " (verified pieces were kept, download it again to resume)" if pieces is not None else ""
+
+        try:
+            not_corrupted = self.__write_data_to_file(
+                download_file_path=download_file_path,
+                download_file_name=download_file_name,
+                sources=sources,
+                resource_size=peer_resource_size,
+                original_hash=peer_resource_hash,
+                pieces=pieces
+            )
 
-                download_file_path = "downloads"
-                download_file_name = f"{peer_ip}_{resource_name}"
+        except (socket.timeout, ConnectionError):
+            self.lookup_cache.invalidate(resource_name)
+            peers = ", ".join(f"{source.get('peer_ip')}:{source.get('peer_port')}" for source in sources)
+            return f"it looks like peers '{peers}' are not responding, interrupting connection!{resume}"
 
-                not_corrupted = self.__write_data_to_file(
-                    download_file_path=download_file_path,
-                    download_file_name=download_file_name,
-                    resource_data=resource_data,
-                    original_hash=peer_resource_hash
-                )
+        except TransferError as error:
+            self.lookup_cache.invalidate(resource_name)
+            return f"could not download, peer said: '{error}'!{resume}"
 
-                if not_corrupted:
-                    return f"resource '{download_file_name}' downloaded at path " \
-                           f"'{download_file_path}/'!"
+        except KeyboardInterrupt:
+            return f"download of resource '{resource_name}' interrupted!{resume}"
 
-                else:
-                    return f"resource '{download_file_name}' downloaded at path " \
-                           f"'{download_file_path}/' but hash is incorrect, file " \
-                           f"might be corrupted!"
+        if not_corrupted:
+            return f"resource '{download_file_name}' downloaded at path " \
+                   f"'{download_file_path}/' from {len(sources)} peer(s)!{self.__seed(download_file)}"
 
         else:
-            return f"could not download, server said: {response.get('data')}"
+            self.lookup_cache.invalidate(resource_name)
+            return f"resource '{download_file_name}' downloaded but hash is incorrect, file " \
+                   f"might be corrupted and was discarded!"
 
-    @staticmethod
-    def __generate_hash(resource_path: str, resource_name: str) -> str:
+    def __seed(self, download_file: str) -> str:
+        """
+        Registers a downloaded resource at the central server under its own name, so this peer serves it to
+        others (its hashes are already cached, so it is not hashed again)
+
+        :param download_file: Downloaded resource's path
+        :return: Remark for the download's response
+        """
+
+        if not self.seed_downloads:
+            return ""
+
+        try:
+            response = self.__register_resource(download_file)
+        except requests.exceptions.RequestException as error:
+            return f" could not seed it, central server is not responding: {error}"
+
+        if response.status_code != requests.codes.ok:
+            return f" could not seed it, server said: '{self.rest_controller.content(response).get('data')}'"
+
+        return " seeding it!"
+
+    def __generate_hashes(self, resource_path: str, resource_name: str) -> ResourceHashes:
         """
-        Generates a MD5 hash over a resource's content
+        Generates a MD5 hash over a resource's content and a SHA-256 hash over each of its pieces,
+        streamed from disk and cached until it changes
+
         :param resource_path: Resource's path
         :param resource_name: Resource's name
-        :return: MD5 hash over resource's content
+        :return: Resource's hashes
         """
 
-        md5_hash = hashlib.md5()
-
-        resource = open(f"{resource_path}/{resource_name}", "rb")
-        content = resource.read()
-        md5_hash.update(content)
+        return self.hash_cache.get_hashes(f"{resource_path}/{resource_name}")
 
-        return md5_hash.hexdigest()
+    def __get_pieces(self, resource_hash: str,
+                     resource_size: typing.Optional[int]) -> typing.Optional[PieceHashController]:
+        """
+        Gets a resource's piece hashes from the central server, checking them against their Merkle root
 
-    def __socket_download(self, resource: str, peer_ip: str, peer_port: int) -> any:
+        :param resource_hash: Resource's hash
+        :param resource_size: Resource's size in bytes
+        :return: Resource's piece hashes or None when they are unknown or inconsistent (so the resource
+        is only verified as a whole)
         """
-        Downloads a resource's data through UDP socket
 
-        :param resource: Resource identification at target peer's listen port
-        :param peer_ip: Target peer's IPV4
-        :param peer_port: Target peer's listen port
-        :return Downloaded resource's data
+        if resource_size is None:
+            return None
+
+        response = self.rest_controller.content(self.rest_controller.call_server_get_resource_metadata(
+            resource_hash=resource_hash,
+            server_ip=self.server_ip
+        ))
+
+        if not response.get("success"):
+            return None
+
+        metadata = response.get("data")
+        piece_size = metadata.get("piece_size")
+        piece_hashes = metadata.get("piece_hashes")
+
+        try:
+            if merkle.merkle_root(piece_hashes) != metadata.get("merkle_root") or \
+                    len(piece_hashes) != merkle.piece_count(resource_size, piece_size):
+                return None
+        except ValueError:
+            return None
+
+        return PieceHashController(size=resource_size, piece_size=piece_size, piece_hashes=piece_hashes)
+
+    def __socket_download(self, source: dict, offset: int, length: int) -> typing.Iterator[bytes]:
         """
+        Downloads a range of a resource's data through UDP or TCP socket
+
+        :param source: Target peer's info, as returned by the central server
+        :param offset: First byte of the desired range
+        :param length: Range's length ('0' means 'until the end of the resource')
+        :return Iterator over downloaded resource's data, in order
+        :raises socket.timeout: When target peer stops responding (while iterating)
+        :raises ConnectionError: When target peer closes the connection (while iterating)
+        :raises TransferError: When target peer reports an error (while iterating)
+        """
+
+        address = (source.get("peer_ip"), source.get("peer_port"))
+        resource = f"{source.get('resource_path')}/{source.get('resource_name')}"
+
+        if source.get("transfer_mode", "udp") == "tcp":
+            yield from tcp.download(
+                address=address,
+                resource=resource,
+                offset=offset,
+                length=length,
+                buffer_size=self.buffer_size
+            )
+            return
+
+        # peer's action socket serves one transfer at a time, concurrent ones use an ephemeral socket
+        if self.socket_lock.acquire(blocking=False):
+            transfer_socket = self.socket
+        else:
+            transfer_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            transfer_socket.bind((self.peer_ip, 0))
 
         try:
-            # ask found resource to it's related peer
-            self.socket.settimeout(10)
-            self.socket.sendto(
-                resource.encode("utf-8"),   # data
-                (peer_ip, peer_port)        # address
+            yield from udp.download(
+                sock=transfer_socket,
+                address=address,
+                resource=resource,
+                offset=offset,
+                length=length,
+                chunk_size=self.chunk_size,
+                window=self.window
             )
-            resource_data, _ = self.socket.recvfrom(10240)
-            return resource_data
 
-        except socket.timeout:
-            return None
+        finally:
+            if transfer_socket is self.socket:
+                self.socket_lock.release()
+            else:
+                transfer_socket.close()
 
-    def __write_data_to_file(self, download_file_path: str, download_file_name: str,
-                             resource_data: any, original_hash: str) -> bool:
+    def __write_data_to_file(self, download_file_path: str, download_file_name: str, sources: typing.List[dict],
+                             resource_size: typing.Optional[int], original_hash: str,
+                             pieces: typing.Optional[PieceHashController] = None) -> bool:
         """
-        Writes downloaded docket data to file at desired path
+        Writes data downloaded in parallel from every source to a partial file, hashing it as it arrives,
+        and moves it to desired path only when its hash is correct
 
         :param download_file_path: Resource path to write downloaded data
         :param download_file_name: Resource name to write downloaded data
-        :param resource_data: Resource's data downloaded through UDP socket
+        :param sources: Info of every peer that holds the resource
+        :param resource_size: Resource's size in bytes ('None' when unknown, so it comes from a single peer)
         :param original_hash: Original stored resource's data hash at central server
+        :param pieces: Resource's piece hashes, verified as pieces arrive so corrupted ones are fetched again
         :return Boolean indicating if data is corrupted or not
         """
 
-        # write received resource's data to 'downloads' directory
-        resource_file = open(f"{download_file_path}/{download_file_name}", "wb")
-        resource_file.write(resource_data)
-        resource_file.close()
+        # partial downloads are named after their content, so any peer holding it can resume them
+        partial_name = original_hash if original_hash.isalnum() else download_file_name
+        partial_file = f"partial/{partial_name}.part"
+        download_file = f"{download_file_path}/{download_file_name}"
+        downloaded_hash = None
 
-        # validate downloaded resource
-        downloaded_hash = self.__generate_hash(
-            resource_path=download_file_path,
-            resource_name=download_file_name
-        )
+        # write received resource's data to 'partial' directory, resuming it when piece hashes are known
+        if pieces is not None:
+            partial = PartialDownloadController(partial_file, pieces)
+            fd = partial.fd
+        else:
+            partial = None
+            fd = os.open(partial_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+
+        try:
+            if resource_size and partial is None:
+                os.ftruncate(fd, resource_size)
+
+            hasher = StreamingHashController(fd)
+
+            SwarmDownloadController(
+                sources=sources,
+                fetch=self.__socket_download,
+                size=resource_size,
+                segment_size=self.segment_size,
+                hasher=hasher,
+                pieces=pieces,
+                partial=partial,
+                on_drop=self.lookup_cache.invalidate_holder  # so lookups listing it are asked again
+            ).run(fd)
+
+            # validate downloaded resource (hashed while it was written)
+            downloaded_hash = hasher.hexdigest(os.fstat(fd).st_size)
+
+        finally:
+            if partial is None:
+                os.close(fd)
+
+                if downloaded_hash != original_hash:
+                    os.remove(partial_file)
+
+            elif downloaded_hash is None:
+                # interrupted: verified pieces are kept to be resumed later
+                partial.close()
+
+            elif downloaded_hash != original_hash:
+                partial.discard()
+
+        if downloaded_hash != original_hash:
+            return False
+
+        # move validated resource to 'downloads' directory
+        if partial is not None:
+            partial.finish(download_file)
+        else:
+            os.replace(partial_file, download_file)
+
+        # piece hashes are known, so a later upload of such resource does not hash it again
+        if pieces is not None:
+            stat = os.stat(download_file)
+            self.hash_cache.store(
+                path=os.path.abspath(download_file),
+                key=(stat.st_size, stat.st_mtime_ns, stat.st_ino),
+                resource_hashes=ResourceHashes(
+                    resource_hash=downloaded_hash,
+                    piece_size=pieces.piece_size,
+                    piece_hashes=pieces.piece_hashes
+                )
+            )
 
-        return original_hash == downloaded_hash
+        return True
@@ -7,22 +7,56 @@ Module that defines a controller for peer's REST operations
 
 # built-in dependencies
 import json
+import typing
 
 # external dependencies
+import msgpack
 import requests
 
+# project dependencies
+from controllers.peer.rest_client import RESTClientController
+
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "30/10/2020"
 
+MSGPACK_MIMETYPE = "application/msgpack"
+
 
 class PeerRESTController:
     """
     Controller for peer's communication with central server through REST
+
+    Every call accepts compact binary (MessagePack) responses, falling back to JSON, so callers
+    read responses through 'content'. Calls share one pooled keep-alive session, with timeouts and
+    retries (see RESTClientController)
     """
 
+    def __init__(self, client: typing.Optional[RESTClientController] = None):
+        """
+        :param client: HTTP client shared by every call (a default one when not given)
+        """
+
+        self.client = client if client is not None else RESTClientController()
+
     @staticmethod
-    def call_server_post_resource(peer_id: str, peer_ip: str, listen_port: int, resource_path: str,
-                                  resource_name: str, resource_hash: str,  server_ip: str) -> requests.Response:
+    def content(response: requests.Response) -> dict:
+        """
+        Decodes a central server's response, whichever representation it was sent with
+
+        :param response: Central server's response
+        :return: Decoded response, with 'success' and 'data' fields
+        """
+
+        if response.headers.get("content-type", "").startswith(MSGPACK_MIMETYPE):
+            return msgpack.unpackb(response.content, raw=False)
+
+        return response.json()
+
+    def call_server_post_resource(self, peer_id: str, peer_ip: str, listen_port: int, resource_path: str,
+                                  resource_name: str, resource_hash: str, resource_size: int,
+                                  transfer_mode: str, server_ip: str, piece_size: typing.Optional[int] = None,
+                                  piece_hashes: typing.Optional[typing.List[str]] = None,
+                                  merkle_root: typing.Optional[str] = None) -> requests.Response:
         """
         Call central server to register a resource and assign to the caller peer
 
@@ -32,7 +66,12 @@ class PeerRESTController:
         :param resource_path: Resource's path provided by the caller peer
         :param resource_name: Resource's name provided by the caller peer
         :param resource_hash: Resource's hash provided by the caller peer
+        :param resource_size: Resource's size in bytes provided by the caller peer
+        :param transfer_mode: Transfer mode served by the caller peer ('udp' or 'tcp')
         :param server_ip: Central server's IPV4
+        :param piece_size: Size of each resource's piece in bytes
+        :param piece_hashes: SHA-256 hash of every resource's piece, in order
+        :param merkle_root: Merkle root over piece hashes
         :return: Central server's response
         """
 
@@ -43,20 +82,44 @@ class PeerRESTController:
             "resource_path": resource_path,
             "resource_name": resource_name,
             "resource_hash": resource_hash,
+            "resource_size": resource_size,
+            "transfer_mode": transfer_mode,
+            "piece_size": piece_size,
+            "piece_hashes": piece_hashes,
+            "merkle_root": merkle_root,
         }
         header = {
-            "content-type": "application/json; charset=utf-8"
+            "content-type": "application/json; charset=utf-8",
+            "accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.5"
         }
-        return requests.post(
+        return self.client.post(
             f"http://{server_ip}:5000/resource",
             data=json.dumps(body),
             headers=header
         )
 
-    @staticmethod
-    def call_server_get_resource(resource_name: str, server_ip: str) -> requests.Response:
+    def call_server_post_resources(self, resources: typing.List[dict], server_ip: str) -> requests.Response:
+        """
+        Call central server to register many resources at once (in a single transaction)
+
+        :param resources: Resources' bodies, each one with the same fields sent by 'call_server_post_resource'
+        :param server_ip: Central server's IPV4
+        :return: Central server's response
+        """
+
+        header = {
+            "content-type": "application/json; charset=utf-8",
+            "accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.5"
+        }
+        return self.client.post(
+            f"http://{server_ip}:5000/resource",
+            data=json.dumps(resources),
+            headers=header
+        )
+
+    def call_server_get_resource(self, resource_name: str, server_ip: str) -> requests.Response:
         """
-        Call central server to search peer's info that contains a resource through its name
+        Call central server to search info of every peer that holds a resource through its name
 
         :param resource_name: Resource provided by the caller peer
         :param server_ip: Central server's IPV4
@@ -66,21 +129,67 @@ class PeerRESTController:
             "resource_name": resource_name
         }
         header = {
-            "content-type": "application/json; charset=utf-8"
+            "content-type": "application/json; charset=utf-8",
+            "accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.5"
         }
-        return requests.get(
+        return self.client.get(
             f"http://{server_ip}:5000/resource",
             data=json.dumps(body),
             headers=header
         )
 
-    @staticmethod
-    def call_server_get_all_resources(server_ip: str) -> requests.Response:
+    def call_server_get_resource_metadata(self, resource_hash: str, server_ip: str) -> requests.Response:
+        """
+        Call central server to get a resource's piece size, Merkle root and piece hashes
+
+        :param resource_hash: Resource's hash
+        :param server_ip: Central server's IPV4
+        :return: Central server's response
+        """
+
+        body = {
+            "resource_hash": resource_hash
+        }
+        header = {
+            "content-type": "application/json; charset=utf-8",
+            "accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.5"
+        }
+        return self.client.get(
+            f"http://{server_ip}:5000/resource/metadata",
+            data=json.dumps(body),
+            headers=header
+        )
+
+    def call_server_search(self, query: str, server_ip: str, limit: typing.Optional[int] = None,
+                           offset: int = 0) -> requests.Response:
         """
-        Call central server to list all available resources
+        Call central server to search resources' names by prefix, substring or similarity
 
+        :param query: Searched text
         :param server_ip: Central server's IPV4
+        :param limit: Maximum number of results (server's default when not given)
+        :param offset: Number of best results skipped ('next' of the previous page)
         :return: Central server's response
         """
 
-        return requests.get(f"http://{server_ip}:5000/resource")
+        params = {"q": query, "offset": offset}
+        if limit is not None:
+            params["limit"] = limit
+
+        header = {
+            "accept": f"{MSGPACK_MIMETYPE}, application/json;q=0.5"
+        }
+        return self.client.get(f"http://{server_ip}:5000/search", params=params, headers=header)
+
+    def call_server_stream_all_resources(self, server_ip: str) -> requests.Response:
+        """
+        Call central server to stream every available resource, one JSON document per line (NDJSON)
+
+        :param server_ip: Central server's IPV4
+        :return: Central server's streamed response (body is read while iterated)
+        """
+
+        header = {
+            "accept": "application/x-ndjson"
+        }
+        return self.client.get(f"http://{server_ip}:5000/resource", headers=header, stream=True)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for peer's HTTP connections to the central server
+"""
+
+# built-in dependencies
+import random
+import threading
+import time
+import typing
+
+# external dependencies
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import (
+    MaxRetryError,
+    NewConnectionError
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_TIMEOUT = (3.05, 10)  # seconds to connect, seconds between bytes of the response
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.25  # seconds, doubled at every retry
+DEFAULT_MAX_BACKOFF = 8
+DEFAULT_POOL_SIZE = 8
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class RESTClientController:
+    """
+    Controller for a pooled keep-alive HTTP session with timeouts and retries
+
+    Failed calls are retried with exponential backoff and full jitter (a random delay up to the
+    exponential bound, so peers that lost the server together do not retry together). Non-idempotent
+    calls are only retried when the connection could not even be established, so a request the
+    server may have processed is never repeated.
+    """
+
+    def __init__(self, timeout: typing.Union[float, typing.Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF, pool_size: int = DEFAULT_POOL_SIZE,
+                 stop_event: typing.Optional[threading.Event] = None):
+        """
+        :param timeout: Seconds to connect and between bytes of the response (or a single value for both)
+        :param retries: Retries after a failed call
+        :param backoff: Upper bound of the first retry's delay, doubled at every retry
+        :param max_backoff: Upper bound of any retry's delay
+        :param pool_size: Connections kept alive to the server
+        :param stop_event: Event that interrupts retries' delays (e.g. owner thread's stop event)
+        """
+
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stop_event = stop_event
+
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, idempotent: bool = False, **kwargs) -> requests.Response:
+        return self.request("POST", url, idempotent=idempotent, **kwargs)
+
+    def request(self, method: str, url: str, idempotent: typing.Optional[bool] = None,
+                **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session, retrying it on connection failures and timeouts
+
+        :param method: HTTP method
+        :param url: Request's URL
+        :param idempotent: Whether the call may be repeated safely (defaults to the method's semantics)
+        :param kwargs: Other 'requests' arguments
+        :return: Server's response
+        :raises requests.exceptions.RequestException: Last failure, when every retry failed
+        """
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+
+        while True:
+            try:
+                return self.session.request(method, url, **kwargs)
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                if attempt >= self.retries or not (idempotent or self.__not_connected(error)):
+                    raise
+
+            # full jitter
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            attempt += 1
+
+            if self.stop_event is not None:
+                if self.stop_event.wait(delay):
+                    raise requests.exceptions.ConnectionError("stopped while retrying")
+            else:
+                time.sleep(delay)
+
+    def close(self) -> None:
+        """
+        Closes every pooled connection
+        """
+
+        self.session.close()
+
+    @staticmethod
+    def __not_connected(error: requests.exceptions.RequestException) -> bool:
+        """
+        :param error: Failure of a call
+        :return: Whether the request never reached the server (connection was not established)
+        """
+
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+
+        reason = error.args[0] if error.args else None
+        return isinstance(reason, MaxRetryError) and isinstance(reason.reason, NewConnectionError)
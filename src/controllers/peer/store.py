@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for the content-addressed view over peer's local resources
+
+Every resource this peer uploaded or downloaded is indexed by its hash at the hash cache, so content
+already held (under another name, or downloaded from another peer) is found by its hash and placed at a
+new path without any transfer: as a reflink (copy-on-write clone, where the filesystem supports it), as
+a hardlink (when the content lives under 'downloads', whose files peers do not change) or else as a local
+copy
+"""
+
+# built-in dependencies
+import errno
+import os
+import shutil
+import typing
+
+# project dependencies
+from controllers.peer.hashing import HashCacheController
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+FICLONE = 0x40049409  # Linux's ioctl that clones a whole file (btrfs, XFS, ...)
+
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+COPY = "copy"
+
+
+def reflink(source: str, target: str) -> bool:
+    """
+    Clones a file sharing its blocks until either copy is written (copy-on-write)
+
+    :param source: Source file's path
+    :param target: New file's path
+    :return: Whether the file was cloned (False when the platform or filesystem does not support it)
+    """
+
+    try:
+        import fcntl
+    except ImportError:  # not a Unix platform
+        return False
+
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        try:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+            return True
+
+        except OSError as error:
+            if error.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                raise
+
+    os.remove(target)
+    return False
+
+
+class ContentStoreController:
+    """
+    Controller for peer's local resources addressed by their content's hash
+    """
+
+    def __init__(self, hash_cache: HashCacheController, downloads_directory: str = "downloads"):
+        """
+        :param hash_cache: Hash cache, whose entries index local resources by hash
+        :param downloads_directory: Directory of downloaded resources (one subdirectory per source peer), which
+        may be hardlinked
+        """
+
+        self.hash_cache = hash_cache
+        self.downloads_directory = os.path.abspath(downloads_directory)
+
+    def find(self, resource_hash: str, name: typing.Optional[str] = None) -> typing.Optional[str]:
+        """
+        :param resource_hash: Content's hash
+        :param name: File name of the resources preferred among the ones with such content
+        :return: Path of a local resource with such content, unchanged since it was hashed, or None
+        """
+
+        return self.hash_cache.find(resource_hash, name=name)
+
+    def downloaded(self, path: str) -> bool:
+        """
+        :param path: Local resource's absolute path
+        :return: Whether it lives under the downloads directory
+        """
+
+        return os.path.commonpath([path, self.downloads_directory]) == self.downloads_directory
+
+    def place(self, source: str, resource_hash: str, target: str, temporary: str) -> typing.Optional[str]:
+        """
+        Places content held locally at a new path, without transferring it
+
+        :param source: Local resource holding such content, as found by 'find'
+        :param resource_hash: Content's hash
+        :param target: New path
+        :param temporary: Path where the content is placed before it is moved to the new path
+        :return: How it was placed ('reflink', 'hardlink' or 'copy') or None when the local resource
+        changed since it was found
+        """
+
+        if os.path.exists(temporary):  # left by an interrupted placement
+            os.remove(temporary)
+
+        before = os.stat(source)
+
+        if self.downloaded(source):
+            os.link(source, temporary)
+            how = HARDLINK
+        elif reflink(source, temporary):
+            how = REFLINK
+        else:
+            shutil.copyfile(source, temporary)  # kernel-side copy where available
+            how = COPY
+
+        # source's hashes are cached unless it changed since it was indexed (then it is hashed again)
+        after = os.stat(source)
+        source_hashes = self.hash_cache.get_hashes(source)
+
+        if (after.st_size, after.st_mtime_ns, after.st_ino) != (before.st_size, before.st_mtime_ns, before.st_ino) \
+                or source_hashes.resource_hash != resource_hash:
+            os.remove(temporary)
+            return None
+
+        os.replace(temporary, target)
+
+        # placed resource's hashes are the source's, so it is neither hashed again nor missing at the index
+        stat = os.stat(target)
+        self.hash_cache.store(
+            path=os.path.abspath(target),
+            key=(stat.st_size, stat.st_mtime_ns, stat.st_ino),
+            resource_hashes=source_hashes
+        )
+
+        return how
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for multi-source (swarm) downloads
+"""
+
+# built-in dependencies
+import collections
+import os
+import socket
+import threading
+import typing
+
+# project dependencies
+from controllers.peer.hashing import (
+    PieceCheckController,
+    PieceHashController,
+    StreamingHashController
+)
+from controllers.peer.partial import PartialDownloadController
+from protocol.base import TransferError
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_SEGMENT_SIZE = 1024 * 1024
+DEFAULT_MAX_SOURCES = 8
+MAX_DUPLICATES = 2  # maximum number of sources fetching the same segment at the end of a download
+MAX_BAD_PIECES = 2  # corrupted pieces tolerated from a single source before dropping it
+
+# errors that make a source be dropped from the swarm
+SOURCE_ERRORS = (socket.timeout, ConnectionError, TransferError, OSError)
+
+Segment = typing.Tuple[int, int]  # (offset, length), a length of '0' means 'until the end'
+Fetch = typing.Callable[[dict, int, int], typing.Iterator[bytes]]
+
+
+class SwarmDownloadController:
+    """
+    Controller for downloading disjoint byte ranges of a resource from several seeders in parallel
+
+    Every source has its own worker, which keeps pulling the next pending segment, so fast sources
+    naturally take more segments than slow ones. Segments of a failing source go back to the queue
+    (and the source is dropped), and once the queue is empty idle workers duplicate the segments that
+    are still in flight, so a straggler does not hold the whole download (duplicates keep their data in
+    memory and only write it if they complete the segment first). When piece hashes are known,
+    segments are aligned to pieces, every piece is verified as it lands and only corrupted pieces are
+    queued again. With a partial download, only pieces missing from it are fetched and every verified
+    piece is marked at its bitmap.
+    """
+
+    def __init__(self, sources: typing.List[dict], fetch: Fetch, size: typing.Optional[int],
+                 segment_size: int = DEFAULT_SEGMENT_SIZE, hasher: typing.Optional[StreamingHashController] = None,
+                 pieces: typing.Optional[PieceHashController] = None,
+                 partial: typing.Optional[PartialDownloadController] = None,
+                 on_drop: typing.Optional[typing.Callable[[dict], None]] = None):
+        """
+        :param sources: Seeders' info, as returned by the central server
+        :param fetch: Callable that receives (source, offset, length) and returns an iterator over the
+        range's data, in order
+        :param size: Resource's size in bytes ('None' when unknown, which disables ranges)
+        :param segment_size: Size of each range requested to a single source
+        :param hasher: Controller that hashes data as it is written
+        :param pieces: Resource's piece hashes (requires a known size)
+        :param partial: Partial download to resume (requires piece hashes)
+        :param on_drop: Called with every source dropped after failing (possibly after 'run' returned,
+        by a worker that was stuck at it)
+        """
+
+        self.fetch = fetch
+        self.on_drop = on_drop
+        self.hasher = hasher
+        self.pieces = pieces if size is not None else None
+        self.partial = partial if self.pieces is not None else None
+
+        if size is None:
+            # whole resource from a single source
+            self.sources = sources[:1]
+            segments = [(0, 0)]
+        else:
+            if self.pieces is not None:
+                # whole pieces per segment
+                piece_size = self.pieces.piece_size
+                segment_size = max(piece_size, segment_size // piece_size * piece_size)
+
+            self.sources = sources
+            missing_ranges = self.partial.ranges(verified=False) if self.partial is not None else [(0, size)]
+            segments = [
+                (offset, min(segment_size, start + length - offset))
+                for start, length in missing_ranges
+                for offset in range(start, start + length, segment_size)
+            ]
+
+        self.condition = threading.Condition()
+        self.pending = collections.deque(segments)
+        self.missing = set(segments)  # segments not downloaded yet (pending or in flight)
+        self.active = collections.Counter()  # segment -> number of workers fetching it
+        self.errors = list()
+        self.cancelled = False
+        self.verifying = threading.Lock()  # held while verified ranges are hashed or marked
+        self.writing = threading.Lock()  # held while a segment is checked as missing and written
+
+        # set when running
+        self.fd = None
+        self.running = 0
+
+    def run(self, fd: int) -> None:
+        """
+        Downloads every segment, writing it at its offset of an open file
+
+        Returns as soon as every segment is complete, without waiting for workers still stuck at a
+        slow or dead source (they hold their own duplicate of the file descriptor, closed by the last
+        one to leave, but never write to a complete segment). When interrupted, workers stop at their
+        next chunk.
+
+        :param fd: File descriptor open for writing
+        :raises socket.timeout|ConnectionError|TransferError|OSError: Last source's error when every
+        source failed before the download was complete
+        """
+
+        self.fd = os.dup(fd)
+        self.running = len(self.sources)
+
+        # ranges verified before resuming are only hashed (read back) as the hashed frontier reaches them
+        if self.partial is not None and self.hasher is not None:
+            for offset, length in self.partial.ranges(verified=True):
+                self.hasher.complete(offset, offset + length)
+
+        for source in self.sources:
+            threading.Thread(target=self.__work, args=(source,), daemon=True).start()
+
+        with self.condition:
+            try:
+                while self.missing and self.running:
+                    self.condition.wait()
+
+            except BaseException:
+                # e.g. KeyboardInterrupt at peer's CLI, caller's files must not be touched afterwards
+                with self.verifying, self.writing:
+                    self.cancelled = True
+                self.condition.notify_all()
+                raise
+
+            if not self.missing:
+                return
+
+        if self.errors:
+            raise self.errors[-1]
+        raise TransferError("no sources available")
+
+    def __work(self, source: dict) -> None:
+        """
+        Worker's loop for a single source
+
+        :param source: Seeder's info
+        """
+
+        bad_pieces = 0
+
+        try:
+            while True:
+                picked = self.__next_segment()
+
+                if picked is None:
+                    return
+
+                segment, duplicate = picked
+                offset, length = segment
+                position = offset
+                completed = False
+                buffer = bytearray() if duplicate else None
+                checker = self.pieces.checker(offset) if self.pieces is not None else None
+                data_iterator = self.fetch(source, offset, length)
+
+                try:
+                    for data in data_iterator:
+                        if buffer is not None:
+                            # another worker finished it first or download was interrupted
+                            if segment not in self.missing or self.cancelled:
+                                break
+                            buffer += data
+
+                        else:
+                            with self.writing:
+                                if segment not in self.missing or self.cancelled:
+                                    break
+
+                                os.pwrite(self.fd, data, position)
+                                if checker is None and self.hasher is not None:
+                                    # unverified data is only hashed live when there are no pieces to verify
+                                    self.hasher.update(position, data)
+
+                        if checker is not None:
+                            checker.update(data)
+                        position += len(data)
+
+                    else:
+                        if length and position - offset != length:
+                            raise ConnectionError(f"source sent {position - offset} of {length} bytes")
+                        completed = True
+
+                except SOURCE_ERRORS as error:
+                    self.__drop(source, error)
+                    return
+
+                finally:
+                    data_iterator.close()
+                    self.__release(segment, completed, checker, buffer)
+
+                if checker is not None and checker.bad:
+                    bad_pieces += len(checker.bad)
+
+                    if bad_pieces > MAX_BAD_PIECES:
+                        self.__drop(source, TransferError(f"peer sent {bad_pieces} corrupted pieces"))
+                        return
+
+        finally:
+            with self.condition:
+                self.running -= 1
+                if not self.running:
+                    os.close(self.fd)
+                self.condition.notify_all()
+
+    def __drop(self, source: dict, error: Exception) -> None:
+        """
+        Drops a failing source from the swarm
+
+        :param source: Seeder's info
+        :param error: Source's error
+        """
+
+        self.errors.append(error)
+
+        if self.on_drop is not None:
+            self.on_drop(source)
+
+    def __next_segment(self) -> typing.Optional[typing.Tuple[Segment, bool]]:
+        """
+        Picks the next segment for a worker, waiting while every in-flight segment is already duplicated
+
+        :return: Next segment and whether another worker is already fetching it, or None when there is
+        nothing left to download
+        """
+
+        with self.condition:
+            while True:
+                if self.cancelled:
+                    return None
+
+                if self.pending:
+                    segment = self.pending.popleft()
+                    duplicate = False
+
+                else:
+                    # end game: duplicate the in-flight segment with fewer workers
+                    candidates = [
+                        segment for segment, workers in self.active.items()
+                        if workers < MAX_DUPLICATES and segment in self.missing
+                    ]
+
+                    if not candidates:
+                        if not self.missing:
+                            return None
+                        self.condition.wait()
+                        continue
+
+                    segment = min(candidates, key=lambda candidate: self.active[candidate])
+                    duplicate = True
+
+                self.active[segment] += 1
+                return segment, duplicate
+
+    def __release(self, segment: Segment, completed: bool, checker: typing.Optional[PieceCheckController],
+                  buffer: typing.Optional[bytearray]) -> None:
+        """
+        Releases a worker's segment, queueing again what is still missing and nobody else is fetching
+
+        :param segment: Worker's segment
+        :param completed: Whether worker fetched the whole segment
+        :param checker: Segment's piece checker (if piece hashes are known)
+        :param buffer: Segment's data, if worker was a duplicate (not written yet)
+        """
+
+        verified = list()
+        verified_pieces = list()
+        landed = False
+
+        with self.condition:
+            self.active[segment] -= 1
+            if not self.active[segment]:
+                del self.active[segment]
+
+            if self.cancelled:
+                completed = False
+
+            if completed and segment in self.missing:
+                # completing a segment and writing to it are mutually exclusive, so nothing is written
+                # to a segment once it is complete (not even after 'run' returned)
+                with self.writing:
+                    landed = buffer is None or self.__land(segment, buffer)
+                    if landed:
+                        self.missing.discard(segment)
+
+            if landed:
+                verified = [segment]
+
+                if checker is not None:
+                    verified_pieces = checker.good
+
+                if checker is not None and checker.bad:
+                    # only corrupted pieces are downloaded again
+                    verified = [self.pieces.piece_range(index) for index in checker.good]
+                    corrupted = [self.pieces.piece_range(index) for index in checker.bad]
+
+                    self.missing.update(corrupted)
+                    self.pending.extendleft(corrupted)
+
+            elif segment in self.missing and segment not in self.active:
+                self.pending.appendleft(segment)
+
+            self.condition.notify_all()
+
+        with self.verifying:
+            if self.cancelled:
+                return
+
+            if self.partial is not None:
+                for index in verified_pieces:
+                    self.partial.mark(index)
+
+            if self.hasher is not None:
+                for offset, length in verified:
+                    self.hasher.complete(offset, offset + length)
+
+    def __land(self, segment: Segment, buffer: bytearray) -> bool:
+        """
+        Writes a duplicate's data over whatever the other worker wrote to the segment so far
+
+        :param segment: Duplicated segment
+        :param buffer: Duplicate's data
+        :return: Whether data was written (without pieces, it is not when it differs from bytes
+        already hashed live)
+        """
+
+        offset, _ = segment
+
+        if self.pieces is None and self.hasher is not None:
+            hashed = min(max(self.hasher.frontier - offset, 0), len(buffer))
+            if hashed and os.pread(self.fd, hashed, offset) != buffer[:hashed]:
+                return False
+
+        os.pwrite(self.fd, buffer, offset)
+        return True
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller that profiles a fraction of the calls of an operation (central server's
+requests, peer's downloads and uploads), aggregating them to disk
+
+Two methods are available:
+
+- 'cprofile': deterministic profile of the calling thread, aggregated as '<directory>/<operation>.prof'
+  (read with 'python -m pstats' or snakeviz)
+- 'sampler': samples the stacks of the calling thread and of every thread started meanwhile (e.g. a
+  download's source threads) every few milliseconds, aggregated as '<directory>/<operation>.folded', one
+  stack per line with its samples (read with flamegraph.pl or speedscope). Calls shorter than the
+  sampling interval (most requests) are better profiled by 'cprofile'
+
+Callers only go through the controller while its rate is above zero, so it costs nothing when off
+"""
+
+# built-in dependencies
+import atexit
+import collections
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import typing
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+CPROFILE = "cprofile"
+SAMPLER = "sampler"
+METHODS = (CPROFILE, SAMPLER)
+
+# environment variables read at startup
+RATE_VARIABLE = "P2P_PROFILE"  # fraction of calls profiled, e.g. '0.05'
+METHOD_VARIABLE = "P2P_PROFILE_METHOD"
+DIRECTORY_VARIABLE = "P2P_PROFILE_DIR"
+
+DEFAULT_DIRECTORY = "profiles"
+DEFAULT_INTERVAL = 0.005  # seconds between two stack samples
+FLUSH_INTERVAL = 5  # seconds between two writes of the aggregated profiles
+
+
+class ProfilerController:
+    """
+    Controller for sampled profiles of named operations
+    """
+
+    def __init__(self, rate: float = 0, method: str = CPROFILE, directory: str = DEFAULT_DIRECTORY,
+                 interval: float = DEFAULT_INTERVAL):
+        """
+        :param rate: Fraction of calls profiled ('0' means off)
+        :param method: Profiling method, one of 'METHODS'
+        :param directory: Directory where aggregated profiles are written
+        :param interval: Seconds between two stack samples ('sampler' method)
+        """
+
+        self.rate = 0.0
+        self.method = CPROFILE
+        self.directory = directory
+        self.interval = interval
+
+        # operation's name -> aggregated profile, until written to disk
+        self.profiles = dict()  # type: typing.Dict[str, pstats.Stats]
+        self.stacks = collections.defaultdict(collections.Counter)  # type: typing.Dict[str, collections.Counter]
+        self.samplers = set()  # sampler threads' idents, never sampled themselves
+        self.profiled = 0
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+        self.configure(rate, method)
+
+        # profiles gathered since the latest write are written at exit
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_environment(cls, default_method: str = CPROFILE) -> "ProfilerController":
+        """
+        :param default_method: Profiling method when the environment does not choose one
+        :return: Profiler configured by the environment variables 'P2P_PROFILE', 'P2P_PROFILE_METHOD' and
+        'P2P_PROFILE_DIR' (off when unset)
+        :raises ValueError: When the environment holds an invalid rate or method
+        """
+
+        return cls(
+            rate=float(os.environ.get(RATE_VARIABLE, 0)),
+            method=os.environ.get(METHOD_VARIABLE, default_method),
+            directory=os.environ.get(DIRECTORY_VARIABLE, DEFAULT_DIRECTORY)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def configure(self, rate: float, method: typing.Optional[str] = None) -> None:
+        """
+        Changes the fraction of calls profiled and the profiling method, writing what was profiled so far
+
+        :param rate: Fraction of calls profiled ('0' means off)
+        :param method: Profiling method, one of 'METHODS' (unchanged when None)
+        :raises ValueError: When the rate is not between 0 and 1 or the method is unknown
+        """
+
+        if not 0 <= rate <= 1:
+            raise ValueError(f"profiling rate must be between 0 and 1, not {rate}")
+
+        if method is not None and method not in METHODS:
+            raise ValueError(f"profiling method must be one of {', '.join(METHODS)}, not '{method}'")
+
+        self.flush()
+
+        self.rate = rate
+        self.method = method or self.method
+
+    def status(self) -> dict:
+        """
+        :return: Current configuration and number of calls profiled since startup
+        """
+
+        return {
+            "rate": self.rate,
+            "method": self.method,
+            "directory": os.path.abspath(self.directory),
+            "profiled": self.profiled,
+        }
+
+    def wrap(self, name: str, function: typing.Callable) -> typing.Callable:
+        """
+        :param name: Operation's name, naming its aggregated profile's file
+        :param function: Operation
+        :return: Operation that profiles a fraction of its calls
+        """
+
+        def profiled(*args, **kwargs):
+            return self.call(name, function, *args, **kwargs)
+
+        profiled.__wrapped__ = function
+        return profiled
+
+    def call(self, name: str, function: typing.Callable, *args, **kwargs) -> typing.Any:
+        """
+        Calls an operation, profiling it with a probability of the configured rate
+
+        :param name: Operation's name, naming its aggregated profile's file
+        :param function: Operation
+        :return: Operation's result
+        """
+
+        if random.random() >= self.rate:
+            return function(*args, **kwargs)
+
+        try:
+            if self.method == SAMPLER:
+                return self.__sample(name, function, *args, **kwargs)
+
+            return self.__profile(name, function, *args, **kwargs)
+
+        finally:
+            if time.monotonic() - self.flushed_at >= FLUSH_INTERVAL:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes every aggregated profile to disk (each file holds every call profiled since startup)
+        """
+
+        with self.lock:
+            self.flushed_at = time.monotonic()
+
+            if not self.profiles and not self.stacks:
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+
+            for name, profile in self.profiles.items():
+                path = os.path.join(self.directory, f"{name}.prof")
+                profile.dump_stats(f"{path}.tmp")
+                os.replace(f"{path}.tmp", path)
+
+            for name, stacks in self.stacks.items():
+                if not stacks:  # every call ended before its first sample
+                    continue
+
+                path = os.path.join(self.directory, f"{name}.folded")
+
+                with open(f"{path}.tmp", "w") as folded:
+                    folded.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+                os.replace(f"{path}.tmp", path)
+
+    def __profile(self, name: str, function: typing.Callable, *args, **kwargs) -> typing.Any:
+        """
+        Calls an operation under cProfile (calling thread only), adding its profile to the operation's
+        """
+
+        profile = cProfile.Profile()
+
+        try:
+            return profile.runcall(function, *args, **kwargs)
+
+        finally:
+            stats = pstats.Stats(profile)
+
+            with self.lock:
+                if name in self.profiles:
+                    self.profiles[name].add(stats)
+                else:
+                    self.profiles[name] = stats
+
+                self.profiled += 1
+
+    def __sample(self, name: str, function: typing.Callable, *args, **kwargs) -> typing.Any:
+        """
+        Calls an operation while a thread samples the stacks of the calling thread and of every thread
+        started meanwhile, adding them to the operation's
+        """
+
+        caller = threading.get_ident()
+        before = set(sys._current_frames())
+        done = threading.Event()
+        stacks = collections.Counter()
+
+        def sample() -> None:
+            while not done.wait(self.interval):
+                for ident, frame in sys._current_frames().items():
+                    if ident == caller or (ident not in before and ident not in self.samplers):
+                        stacks[_fold(frame)] += 1
+
+        sampler = threading.Thread(target=sample, name="profiler", daemon=True)
+        sampler.start()
+        self.samplers.add(sampler.ident)
+
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            done.set()
+            sampler.join()
+            self.samplers.discard(sampler.ident)
+
+            with self.lock:
+                self.stacks[name].update(stacks)
+                self.profiled += 1
+
+
+def _fold(frame) -> str:
+    """
+    :return: Stack of a frame, outermost call first, as 'function (file:line);...'
+    """
+
+    calls = list()
+
+    while frame is not None:
+        code = frame.f_code
+        calls.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+
+    return ";".join(reversed(calls))
@@ -15,8 +15,14 @@ import marshmallow
 
 # project dependencies
 from controllers.server.utils import response
+from controllers.server.utils.metrics import get_metrics_registry_controller
+from protocol import heartbeat
 from schema.heartbeat import PostHeartbeatSchema
-from threads.server.heartbeat import ServerHeartBeatThread
+from threads.server.heartbeat import (
+    ServerHeartBeatThread,
+    ServerSharedHeartBeatThread
+)
+from threads.server.listen import ServerHeartBeatListenThread
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "30/10/2020"
@@ -29,13 +35,16 @@ class HeartBeatController(flask_restful.Resource):
 
     get_schema = PostHeartbeatSchema()
 
-    threads = list()  # list of opened threads (one thread per caller peer)
-    peer_map = dict()  # structure to map every caller peer's id to a queue for thread communication
+    # single thread that monitors every caller peer's deadline
+    monitor = ServerHeartBeatThread()  # type: typing.Union[ServerHeartBeatThread, ServerSharedHeartBeatThread]
+    listener = None  # type: typing.Optional[ServerHeartBeatListenThread]
+
+    metrics = get_metrics_registry_controller()
 
     @classmethod
     def post(cls) -> typing.Tuple:
         """
-        Manipulates a heartbeat thread for the caller peer
+        Refreshes the caller peer's deadline at the heartbeat monitor
 
         :return: Tuple which contains a message for the peer and a relevant HTTP status code
         """
@@ -49,59 +58,61 @@ class HeartBeatController(flask_restful.Resource):
             # request's body validation through marshmallow
             body_data = cls.get_schema.load(body)
 
-            peer_id = str(body_data.get("peer_id"))
+            # peer's load, when reported, ranks it among the holders of its resources
+            load = None
+            if "active_uploads" in body_data:
+                load = (body_data.get("active_uploads"), body_data.get("upload_rate", 0))
 
-            if peer_id not in cls.peer_map.keys():  # new peer
-                new_queue = list()
+            # tell heartbeat monitor that a request has arrived
+            cls.monitor.beat(str(body_data.get("peer_id")), load)
+            cls.metrics.increment("p2p_heartbeats_total", (("transport", "rest"),))
 
-                # tell heartbeat thread that a request has arrived
-                new_queue.append(1)
+            return response.ok(data="Ok")
 
-                # create a new 'peer x queue' association at map
-                cls.peer_map.update({
-                    peer_id: new_queue
-                })
+        except marshmallow.ValidationError as error:
+            return response.unprocessable_entity(data=error.messages)
 
-                # start heartbeat thread for caller peer's ip
-                server_heart_beat_thread = ServerHeartBeatThread(
-                    peer_id=peer_id,
-                    my_queue=new_queue
-                )
-                cls.threads.append(server_heart_beat_thread)
-                server_heart_beat_thread.start()
+    @classmethod
+    def share_monitor(cls) -> None:
+        """
+        Monitor peers' deadlines at the database instead of process' memory, so every server's process
+        shares them (must be called before the monitor is started)
+        """
 
-            else:  # old peer
+        cls.monitor = ServerSharedHeartBeatThread()
 
-                # get peer's queue at map
-                peer_queue = cls.peer_map.get(peer_id)
+    @classmethod
+    def start_monitor(cls) -> None:
+        """
+        Start central server's heartbeat monitor thread
+        """
 
-                # when thread finishes, it produces a `0` at its queue
-                # this code is reachable when peer restarts communications
-                # it starts a new thread for old disconnected peer
-                if 0 in peer_queue:
-                    server_heart_beat_thread = ServerHeartBeatThread(
-                        peer_id=peer_id,
-                        my_queue=peer_queue
-                    )
-                    cls.threads.append(server_heart_beat_thread)
-                    server_heart_beat_thread.start()
+        cls.monitor.start()
 
-                # tell heartbeat thread that a request has arrived
-                peer_queue.append(1)
+    @classmethod
+    def start_listener(cls, ip: str, port: int = heartbeat.DEFAULT_PORT, reuse_port: bool = False) -> None:
+        """
+        Start central server's UDP heartbeat listen thread, which feeds the same heartbeat monitor
 
-            return response.ok(data="Ok")
+        :param ip: IPV4 to listen at
+        :param port: UDP port to listen at
+        :param reuse_port: Whether other server's processes listen at the same port
+        """
 
-        except marshmallow.ValidationError as error:
-            return response.unprocessable_entity(data=str(error.messages))
+        cls.listener = ServerHeartBeatListenThread(cls.monitor, ip, port, reuse_port)
+        cls.listener.start()
 
     @classmethod
-    def stop_threads(cls) -> None:
+    def stop_monitor(cls) -> None:
         """
-        Stop all central server's heartbeat threads
+        Stop central server's heartbeat monitor thread
         """
 
         print("\nstopping threads ...")
 
-        for t in cls.threads:
-            t.stop()
-            t.join()
+        if cls.listener is not None:
+            cls.listener.stop()
+            cls.listener.join()
+
+        cls.monitor.stop()
+        cls.monitor.join()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for '/resource/metadata' route
+"""
+
+# built-in dependencies
+import typing
+
+# external dependencies
+import flask
+import flask_restful
+import marshmallow
+
+# project dependencies
+from controllers.database.database import get_database_resource_table_controller
+from controllers.server.utils import response
+from schema.metadata import GetResourceMetadataSchema
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+PIECE_HASH_LENGTH = 64  # hexadecimal SHA-256
+
+
+class ResourceMetadataController(flask_restful.Resource):
+    """
+    Controller for '/resource/metadata' route
+    """
+
+    get_schema = GetResourceMetadataSchema()
+
+    db_access = get_database_resource_table_controller()
+
+    @classmethod
+    def get(cls) -> typing.Tuple:
+        """
+        Retrieve a resource's piece size, Merkle root and piece hashes
+
+        :return: Tuple which contains resource's metadata and a relevant HTTP status code
+        """
+
+        body = flask.request.get_json()
+
+        if not body:
+            return response.bad_request(data="Request needs a body, but none encountered.")
+
+        try:
+            # request's body validation through marshmallow
+            body_data = cls.get_schema.load(body)
+
+            # call database
+            metadata = cls.db_access.get_metadata(resource_hash=str(body_data.get("resource_hash")))
+
+            if metadata is None:
+                return response.not_found(data="No metadata registered for such resource.")
+
+            piece_size, merkle_root, piece_hashes = metadata
+
+            return response.ok(data={
+                "resource_hash": body_data.get("resource_hash"),
+                "piece_size": piece_size,
+                "merkle_root": merkle_root,
+                "piece_hashes": [
+                    piece_hashes[i:i + PIECE_HASH_LENGTH] for i in range(0, len(piece_hashes), PIECE_HASH_LENGTH)
+                ]
+            })
+
+        except marshmallow.ValidationError as error:
+            return response.unprocessable_entity(data=error.messages)
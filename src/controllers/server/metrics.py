@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for '/metrics' route
+"""
+
+# external dependencies
+import flask
+import flask_restful
+
+# project dependencies
+from controllers.server.heartbeat import HeartBeatController
+from controllers.server.resource import ResourceController
+from controllers.server.utils.metrics import (
+    CONTENT_TYPE,
+    get_metrics_registry_controller
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class MetricsController(flask_restful.Resource):
+    """
+    Controller for '/metrics' route
+    """
+
+    metrics = get_metrics_registry_controller()
+
+    @classmethod
+    def get(cls) -> flask.Response:
+        """
+        Exposes central server's metrics in Prometheus' text format, along with live peers, registry's rows
+        and heartbeat threads read at scrape time
+
+        :return: Plain text response
+        """
+
+        listener = HeartBeatController.listener
+
+        gauges = [
+            ("p2p_live_peers", (), len(HeartBeatController.monitor)),
+            ("p2p_registry_rows", (), len(ResourceController.index)),
+            ("p2p_heartbeat_threads_alive", (("thread", "monitor"),), int(HeartBeatController.monitor.is_alive())),
+            ("p2p_heartbeat_threads_alive", (("thread", "udp_listener"),),
+             int(listener is not None and listener.is_alive())),
+        ]
+
+        return flask.Response(cls.metrics.render(gauges), content_type=CONTENT_TYPE)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for '/admin/profiling' route
+"""
+
+# built-in dependencies
+import ipaddress
+import typing
+
+# external dependencies
+import flask
+import flask_restful
+import marshmallow
+
+# project dependencies
+from controllers.profiling import ProfilerController
+from controllers.server.utils import response
+from schema.profiling import PostProfilingSchema
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class ProfilingController(flask_restful.Resource):
+    """
+    Controller for '/admin/profiling' route
+
+    Requests only go through the profiler while it is on: the application's WSGI callable is swapped for
+    a profiled one when profiling is turned on, and back when it is turned off
+    """
+
+    post_schema = PostProfilingSchema()
+
+    profiler = None  # type: typing.Optional[ProfilerController]
+    app = None  # type: typing.Optional[flask.Flask]
+    wsgi_app = None  # application's own WSGI callable
+    routes = set()  # type: typing.Set[str]
+
+    @classmethod
+    def install(cls, app: flask.Flask, profiler: ProfilerController) -> None:
+        """
+        Profiles the application's requests with a profiler (must be called after every route is added)
+
+        :param app: Central server's application
+        :param profiler: Profiler, possibly already on
+        """
+
+        cls.app = app
+        cls.wsgi_app = app.wsgi_app
+        cls.profiler = profiler
+        cls.routes = {rule.rule for rule in app.url_map.iter_rules()}
+
+        cls.__apply()
+
+    @classmethod
+    def get(cls) -> typing.Tuple:
+        """
+        Retrieve profiling's configuration
+
+        :return: Tuple which contains profiling's configuration and a relevant HTTP status code
+        """
+
+        if not cls.__is_local():
+            return response.forbidden(data="Profiling is only configured from the server's host.")
+
+        return response.ok(data=cls.profiler.status())
+
+    @classmethod
+    def post(cls) -> typing.Tuple:
+        """
+        Change the fraction of requests profiled (0 turns profiling off) and the profiling method
+
+        :return: Tuple which contains profiling's new configuration and a relevant HTTP status code
+        """
+
+        if not cls.__is_local():
+            return response.forbidden(data="Profiling is only configured from the server's host.")
+
+        body = flask.request.get_json()
+
+        if not body:
+            return response.bad_request(data="Request needs a body, but none encountered.")
+
+        try:
+            # request's body validation through marshmallow
+            body_data = cls.post_schema.load(body)
+
+        except marshmallow.ValidationError as error:
+            return response.unprocessable_entity(data=error.messages)
+
+        cls.profiler.configure(body_data.get("rate"), body_data.get("method"))
+        cls.__apply()
+
+        return response.ok(data=cls.profiler.status())
+
+    @classmethod
+    def __apply(cls) -> None:
+        """
+        Routes requests through the profiler only while it is on
+        """
+
+        cls.app.wsgi_app = cls.__profiled if cls.profiler.enabled else cls.wsgi_app
+
+    @classmethod
+    def __profiled(cls, environ: dict, start_response: typing.Callable) -> typing.Iterable:
+        """
+        Application's WSGI callable, a fraction of whose requests is profiled (until its response's body
+        is returned), aggregated by route and method
+        """
+
+        path = environ.get("PATH_INFO", "")
+        route = path.strip("/").replace("/", "_") if path in cls.routes else "unmatched"
+
+        return cls.profiler.call(f"server_{environ.get('REQUEST_METHOD')}_{route}", cls.wsgi_app, environ,
+                                 start_response)
+
+    @staticmethod
+    def __is_local() -> bool:
+        """
+        :return: Whether the request comes from the server's host
+        """
+
+        try:
+            return ipaddress.ip_address(flask.request.remote_addr).is_loopback
+        except ValueError:
+            return False
@@ -6,7 +6,6 @@ Module that defines a controller for '/resource' route
 """
 
 # built-in dependencies
-import json
 import typing
 
 # external dependencies
@@ -16,8 +15,15 @@ import marshmallow
 
 # project dependencies
 from controllers.database.database import get_database_resource_table_controller
+from controllers.database.index import get_resource_index_controller
+from controllers.database.selection import (
+    DEFAULT_STRATEGY,
+    STRATEGIES
+)
 from controllers.server.utils import response
 from schema.resource import (
+    DEFAULT_PAGE_SIZE,
+    GetResourcePageSchema,
     GetResourceSchema,
     PostResourceSchema
 )
@@ -32,18 +38,47 @@ class ResourceController(flask_restful.Resource):
     """
 
     post_schema = PostResourceSchema()
+    bulk_post_schema = PostResourceSchema(many=True)
     get_schema = GetResourceSchema()
+    get_page_schema = GetResourcePageSchema()
 
     db_access = get_database_resource_table_controller()
+    index = get_resource_index_controller()  # answers lookups, writes through to database
+    rank = STRATEGIES[DEFAULT_STRATEGY]  # ranks a content's holders by their reported load
 
     # fields to map database's response
-    db_fields = ["peer_ip", "peer_port", "resource_path", "resource_name", "resource_hash"]
+    db_fields = [
+        "peer_ip", "peer_port", "resource_path", "resource_name", "resource_hash", "resource_size", "transfer_mode"
+    ]
+
+    @classmethod
+    def share_registry(cls) -> None:
+        """
+        Answer lookups and listings from the database instead of the in-memory index, so every server's
+        process sees every register
+        """
+
+        cls.index = cls.db_access
+
+    @classmethod
+    def rank_holders_with(cls, strategy: str) -> None:
+        """
+        Rank the holders answered by lookups with another strategy
+
+        :param strategy: Strategy's name, one of 'selection.STRATEGIES'
+        """
+
+        cls.rank = STRATEGIES[strategy]
 
     @classmethod
     def get(cls) -> typing.Tuple:
         """
-        Retrieve peer's info that contains a certain resource name OR a list of every peer's info
-        (decision is made with body presence or not, respectively)
+        Retrieve info of every peer that holds the same content as a certain resource name OR a page of
+        every peer's info (decision is made with body presence or not, respectively)
+
+        The listing is paginated through '?limit=<Int>&after=<Int>' (keyset over registers' ids, the
+        response holds the cursor for the next page) or streamed as NDJSON, one resource per line, when
+        'application/x-ndjson' is accepted
 
         :return: Tuple which contains desired peer's info and a relevant HTTP status code
         """
@@ -52,16 +87,29 @@ class ResourceController(flask_restful.Resource):
 
         # if request was called with no body, list all resources
         if not body:
-            # call database
-            resource_matrix = cls.db_access.get_all_resources()
+            if flask.request.accept_mimetypes.best == response.NDJSON_MIMETYPE:
+                return response.ndjson(records=cls.__stream_resources())
+
+            try:
+                # query string validation through marshmallow
+                page_args = cls.get_page_schema.load(flask.request.args)
+
+            except marshmallow.ValidationError as error:
+                return response.unprocessable_entity(data=error.messages)
 
-            # transform matrix of values from database to list of dicts
-            resource_list = list(map(
-                lambda x: {cls.db_fields[i]: x[i] for i in range(len(x))},
-                resource_matrix
-            ))
+            # call index
+            page = cls.index.get_resources_page(after=page_args.get("after"), limit=page_args.get("limit"))
 
-            return response.ok(data=json.dumps(resource_list))
+            # transform matrix of values from index to list of dicts
+            resource_list = [
+                {cls.db_fields[i]: record[i] for i in range(len(record))}
+                for _, record in page
+            ]
+
+            return response.ok(data={
+                "resources": resource_list,
+                "next": page[-1][0] if len(page) == page_args.get("limit") else None
+            })
 
         # else filter through resource's name
         else:
@@ -70,26 +118,49 @@ class ResourceController(flask_restful.Resource):
                 body_data = cls.get_schema.load(body)
 
                 # call database
-                resource_list = cls.db_access.get_available_peer(
-                    resource_name=str(body_data.get("resource_name"))
+                resource_matrix = cls.index.get_available_peer(
+                    resource_name=str(body_data.get("resource_name")),
+                    rank=cls.rank
                 )
 
-                # transform list of values from database to dict
-                resource_dict = {
-                    cls.db_fields[i]: resource_list[i] for i in range(len(resource_list))
-                }
+                # transform matrix of values from database to list of dicts
+                resource_list = list(map(
+                    lambda x: {cls.db_fields[i]: x[i] for i in range(len(x))},
+                    resource_matrix
+                ))
 
-                return response.ok(data=json.dumps(resource_dict))
+                return response.ok(data=resource_list)
 
             except marshmallow.ValidationError as error:
-                return response.unprocessable_entity(data=str(error.messages))
+                return response.unprocessable_entity(data=error.messages)
+
+    @classmethod
+    def __stream_resources(cls) -> typing.Iterator[dict]:
+        """
+        Walks every page of the listing, so only one page is held in memory at a time
+
+        :return: Iterator over every resource's info
+        """
+
+        after = 0
+
+        while True:
+            page = cls.index.get_resources_page(after=after, limit=DEFAULT_PAGE_SIZE)
+
+            for _, record in page:
+                yield {cls.db_fields[i]: record[i] for i in range(len(record))}
+
+            if len(page) < DEFAULT_PAGE_SIZE:
+                return
+
+            after = page[-1][0]
 
     @classmethod
     def post(cls) -> typing.Tuple:
         """
-        Assign a new resource to a peer at the database
+        Assign a new resource (or a list of resources, registered at once) to a peer at the database
 
-        :return: Request body
+        :return: Request body or the number of registered resources (for a list)
         """
 
         body = flask.request.get_json()
@@ -97,21 +168,59 @@ class ResourceController(flask_restful.Resource):
         if not body:
             return response.bad_request(data="Request needs a body, but none encountered.")
 
+        if isinstance(body, list):
+            return cls.__bulk_post(body)
+
         try:
             # request's body validation through marshmallow
             body_data = cls.post_schema.load(body)
 
-            # call database
-            cls.db_access.register_peer(
+            resource = dict(
                 peer_ip=str(body_data.get("peer_ip")),
                 peer_id=str(body_data.get("peer_id")),
                 peer_port=int(body_data.get("peer_port")),
                 resource_name=str(body_data.get("resource_name")),
                 resource_path=str(body_data.get("resource_path")),
-                resource_hash=str(body_data.get("resource_hash"))
+                resource_hash=str(body_data.get("resource_hash")),
+                resource_size=body_data.get("resource_size"),
+                transfer_mode=str(body_data.get("transfer_mode"))
             )
 
-            return response.ok(data=json.dumps(body))
+            if body_data.get("piece_hashes") is not None:
+                resource.update(
+                    piece_size=int(body_data.get("piece_size")),
+                    merkle_root=str(body_data.get("merkle_root")),
+                    piece_hashes=body_data.get("piece_hashes")
+                )
+
+            # call database (register and piece hashes in a single transaction, as a list of one)
+            cls.index.register_resources(resources=[resource])
+
+            return response.ok(data=body)
+
+        except marshmallow.ValidationError as error:
+            return response.unprocessable_entity(data=error.messages)
+
+    @classmethod
+    def __bulk_post(cls, body: typing.List[dict]) -> typing.Tuple:
+        """
+        Assign a list of resources to peers at the database in a single transaction
+
+        :param body: Request body
+        :return: Number of registered resources
+        """
+
+        try:
+            # request's body validation through marshmallow
+            body_data = cls.bulk_post_schema.load(body)
+
+            # call database
+            cls.index.register_resources(resources=[
+                dict(resource, peer_id=str(resource.get("peer_id")), peer_ip=str(resource.get("peer_ip")))
+                for resource in body_data
+            ])
+
+            return response.ok(data={"registered": len(body_data)})
 
         except marshmallow.ValidationError as error:
             return response.unprocessable_entity(data=error.messages)
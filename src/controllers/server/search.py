@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines a controller for '/search' route
+"""
+
+# built-in dependencies
+import typing
+
+# external dependencies
+import flask
+import flask_restful
+import marshmallow
+
+# project dependencies
+from controllers.database.database import get_database_resource_table_controller
+from controllers.database.index import get_resource_index_controller
+from controllers.server.utils import response
+from schema.search import GetSearchSchema
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class SearchController(flask_restful.Resource):
+    """
+    Controller for '/search' route
+    """
+
+    get_schema = GetSearchSchema()
+
+    db_access = get_database_resource_table_controller()
+    index = get_resource_index_controller()  # trigram index over names, incrementally maintained
+
+    # fields to map search results
+    result_fields = ["resource_name", "resource_hash", "resource_size", "holders", "match", "score"]
+
+    @classmethod
+    def share_registry(cls) -> None:
+        """
+        Search at the database instead of the in-memory index (prefix and substring matches only), so
+        every server's process sees every register
+        """
+
+        cls.index = cls.db_access
+
+    @classmethod
+    def get(cls) -> typing.Tuple:
+        """
+        Search resources' names by prefix, substring or similarity, ranked and paginated through
+        '?q=<String>&limit=<Int>&offset=<Int>'
+
+        :return: Tuple which contains a page of results (and the offset of the next one) and a relevant
+        HTTP status code
+        """
+
+        try:
+            # query string validation through marshmallow
+            args = cls.get_schema.load(flask.request.args)
+
+        except marshmallow.ValidationError as error:
+            return response.unprocessable_entity(data=error.messages)
+
+        limit, offset = args.get("limit"), args.get("offset")
+
+        # call index
+        results = cls.index.search(query=args.get("q"), limit=limit, offset=offset)
+
+        return response.ok(data={
+            "results": [dict(zip(cls.result_fields, result)) for result in results],
+            "next": offset + limit if len(results) == limit else None
+        })
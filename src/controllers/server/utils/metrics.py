@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines central server's metrics (counters and latency histograms) and their exposition in
+Prometheus' text format
+
+Every thread records at its own shard, without any lock, and a scrape sums every shard. A thread's shard
+is folded into the retired totals when the thread ends, so short-lived threads (one per connection at the
+development server) neither grow the shards nor lose what they recorded
+"""
+
+# built-in dependencies
+import bisect
+import functools
+import inspect
+import threading
+import time
+import typing
+import weakref
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# histograms' upper bounds, in seconds (from in-memory lookups to stalled database writes)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# (label's name, label's value) pairs, in exposition order
+Labels = typing.Tuple[typing.Tuple[str, str], ...]
+
+# metric's name -> (type, help)
+METRICS = {
+    "p2p_http_request_duration_seconds": (
+        "histogram", "Requests by route, method and status code, and seconds taken until the response was built"
+    ),
+    "p2p_database_query_duration_seconds": (
+        "histogram", "Database queries by table and controller's method, and seconds taken"
+    ),
+    "p2p_heartbeats_total": ("counter", "Heartbeats received, by transport"),
+    "p2p_heartbeat_expirations_total": ("counter", "Peers dropped for not beating before their deadline"),
+    "p2p_live_peers": ("gauge", "Peers monitored by the heartbeat monitor"),
+    "p2p_registry_rows": ("gauge", "Registers of 'peer x resource' at the registry"),
+    "p2p_heartbeat_threads_alive": ("gauge", "Heartbeat monitor and UDP listener threads alive, by thread"),
+}
+
+
+class _Shard:
+    """
+    Metrics recorded by a single thread
+    """
+
+    def __init__(self):
+        # (metric's name, labels) -> total
+        self.counters = dict()  # type: typing.Dict[typing.Tuple[str, Labels], float]
+        # (metric's name, labels) -> [observations per bucket ..., observations above every bucket, sum]
+        self.histograms = dict()  # type: typing.Dict[typing.Tuple[str, Labels], typing.List[float]]
+
+    def merge(self, other: "_Shard") -> None:
+        """
+        Adds another shard's metrics to this one
+        """
+
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        for key, values in list(other.histograms.items()):
+            merged = self.histograms.setdefault(key, [0] * (len(BUCKETS) + 2))
+            for i, value in enumerate(list(values)):
+                merged[i] += value
+
+
+class _ThreadEnd:
+    """
+    Object kept at a thread's local storage only, collected as soon as the thread ends
+    """
+
+
+class _MetricsRegistryController:
+    """
+    Controller for central server's metrics
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = dict()  # type: typing.Dict[int, _Shard]
+        self.retired = _Shard()
+        self.lock = threading.Lock()  # taken once per thread and per scrape, never while recording
+
+        self.constant_labels = tuple()  # type: Labels
+
+    def label_every_metric(self, **labels: str) -> None:
+        """
+        Adds labels to every exposed metric (e.g. the worker process that answered a scrape)
+        """
+
+        self.constant_labels = tuple((name, str(value)) for name, value in labels.items())
+
+    def increment(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """
+        Increments a counter
+
+        :param name: Metric's name, one of 'METRICS'
+        :param labels: Metric's labels
+        :param amount: Increment
+        """
+
+        counters = self.__shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name: str, labels: Labels, seconds: float) -> None:
+        """
+        Records an observation at a histogram
+
+        :param name: Metric's name, one of 'METRICS'
+        :param labels: Metric's labels
+        :param seconds: Observed value
+        """
+
+        histograms = self.__shard().histograms
+        key = (name, labels)
+        values = histograms.get(key)
+
+        if values is None:
+            values = histograms[key] = [0] * (len(BUCKETS) + 2)
+
+        values[bisect.bisect_left(BUCKETS, seconds)] += 1
+        values[-1] += seconds
+
+    def render(self, gauges: typing.Iterable[typing.Tuple[str, Labels, float]] = ()) -> str:
+        """
+        Exposes every metric in Prometheus' text format
+
+        :param gauges: Metrics read at scrape time, as (metric's name, labels, value)
+        :return: Exposition's text
+        """
+
+        total = _Shard()
+
+        with self.lock:
+            total.merge(self.retired)
+            for shard in self.shards.values():
+                total.merge(shard)
+
+        samples = dict()  # metric's name -> [(labels, lines)]
+
+        for (name, labels), value in total.counters.items():
+            samples.setdefault(name, []).append((labels, [f"{name}{self.__labels(labels)} {value:g}"]))
+
+        for name, labels, value in gauges:
+            samples.setdefault(name, []).append((labels, [f"{name}{self.__labels(labels)} {value:g}"]))
+
+        for (name, labels), values in total.histograms.items():
+            lines = list()
+            cumulative = 0
+
+            for bound, count in zip(BUCKETS + ("+Inf",), values):
+                cumulative += count
+                lines.append(f"{name}_bucket{self.__labels(labels + (('le', str(bound)),))} {cumulative}")
+
+            lines.append(f"{name}_sum{self.__labels(labels)} {values[-1]:.6f}")
+            lines.append(f"{name}_count{self.__labels(labels)} {cumulative}")
+            samples.setdefault(name, []).append((labels, lines))
+
+        exposition = list()
+
+        for name, (kind, description) in METRICS.items():
+            exposition.append(f"# HELP {name} {description}")
+            exposition.append(f"# TYPE {name} {kind}")
+
+            if name not in samples:
+                # a metric with no samples yet is exposed zeroed (a histogram as its bucket, sum and count)
+                if kind == "histogram":
+                    exposition.append(f"{name}_bucket{self.__labels((('le', '+Inf'),))} 0")
+                    exposition.append(f"{name}_sum{self.__labels(())} 0")
+                    exposition.append(f"{name}_count{self.__labels(())} 0")
+                else:
+                    exposition.append(f"{name}{self.__labels(())} 0")
+                continue
+
+            # series sorted by their labels, a histogram's buckets kept in order
+            for _, lines in sorted(samples[name]):
+                exposition.extend(lines)
+
+        return "\n".join(exposition) + "\n"
+
+    def __labels(self, labels: Labels) -> str:
+        """
+        :return: Labels (constant ones first) as exposed, with their values escaped
+        """
+
+        labels = self.constant_labels + labels
+
+        if not labels:
+            return ""
+
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+            for name, value in labels
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def __shard(self) -> _Shard:
+        """
+        :return: Current thread's shard, created at its first record
+        """
+
+        try:
+            return self.local.shard
+
+        except AttributeError:
+            shard = self.local.shard = _Shard()
+            self.local.end = _ThreadEnd()
+
+            with self.lock:
+                self.shards[id(shard)] = shard
+
+            weakref.finalize(self.local.end, self.__retire, shard)
+
+            return shard
+
+    def __retire(self, shard: _Shard) -> None:
+        """
+        Folds an ended thread's shard into the retired totals
+        """
+
+        with self.lock:
+            self.retired.merge(shard)
+            self.shards.pop(id(shard), None)
+
+
+@functools.lru_cache()
+def get_metrics_registry_controller() -> [_MetricsRegistryController]:
+    """
+    Singleton for MetricsRegistryController class
+
+    :return: Same instance for MetricsRegistryController class
+    """
+
+    return _MetricsRegistryController()
+
+
+def timed(table: str) -> typing.Callable:
+    """
+    Decorates a database controller's method, recording its duration at 'p2p_database_query_duration_seconds'
+    (a generator's duration lasts until it is exhausted)
+
+    :param table: Table accessed by the controller
+    :return: Decorator
+    """
+
+    registry = get_metrics_registry_controller()
+
+    def decorator(method: typing.Callable) -> typing.Callable:
+        labels = (("table", table), ("query", method.__name__.strip("_")))
+
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from method(*args, **kwargs)
+                finally:
+                    registry.observe("p2p_database_query_duration_seconds", labels, time.perf_counter() - start)
+
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    registry.observe("p2p_database_query_duration_seconds", labels, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
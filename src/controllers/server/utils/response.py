@@ -3,16 +3,29 @@
 
 """
 Module that defines a pattern for central server's responses
+
+Responses carry native structures at 'data', encoded once by the representation the client
+accepts: JSON (default) or MessagePack ('application/msgpack', compact binary)
 """
 
 # built-in dependencies
+import json
 import typing
 
+# external dependencies
+import flask
+import msgpack
+
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "02/11/2020"
 
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/msgpack"
+NDJSON_MIMETYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 64 * 1024
 
-def ok(data: str) -> typing.Tuple:
+
+def ok(data: typing.Any) -> typing.Tuple:
     """
     Generic OK (200) response
     """
@@ -20,7 +33,7 @@ def ok(data: str) -> typing.Tuple:
     return {"success": True, "data": data}, 200
 
 
-def bad_request(data: str) -> typing.Tuple:
+def bad_request(data: typing.Any) -> typing.Tuple:
     """
     Generic BAD REQUEST (400) response
     """
@@ -28,7 +41,23 @@ def bad_request(data: str) -> typing.Tuple:
     return {"success": False, "data": data}, 400
 
 
-def unprocessable_entity(data: str) -> typing.Tuple:
+def forbidden(data: typing.Any) -> typing.Tuple:
+    """
+    Generic FORBIDDEN (403) response
+    """
+
+    return {"success": False, "data": data}, 403
+
+
+def not_found(data: typing.Any) -> typing.Tuple:
+    """
+    Generic NOT FOUND (404) response
+    """
+
+    return {"success": False, "data": data}, 404
+
+
+def unprocessable_entity(data: typing.Any) -> typing.Tuple:
     """
     Generic UNPROCESSABLE ENTITY (422) response
     """
@@ -36,9 +65,47 @@ def unprocessable_entity(data: str) -> typing.Tuple:
     return {"success": False, "data": data}, 422
 
 
-def internal_server_error(data: str) -> typing.Tuple:
+def internal_server_error(data: typing.Any) -> typing.Tuple:
     """
     Generic INTERNAL SERVER ERROR (500) response
     """
 
     return {"success": False, "data": data}, 500
+
+
+def output_msgpack(data: typing.Any, code: int, headers: typing.Optional[dict] = None) -> flask.Response:
+    """
+    Representation that encodes a response with MessagePack (registered at flask_restful's 'Api')
+    """
+
+    encoded = flask.make_response(msgpack.packb(data, use_bin_type=True), code)
+    encoded.headers.extend(headers or {})
+    encoded.headers["Content-Type"] = MSGPACK_MIMETYPE
+
+    return encoded
+
+
+def ndjson(records: typing.Iterator[dict]) -> flask.Response:
+    """
+    Streamed OK (200) response, one JSON document per line, produced while records are iterated
+    """
+
+    def chunks() -> typing.Iterator[str]:
+        # lines are sent in chunks of about NDJSON_CHUNK_SIZE, not one write per record
+        lines = list()
+        size = 0
+
+        for record in records:
+            line = json.dumps(record) + "\n"
+            lines.append(line)
+            size += len(line)
+
+            if size >= NDJSON_CHUNK_SIZE:
+                yield "".join(lines)
+                lines.clear()
+                size = 0
+
+        if lines:
+            yield "".join(lines)
+
+    return flask.Response(chunks(), status=200, mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines the database's engine, shared by every database access of the central server
+"""
+
+# built-in dependencies
+import functools
+import sqlite3
+
+# external dependencies
+import sqlalchemy
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DATABASE_URL = "sqlite:///db.sqlite3"
+
+# connection pool, sized for flask's threaded server (one connection per request thread)
+POOL_SIZE = 8
+POOL_MAX_OVERFLOW = 24
+POOL_TIMEOUT = 10
+
+# pragmas applied to every new connection
+PRAGMAS = {
+    "journal_mode": "WAL",  # readers do not block the writer (and vice versa)
+    "synchronous": "NORMAL",  # with WAL, only a power loss may lose the last commits, never corrupts
+    "cache_size": -64 * 1024,  # 64 MiB of page cache per connection (negative means KiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # milliseconds waiting for the writer lock before failing
+}
+
+
+def _set_pragmas(dbapi_connection: sqlite3.Connection, connection_record) -> None:
+    """
+    Applies PRAGMAS to a new connection
+    """
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def create_engine(url: str = DATABASE_URL) -> Engine:
+    """
+    Creates a SQLite engine with WAL journaling, tuned pragmas and a pool of reusable connections
+
+    :param url: Database's URL
+    :return: Engine
+    """
+
+    engine = sqlalchemy.create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        connect_args={"check_same_thread": False}  # pooled connections move between threads
+    )
+    sqlalchemy.event.listen(engine, "connect", _set_pragmas)
+
+    return engine
+
+
+@functools.lru_cache()
+def get_engine() -> Engine:
+    """
+    Singleton for central server's engine
+
+    :return: Same engine for every caller
+    """
+
+    return create_engine()
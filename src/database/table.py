@@ -5,14 +5,30 @@
 Module that defines the database's schemas
 """
 
+# built-in dependencies
+import typing
+
 # external dependencies
 import sqlalchemy
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Float,
+    Index,
     Integer,
-    String
+    String,
+    Text
 )
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import (
+    CreateColumn,
+    CreateIndex,
+    CreateTable
+)
+
+# project dependencies
+from database.engine import get_engine
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "24/10/2020"
@@ -26,22 +42,142 @@ class ResourceTable(Base):
     """
 
     __tablename__ = "resources"
-    sqlite_autoincrement = True
+    __table_args__ = (
+        # first register of each 'peer x content', for listings straight from the database
+        Index("ix_resources_peerId_resourceHash", "peerId", "resourceHash"),
+        # ids are never reused, even after the latest registers are deleted (listings' cursors)
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True)  # auto incremental PK
-    peerId = Column(String(36), nullable=False)  # peer ID
+    peerId = Column(String(36), nullable=False, index=True)  # peer ID
     peerIp = Column(String(16), nullable=False)  # peer IP
     peerPort = Column(Integer, nullable=False)  # peer download port
-    resourceName = Column(String(100), nullable=False)  # resource's name
+    resourceName = Column(String(100), nullable=False, index=True)  # resource's name
     resourcePath = Column(String(100), nullable=False)  # resource's path at peerIp:peerPort
-    resourceHash = Column(String(50), nullable=False)  # resource's hash
+    resourceHash = Column(String(50), nullable=False, index=True)  # resource's hash
+    resourceSize = Column(BigInteger, nullable=True)  # resource's size in bytes
+    transferMode = Column(String(3), nullable=False, default="udp", server_default="udp")  # peer's transfer mode
+
+
+class ResourceMetadataTable(Base):
+    """
+    Database 'metadata' table definition (one row per distinct content)
+    """
+
+    __tablename__ = "metadata"
+
+    resourceHash = Column(String(50), primary_key=True)  # resource's hash
+    pieceSize = Column(Integer, nullable=False)  # size of each piece in bytes
+    merkleRoot = Column(String(64), nullable=False)  # Merkle root over piece hashes
+    pieceHashes = Column(Text, nullable=False)  # concatenated SHA-256 hash of every piece
+
+
+class LivenessTable(Base):
+    """
+    Database 'liveness' table definition (one row per monitored peer, shared by every server's process)
+    """
+
+    __tablename__ = "liveness"
+
+    peerId = Column(String(36), primary_key=True)  # peer ID
+    deadline = Column(Float, nullable=False, index=True)  # unix time of latest heartbeat + timeout
+    sequence = Column(BigInteger, nullable=True)  # latest UDP heartbeat's sequence number
+    activeUploads = Column(Integer, nullable=True)  # uploads in progress, as latest reported by peer
+    uploadRate = Column(BigInteger, nullable=True)  # recent upload rate (bytes per second), as latest reported
+
+
+def create_table(engine: typing.Optional[Engine] = None) -> None:
+    """
+    Create every table registered at 'Base' object through declared 'engine', adding
+    columns and indexes that are missing at already existing 'resources' and 'liveness' tables
+    (and rebuilding a 'resources' table created without AUTOINCREMENT)
+
+    :param engine: Database's engine (defaults to central server's shared engine)
+    """
 
+    engine = engine or get_engine()
+    inspector = sqlalchemy.inspect(engine)
+    existing_columns = {
+        table.__tablename__: {column["name"] for column in inspector.get_columns(table.__tablename__)}
+        for table in (ResourceTable, LivenessTable)
+    }
 
-def create_table() -> None:
+    # only creates missing tables
+    Base.metadata.create_all(engine)
+
+    for table in (ResourceTable, LivenessTable):
+        if not existing_columns[table.__tablename__]:
+            continue
+
+        for column in table.__table__.columns:
+            if column.name not in existing_columns[table.__tablename__]:
+                engine.execute(
+                    f"ALTER TABLE {table.__tablename__} "
+                    f"ADD COLUMN {CreateColumn(column).compile(dialect=engine.dialect)}"
+                )
+
+        existing_indexes = {
+            index["name"] for index in sqlalchemy.inspect(engine).get_indexes(table.__tablename__)
+        }
+
+        for index in table.__table__.indexes:
+            if index.name not in existing_indexes:
+                index.create(engine)
+
+    if engine.dialect.name == "sqlite" and existing_columns[ResourceTable.__tablename__]:
+        _add_autoincrement(engine)
+
+
+def _add_autoincrement(engine: Engine) -> None:
     """
-    Create 'resources' table registered at 'Base' object through declared 'engine'
+    Rebuilds 'resources' table with AUTOINCREMENT (which SQLite can not add to an existing table) when it
+    was created without it, keeping every register and its id, in a single transaction
+
+    :param engine: Database's engine
     """
 
-    engine = sqlalchemy.create_engine("sqlite:///db.sqlite3")
-    if not engine.dialect.has_table(engine, "resources"):
-        Base.metadata.create_all(engine)
+    table = ResourceTable.__table__
+    columns = ", ".join(column.name for column in table.columns)
+
+    # plain DBAPI connection, so the DDL statements run at the same explicit transaction
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,))
+
+        if "AUTOINCREMENT" in cursor.fetchone()[0].upper():
+            return
+
+        cursor.execute("BEGIN IMMEDIATE")
+
+        try:
+            cursor.execute(f"ALTER TABLE {table.name} RENAME TO {table.name}_migrating")
+
+            # indexes follow the renamed table, under the names the new table's indexes need
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (f"{table.name}_migrating",)
+            )
+            for (index_name,) in cursor.fetchall():
+                cursor.execute(f"DROP INDEX {index_name}")
+
+            cursor.execute(str(CreateTable(table).compile(dialect=engine.dialect)))
+            for index in table.indexes:
+                cursor.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+
+            cursor.execute(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_migrating")
+            cursor.execute(f"DROP TABLE {table.name}_migrating")
+
+            connection.commit()
+
+        except Exception:
+            connection.rollback()
+            raise
+
+        finally:
+            cursor.close()
+
+    finally:
+        connection.close()
@@ -9,6 +9,9 @@ Module that starts a peer's CLI (peer's main thread)
 import pprint
 import sys
 
+# external dependencies
+import requests
+
 # project dependencies
 from controllers.peer.peer import PeerController
 
@@ -17,34 +20,48 @@ __date__ = "25/10/2020"
 
 if __name__ == "__main__":
 
-    if len(sys.argv) != 5:
-        print("Usage: python src/peer_rest.py <peer_ip:ipv4> <server_ip:ipv4> <action_port:int> <listen_port:int>")
+    # beat over central server's UDP heartbeat listener instead of its REST route
+    udp_heartbeat = "--udp-heartbeat" in sys.argv
+
+    # keep downloads to this peer instead of registering them as its resources
+    no_seed = "--no-seed" in sys.argv
+    argv = [arg for arg in sys.argv if arg not in ("--udp-heartbeat", "--no-seed")]
+
+    if len(argv) not in (5, 6) or (len(argv) == 6 and argv[5] not in ("udp", "tcp")):
+        print("Usage: python src/peer.py <peer_ip:ipv4> <server_ip:ipv4> <action_port:int> <listen_port:int> "
+              "[transfer_mode:udp|tcp] [--udp-heartbeat] [--no-seed]")
         sys.exit(2)
 
-    peer_ip = sys.argv[1]
-    server_ip = sys.argv[2]
-    action_port = int(sys.argv[3])
-    listen_port = int(sys.argv[4])
+    peer_ip = argv[1]
+    server_ip = argv[2]
+    action_port = int(argv[3])
+    listen_port = int(argv[4])
+    transfer_mode = argv[5] if len(argv) == 6 else "udp"
 
     print("peer running!")
     print("commands:\n\t"
-          "-u <resource_name> = upload\n\t"
+          "-u <resource_name|directory> = upload\n\t"
           "-d <resource_name> = download\n\t"
           "-l = list all resources \n\t"
+          "-s <query> = search resources by name\n\t"
+          "-p <fraction> [cprofile|sampler] = profile a fraction of downloads and uploads (0 = off)\n\t"
           "-q = quit")
 
     peer = PeerController(
         peer_ip=peer_ip,
         server_ip=server_ip,
         action_port=action_port,
-        listen_port=listen_port
+        listen_port=listen_port,
+        transfer_mode=transfer_mode,
+        udp_heartbeat=udp_heartbeat,
+        seed_downloads=not no_seed
     )
 
     # start heartbeat and socket listen threads
     peer.heartbeat_thread.start()
     peer.listen_thread.start()
 
-    commands = ["-u", "-d", "-l"]
+    commands = ["-u", "-d", "-l", "-s", "-p"]
 
     try:
         # peer's CLI loop
@@ -62,18 +79,47 @@ if __name__ == "__main__":
 
             args = entry.split()
 
-            if args[0] not in commands or len(args) > 2 or len(args) == 0:
-                print("input [-q, -l, -d <resource_name>, -u <resource_name>]")
-
-            elif args[0] == "-l":
-                result = peer.list()
-                pprint.pprint(result, indent=4)
-
-            elif args[0] == "-d":
-                print(peer.download(args[1]))
-
-            elif args[0] == "-u":
-                print(peer.upload(args[1]))
+            try:
+                if len(args) == 0 or args[0] not in commands or \
+                        (len(args) > 2 and args[0] not in ("-s", "-p")) or (len(args) > 3 and args[0] == "-p") or \
+                        (len(args) == 1 and args[0] in ("-s", "-p")):
+                    print("input [-q, -l, -s <query>, -d <resource_name>, -u <resource_name>, "
+                          "-p <fraction> [cprofile|sampler]]")
+
+                elif args[0] == "-l":
+                    listed = 0
+                    for resource in peer.list():
+                        pprint.pprint(resource, indent=4)
+                        listed += 1
+                    print(f"{listed} resource(s) listed")
+
+                elif args[0] == "-s":
+                    # queries may have spaces
+                    response = peer.search(entry.split(maxsplit=1)[1])
+
+                    if not response.get("success"):
+                        print(f"could not search, server said: {response.get('data')}")
+
+                    else:
+                        for result in response.get("data").get("results"):
+                            pprint.pprint(result, indent=4)
+                        print(f"{len(response.get('data').get('results'))} result(s) found")
+
+                elif args[0] == "-d":
+                    print(peer.download(args[1]))
+
+                elif args[0] == "-u":
+                    print(peer.upload(args[1]))
+
+                elif args[0] == "-p":
+                    try:
+                        print(peer.profile(float(args[1]), args[2] if len(args) == 3 else None))
+                    except ValueError:
+                        print(f"profiling fraction must be a number, not '{args[1]}'")
+
+            # central server unreachable or too slow, even after retries
+            except requests.exceptions.RequestException as error:
+                print(f"central server is not responding: {error}")
 
     finally:
         # stop heartbeat and socket listen threads
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines base definitions for all peer's transfer protocols
+"""
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class TransferError(Exception):
+    """
+    Error reported by a seeder peer during a transfer
+    """
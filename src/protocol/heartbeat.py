@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines peers' compact UDP heartbeat datagram
+
+Every datagram is fixed-size, with no reply:
+
+    BEAT        [peer's UUID (16 bytes)][sequence (8 bytes)]
+    LOAD_BEAT   [peer's UUID (16 bytes)][sequence (8 bytes)][active uploads (2 bytes)][upload rate (4 bytes)]
+
+Sequence numbers grow with every beat of a peer, so the central server discards beats that arrive
+duplicated or out of order. Datagrams may be lost, so peers beat more often over UDP than over REST,
+tolerating a couple of lost beats within the server's timeout. Beats with load report the peer's
+uploads in progress and its recent upload rate (bytes per second), both saturated at their field's size.
+"""
+
+# built-in dependencies
+import struct
+import typing
+import uuid
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+BEAT = struct.Struct("!16sQ")
+LOAD_BEAT = struct.Struct("!16sQHI")
+MAX_SIZE = LOAD_BEAT.size
+
+DEFAULT_PORT = 5001
+DEFAULT_INTERVAL = 2  # seconds, server's timeout (7) tolerates two consecutive lost beats
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+# (active uploads, upload rate in bytes per second), reported by peers along with their heartbeats
+Load = typing.Tuple[int, int]
+
+
+def pack(peer_id: str, sequence: int, load: typing.Optional[Load] = None) -> bytes:
+    """
+    :param peer_id: Peer's UUID
+    :param sequence: Beat's sequence number
+    :param load: Peer's load, if reported
+    :return: Beat's datagram
+    """
+
+    if load is None:
+        return BEAT.pack(uuid.UUID(peer_id).bytes, sequence)
+
+    uploads, rate = load
+    return LOAD_BEAT.pack(uuid.UUID(peer_id).bytes, sequence, min(uploads, 0xffff), min(rate, 0xffffffff))
+
+
+def unpack(datagram: bytes) -> typing.Optional[typing.Tuple[str, int, typing.Optional[Load]]]:
+    """
+    :param datagram: Received datagram
+    :return: Tuple (peer's UUID, sequence, load or None when not reported), or None for a malformed
+    datagram
+    """
+
+    if len(datagram) == LOAD_BEAT.size:
+        peer_id, sequence, uploads, rate = LOAD_BEAT.unpack(datagram)
+        load = (uploads, rate)
+
+    elif len(datagram) == BEAT.size:
+        peer_id, sequence = BEAT.unpack(datagram)
+        load = None
+
+    else:
+        return None
+
+    hexed = peer_id.hex()
+
+    # same as 'str(uuid.UUID(bytes=peer_id))', a few times faster
+    return f"{hexed[:8]}-{hexed[8:12]}-{hexed[12:16]}-{hexed[16:20]}-{hexed[20:]}", sequence, load
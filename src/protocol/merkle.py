@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines resource's piece hashes and their Merkle root
+
+A resource is split into fixed-size pieces (the last one may be shorter), each one hashed with
+SHA-256. The Merkle root hashes every pair of nodes of a level together (an odd node is promoted
+as is) until a single node is left.
+"""
+
+# built-in dependencies
+import hashlib
+import typing
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_PIECE_SIZE = 256 * 1024
+MAX_PIECES = 2048
+
+
+def piece_size_for(size: int) -> int:
+    """
+    Picks a piece size for a resource, doubling the default one until it fits in MAX_PIECES pieces
+
+    :param size: Resource's size in bytes
+    :return: Piece size in bytes
+    """
+
+    piece_size = DEFAULT_PIECE_SIZE
+
+    while size > piece_size * MAX_PIECES:
+        piece_size *= 2
+
+    return piece_size
+
+
+def piece_count(size: int, piece_size: int) -> int:
+    """
+    Number of pieces of a resource
+
+    :param size: Resource's size in bytes
+    :param piece_size: Piece size in bytes
+    :return: Number of pieces
+    """
+
+    return (size + piece_size - 1) // piece_size
+
+
+def hash_piece(piece: bytes) -> str:
+    """
+    Hashes a single piece
+
+    :param piece: Piece's content
+    :return: SHA-256 hash over piece's content
+    """
+
+    return hashlib.sha256(piece).hexdigest()
+
+
+def merkle_root(piece_hashes: typing.List[str]) -> str:
+    """
+    Computes the Merkle root over a resource's piece hashes
+
+    :param piece_hashes: Hexadecimal SHA-256 hash of every piece, in order
+    :return: Hexadecimal Merkle root
+    :raises ValueError: When a piece hash is not hexadecimal
+    """
+
+    level = [bytes.fromhex(piece_hash) for piece_hash in piece_hashes]
+
+    if not level:
+        return hashlib.sha256(b"").hexdigest()
+
+    while len(level) > 1:
+        level = [
+            hashlib.sha256(level[i] + level[i + 1]).digest() if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ]
+
+    return level[0].hex()
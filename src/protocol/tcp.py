@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines peer's TCP streaming transfer protocol
+
+    REQUEST   [offset][length][resource's size][resource]
+    RESPONSE  [status][size][payload]
+
+The seeder answers with a status and the size of the payload that follows: the requested range's
+data (sent with 'sendfile', so it never passes through Python buffers) or an error message.
+"""
+
+# built-in dependencies
+import os
+import socket
+import struct
+import typing
+
+# project dependencies
+from protocol.base import TransferError
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+# response status
+OK = 0
+ERROR = 1
+
+# message headers
+REQUEST_HEADER = struct.Struct("!QQH")
+RESPONSE_HEADER = struct.Struct("!BQ")
+
+# defaults
+DEFAULT_BUFFER_SIZE = 256 * 1024
+DEFAULT_TIMEOUT = 10
+
+
+def receive_exactly(sock: socket.socket, size: int) -> bytes:
+    """
+    Receives exactly 'size' bytes from a stream socket
+
+    :param sock: Connected socket
+    :param size: Number of bytes to receive
+    :return: Received bytes
+    :raises ConnectionError: When connection is closed before 'size' bytes arrive
+    """
+
+    data = bytearray(size)
+    view = memoryview(data)
+    received = 0
+
+    while received < size:
+        read = sock.recv_into(view[received:])
+        if not read:
+            raise ConnectionError("connection closed by peer")
+        received += read
+
+    return bytes(data)
+
+
+def send_error(conn: socket.socket, message: str) -> None:
+    """
+    Sends an ERROR response
+
+    :param conn: Accepted connection
+    :param message: Error message
+    """
+
+    encoded_message = message.encode("utf-8")
+    conn.sendall(RESPONSE_HEADER.pack(ERROR, len(encoded_message)) + encoded_message)
+
+
+def serve(conn: socket.socket, timeout: float = DEFAULT_TIMEOUT) -> int:
+    """
+    Sends a resource's range through an accepted connection using zero-copy 'sendfile'
+
+    :param conn: Accepted connection
+    :param timeout: Seconds without progress before giving up
+    :return: Number of bytes sent
+    """
+
+    conn.settimeout(timeout)
+
+    offset, length, resource_size = REQUEST_HEADER.unpack(receive_exactly(conn, REQUEST_HEADER.size))
+    resource = receive_exactly(conn, resource_size).decode("utf-8")
+
+    try:
+        resource_file = open(resource, "rb")
+    except OSError:
+        send_error(conn, f"resource '{resource}' not found")
+        return 0
+
+    with resource_file:
+        size = os.fstat(resource_file.fileno()).st_size
+        start = min(offset, size)
+        end = size if not length else min(size, start + length)
+
+        conn.sendall(RESPONSE_HEADER.pack(OK, end - start))
+
+        if end > start:
+            return conn.sendfile(resource_file, start, end - start)
+
+        return 0
+
+
+def download(address: typing.Tuple, resource: str, offset: int = 0, length: int = 0,
+             buffer_size: int = DEFAULT_BUFFER_SIZE,
+             timeout: float = DEFAULT_TIMEOUT) -> typing.Iterator[memoryview]:
+    """
+    Downloads a resource's range from a seeder peer, yielding its data in order
+
+    Data is received with 'recv_into' on a single reused buffer: every yielded view is only valid
+    until the next iteration
+
+    :param address: Seeder's listen address
+    :param resource: Resource identification at seeder's listen port
+    :param offset: First byte of the desired range
+    :param length: Range's length ('0' means 'until the end of the resource')
+    :param buffer_size: Size of the reused receive buffer
+    :param timeout: Seconds without any progress before giving up
+    :return: Iterator over the resource's data, in order
+    :raises socket.timeout: When the seeder stops responding
+    :raises ConnectionError: When the seeder closes the connection before the end of the range
+    :raises TransferError: When the seeder reports an error
+    """
+
+    encoded_resource = resource.encode("utf-8")
+
+    with socket.create_connection(address, timeout=timeout) as sock:
+        sock.sendall(REQUEST_HEADER.pack(offset, length, len(encoded_resource)) + encoded_resource)
+
+        status, size = RESPONSE_HEADER.unpack(receive_exactly(sock, RESPONSE_HEADER.size))
+
+        if status != OK:
+            raise TransferError(receive_exactly(sock, size).decode("utf-8", "replace"))
+
+        buffer = memoryview(bytearray(buffer_size))
+
+        while size:
+            read = sock.recv_into(buffer, min(buffer_size, size))
+            if not read:
+                raise ConnectionError("connection closed by peer")
+            size -= read
+            yield buffer[:read]
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines peer's chunked UDP transfer protocol
+
+Every datagram starts with a type and a transfer id:
+
+    REQUEST  [type][id][chunk_size][window][offset][length][resource]
+    DATA     [type][id][seq][total][payload]
+    ACK      [type][id][base][bitmap]
+    ERROR    [type][id][message]
+
+The downloader sends a REQUEST to the seeder's listen port, the seeder answers from a dedicated
+transfer socket (whose address the downloader locks onto) with up to 'window' unacknowledged
+DATA chunks. ACKs carry the next expected sequence number plus a selective bitmap of the chunks
+received beyond it (bit i stands for 'base + 1 + i'), and unacknowledged chunks are retransmitted
+after a timeout (or sooner, when a later chunk has already been acknowledged). A downloader missing
+chunks repeats its acknowledgement every timeout, so once only the final window is unacknowledged and
+all of it was sent since the last acknowledgement, the seeder only waits a few timeouts for the final
+acknowledgement, which may have been lost.
+"""
+
+# built-in dependencies
+import os
+import random
+import socket
+import struct
+import time
+import typing
+
+# project dependencies
+from protocol.base import TransferError
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+# packet types
+REQUEST = 1
+DATA = 2
+ACK = 3
+ERROR = 4
+
+# packet headers
+HEADER = struct.Struct("!BI")
+REQUEST_HEADER = struct.Struct("!BIIHQQ")
+DATA_HEADER = struct.Struct("!BIII")
+ACK_HEADER = struct.Struct("!BII")
+
+# limits
+MAX_DATAGRAM_SIZE = 65507
+MAX_CHUNK_SIZE = MAX_DATAGRAM_SIZE - DATA_HEADER.size
+MAX_WINDOW = 4096
+
+# defaults
+DEFAULT_CHUNK_SIZE = 8192
+DEFAULT_WINDOW = 64
+DEFAULT_RTO = 0.2
+DEFAULT_TIMEOUT = 10
+FINAL_ACK_RTOS = 3  # retransmission timeouts waited for the final acknowledgement once the final window was sent
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class Request(typing.NamedTuple):
+    """
+    Parsed REQUEST packet
+    """
+
+    transfer_id: int
+    chunk_size: int
+    window: int
+    offset: int
+    length: int  # '0' means 'until the end of the resource'
+    resource: str
+
+
+def parse_request(packet: bytes) -> typing.Optional[Request]:
+    """
+    Parses a REQUEST packet
+
+    :param packet: Received datagram
+    :return: Parsed request or None if datagram is not a valid request
+    """
+
+    if len(packet) <= REQUEST_HEADER.size:
+        return None
+
+    kind, transfer_id, chunk_size, window, offset, length = REQUEST_HEADER.unpack_from(packet)
+
+    if kind != REQUEST:
+        return None
+
+    try:
+        resource = packet[REQUEST_HEADER.size:].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+    return Request(
+        transfer_id=transfer_id,
+        chunk_size=max(1, min(chunk_size, MAX_CHUNK_SIZE)),
+        window=max(1, min(window, MAX_WINDOW)),
+        offset=offset,
+        length=length,
+        resource=resource
+    )
+
+
+def send_error(sock: socket.socket, client: typing.Tuple, transfer_id: int, message: str) -> None:
+    """
+    Sends an ERROR packet
+
+    :param sock: Socket to send through
+    :param client: Downloader's address
+    :param transfer_id: Transfer's id
+    :param message: Error message
+    """
+
+    sock.sendto(HEADER.pack(ERROR, transfer_id) + message.encode("utf-8"), client)
+
+
+def serve(sock: socket.socket, client: typing.Tuple, request: Request,
+          rto: float = DEFAULT_RTO, timeout: float = DEFAULT_TIMEOUT) -> int:
+    """
+    Sends a resource's range to a downloader, honoring its window and retransmitting lost chunks
+
+    :param sock: Dedicated transfer socket
+    :param client: Downloader's address
+    :param request: Downloader's request
+    :param rto: Retransmission timeout
+    :param timeout: Seconds without any acknowledgement before giving up
+    :return: Number of bytes delivered (acknowledged in order)
+    """
+
+    try:
+        resource = open(request.resource, "rb")
+    except OSError:
+        send_error(sock, client, request.transfer_id, f"resource '{request.resource}' not found")
+        return 0
+
+    with resource:
+        fd = resource.fileno()
+        size = os.fstat(fd).st_size
+
+        start = min(request.offset, size)
+        end = size if not request.length else min(size, start + request.length)
+        chunk_size = request.chunk_size
+        total = (end - start + chunk_size - 1) // chunk_size
+
+        acked = bytearray(total)
+        sent_at = [0.0] * total
+        base = 0
+        highest = -1  # highest acknowledged sequence number
+        last_progress = time.monotonic()
+        covered_at = None  # since when only the final window is unacknowledged, all sent since last_progress
+
+        if not total:
+            sock.sendto(DATA_HEADER.pack(DATA, request.transfer_id, 0, 0), client)
+            return 0
+
+        sock.settimeout(rto)
+
+        while base < total:
+            now = time.monotonic()
+
+            # send new chunks and retransmit the expired ones inside the window
+            for seq in range(base, min(base + request.window, total)):
+                if acked[seq]:
+                    continue
+
+                # chunks behind an acknowledged one were most likely lost, retransmit sooner
+                expiry = rto / 4 if seq < highest else rto
+
+                if now - sent_at[seq] >= expiry:
+                    offset = start + seq * chunk_size
+                    chunk = os.pread(fd, min(chunk_size, end - offset), offset)
+                    sock.sendto(DATA_HEADER.pack(DATA, request.transfer_id, seq, total) + chunk, client)
+                    sent_at[seq] = now
+
+            try:
+                packet, address = sock.recvfrom(MAX_DATAGRAM_SIZE)
+            except socket.timeout:
+                now = time.monotonic()
+
+                if now - last_progress > timeout:
+                    return min(base * chunk_size, end - start)
+
+                # only the final window is missing, all of it was sent since the last acknowledgement and
+                # the downloader stopped acknowledging: it most likely has every chunk and its final
+                # acknowledgement was lost, so the final window is not retransmitted until the whole timeout
+                if covered_at is None and base >= total - request.window and all(
+                        sent_at[seq] > last_progress for seq in range(base, total) if not acked[seq]):
+                    covered_at = now
+
+                if covered_at is not None and now - covered_at > FINAL_ACK_RTOS * rto:
+                    return min(base * chunk_size, end - start)
+                continue
+
+            if address != client or len(packet) < ACK_HEADER.size:
+                continue
+
+            kind, transfer_id, ack_base = ACK_HEADER.unpack_from(packet)
+
+            if kind != ACK or transfer_id != request.transfer_id:
+                continue
+
+            last_progress = time.monotonic()
+            covered_at = None
+
+            # cumulative acknowledgement
+            for seq in range(base, min(ack_base, total)):
+                acked[seq] = 1
+            highest = max(highest, ack_base - 1)
+
+            # selective acknowledgement
+            bitmap = int.from_bytes(packet[ACK_HEADER.size:], "little")
+            seq = ack_base + 1
+            while bitmap and seq < total:
+                if bitmap & 1:
+                    acked[seq] = 1
+                    highest = max(highest, seq)
+                bitmap >>= 1
+                seq += 1
+
+            while base < total and acked[base]:
+                base += 1
+
+        return end - start
+
+
+def download(sock: socket.socket, address: typing.Tuple, resource: str, offset: int = 0, length: int = 0,
+             chunk_size: int = DEFAULT_CHUNK_SIZE, window: int = DEFAULT_WINDOW, rto: float = DEFAULT_RTO,
+             timeout: float = DEFAULT_TIMEOUT) -> typing.Iterator[bytes]:
+    """
+    Downloads a resource's range from a seeder peer, yielding its data in order
+
+    :param sock: Downloader's UDP socket
+    :param address: Seeder's listen address
+    :param resource: Resource identification at seeder's listen port
+    :param offset: First byte of the desired range
+    :param length: Range's length ('0' means 'until the end of the resource')
+    :param chunk_size: Size of each chunk
+    :param window: Maximum number of unacknowledged chunks
+    :param rto: Interval to repeat the request or the last acknowledgement when nothing arrives
+    :param timeout: Seconds without any progress before giving up
+    :return: Iterator over the resource's data, in order
+    :raises socket.timeout: When the seeder stops responding
+    :raises TransferError: When the seeder reports an error
+    """
+
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    window = max(1, min(window, MAX_WINDOW))
+    transfer_id = random.getrandbits(32)
+
+    request = REQUEST_HEADER.pack(REQUEST, transfer_id, chunk_size, window, offset, length) \
+        + resource.encode("utf-8")
+    bitmap_size = (window + 7) // 8
+
+    def acknowledge() -> None:
+        bitmap = 0
+        for received in pending:
+            bitmap |= 1 << (received - base - 1)
+        sock.sendto(ACK_HEADER.pack(ACK, transfer_id, base) + bitmap.to_bytes(bitmap_size, "little"), seeder)
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    except OSError:
+        pass
+
+    sock.settimeout(rto)
+    sock.sendto(request, address)
+
+    seeder = None  # seeder's dedicated transfer address
+    total = None
+    base = 0
+    pending = dict()  # out of order chunks
+    unacknowledged = 0
+    last_progress = time.monotonic()
+
+    while total is None or base < total:
+        try:
+            packet, sender = sock.recvfrom(MAX_DATAGRAM_SIZE)
+        except socket.timeout:
+            if time.monotonic() - last_progress > timeout:
+                raise
+            if seeder is None:
+                sock.sendto(request, address)
+            else:
+                acknowledge()
+            continue
+
+        if len(packet) < HEADER.size:
+            continue
+
+        kind, packet_transfer_id = HEADER.unpack_from(packet)
+
+        if packet_transfer_id != transfer_id or (seeder is not None and sender != seeder):
+            continue
+
+        if kind == ERROR:
+            raise TransferError(packet[HEADER.size:].decode("utf-8", "replace"))
+
+        if kind != DATA or len(packet) < DATA_HEADER.size:
+            continue
+
+        seeder = sender
+        last_progress = time.monotonic()
+        _, _, seq, total = DATA_HEADER.unpack_from(packet)
+
+        if not total:  # empty range
+            break
+
+        if seq == base:
+            yield packet[DATA_HEADER.size:]
+            base += 1
+
+            while base in pending:
+                yield pending.pop(base)
+                base += 1
+
+            unacknowledged += 1
+            if unacknowledged >= window // 4 or base >= total or pending:
+                acknowledge()
+                unacknowledged = 0
+
+        else:
+            if base < seq < base + window:
+                pending[seq] = packet[DATA_HEADER.size:]
+            # out of order or duplicate chunk, tell seeder right away
+            acknowledge()
+            unacknowledged = 0
+
+    if seeder is not None and total:
+        # repeat last acknowledgement, so seeder can release the transfer
+        acknowledge()
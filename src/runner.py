@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines the REST central server's production runner (many worker processes, through gunicorn)
+"""
+
+# external dependencies
+import gunicorn.app.base
+
+# project dependencies
+from app import (
+    HOST,
+    KEEP_ALIVE_TIMEOUT,
+    PORT,
+    create_app
+)
+from controllers.database.selection import DEFAULT_STRATEGY
+from database.engine import create_engine
+from database.table import create_table
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_THREADS = 8  # requests handled at once by each worker
+
+
+def _create_tables(server) -> None:
+    """
+    Creates database's tables once, at the master process, before any worker starts
+
+    The engine is disposed right away, so no database connection is inherited by forked workers
+    """
+
+    engine = create_engine()
+    try:
+        create_table(engine)
+    finally:
+        engine.dispose()
+
+
+class ProductionRunner(gunicorn.app.base.BaseApplication):
+    """
+    Runner of many worker processes, each one with its own threads, database connections and
+    heartbeat monitor, answering from the database (registry and liveness shared by every worker)
+    """
+
+    def __init__(self, workers: int, udp_heartbeat: bool = False, selection: str = DEFAULT_STRATEGY,
+                 threads: int = DEFAULT_THREADS, host: str = HOST, port: int = PORT):
+        """
+        :param workers: Number of worker processes
+        :param udp_heartbeat: Whether compact heartbeats are also received over UDP (by every worker)
+        :param selection: Strategy that ranks a content's holders by their reported load
+        :param threads: Requests handled at once by each worker
+        :param host: IPV4 to listen at
+        :param port: TCP port to listen at
+        """
+
+        self.options = {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": "gthread",
+            "threads": threads,
+            "keepalive": KEEP_ALIVE_TIMEOUT,
+            "on_starting": _create_tables,
+        }
+        self.udp_heartbeat = udp_heartbeat
+        self.selection = selection
+
+        super(ProductionRunner, self).__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """
+        Creates the application at each worker (after the fork)
+        """
+
+        return create_app(shared=True, udp_heartbeat=self.udp_heartbeat, selection=self.selection)
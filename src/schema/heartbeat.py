@@ -19,7 +19,11 @@ class PostHeartbeatSchema(marshmallow.Schema):
     Example:
     {
         peer_id: <UUID>
+        active_uploads: <Int> (optional, along with upload_rate)
+        upload_rate: <Int> (optional, bytes per second)
     }
     """
 
     peer_id = marshmallow.fields.UUID()
+    active_uploads = marshmallow.fields.Int(validate=marshmallow.validate.Range(min=0))
+    upload_rate = marshmallow.fields.Int(validate=marshmallow.validate.Range(min=0))
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines '/resource/metadata' route body's schema
+"""
+
+# external dependencies
+import marshmallow
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class GetResourceMetadataSchema(marshmallow.Schema):
+    """
+    Schema validation for central server's 'GET' route (/resource/metadata)
+
+    Example:
+    {
+        resource_hash: <String>
+    }
+    """
+
+    resource_hash = marshmallow.fields.String(required=True)
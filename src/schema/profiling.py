@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines '/admin/profiling' route body's schema
+"""
+
+# external dependencies
+import marshmallow
+
+# project dependencies
+from controllers.profiling import METHODS
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+
+class PostProfilingSchema(marshmallow.Schema):
+    """
+    Schema validation for central server's 'POST' route (/admin/profiling)
+
+    Example:
+    {
+        rate: <Float> (fraction of requests profiled, 0 turns profiling off)
+        method: <String> (optional, 'cprofile' or 'sampler')
+    }
+    """
+
+    rate = marshmallow.fields.Float(
+        required=True,
+        validate=marshmallow.validate.Range(min=0, max=1)
+    )
+    method = marshmallow.fields.String(
+        validate=marshmallow.validate.OneOf(METHODS)
+    )
@@ -8,9 +8,15 @@ Module that defines '/resource' routes body's schemas
 # external dependencies
 import marshmallow
 
+# project dependencies
+from protocol import merkle
+
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "24/10/2020"
 
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+
 
 class GetResourceSchema(marshmallow.Schema):
     """
@@ -25,6 +31,24 @@ class GetResourceSchema(marshmallow.Schema):
     resource_name = marshmallow.fields.String()
 
 
+class GetResourcePageSchema(marshmallow.Schema):
+    """
+    Schema validation for central server's 'GET' route (/resource) query string, when listing
+
+    Example:
+    ?limit=<Int>&after=<Int>
+    """
+
+    limit = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=1, max=MAX_PAGE_SIZE),
+        missing=DEFAULT_PAGE_SIZE
+    )
+    after = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=0),
+        missing=0
+    )
+
+
 class PostResourceSchema(marshmallow.Schema):
     """
     Schema validation for central server's 'POST' route (/resource)
@@ -37,6 +61,11 @@ class PostResourceSchema(marshmallow.Schema):
         resource_name: <String>
         resource_path: <String>
         resource_hash: <String>
+        resource_size: <Int> (optional)
+        transfer_mode: <String> ('udp' or 'tcp', defaults to 'udp')
+        piece_size: <Int> (optional)
+        piece_hashes: <List<String>> (optional, SHA-256 of every piece)
+        merkle_root: <String> (optional, required with piece_hashes)
     }
     """
 
@@ -46,3 +75,43 @@ class PostResourceSchema(marshmallow.Schema):
     resource_name = marshmallow.fields.String()
     resource_path = marshmallow.fields.String()
     resource_hash = marshmallow.fields.String()
+    resource_size = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=0),
+        missing=None,
+        allow_none=True
+    )
+    transfer_mode = marshmallow.fields.String(
+        validate=marshmallow.validate.OneOf(["udp", "tcp"]),
+        missing="udp"
+    )
+    piece_size = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=1),
+        missing=None,
+        allow_none=True
+    )
+    piece_hashes = marshmallow.fields.List(
+        marshmallow.fields.String(validate=marshmallow.validate.Regexp(r"^[0-9a-f]{64}$")),
+        missing=None,
+        allow_none=True
+    )
+    merkle_root = marshmallow.fields.String(missing=None, allow_none=True)
+
+    @marshmallow.validates_schema
+    def validate_pieces(self, data: dict, **kwargs) -> None:
+        """
+        Piece hashes must cover the whole resource and match their Merkle root
+        """
+
+        if data.get("piece_hashes") is None:
+            return
+
+        if data.get("piece_size") is None or data.get("resource_size") is None or data.get("merkle_root") is None:
+            raise marshmallow.ValidationError(
+                "piece_hashes requires resource_size, piece_size and merkle_root", "piece_hashes"
+            )
+
+        if len(data["piece_hashes"]) != merkle.piece_count(data["resource_size"], data["piece_size"]):
+            raise marshmallow.ValidationError("piece count does not match resource's size", "piece_hashes")
+
+        if merkle.merkle_root(data["piece_hashes"]) != data["merkle_root"]:
+            raise marshmallow.ValidationError("Merkle root does not match piece hashes", "merkle_root")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines '/search' route query string's schema
+"""
+
+# external dependencies
+import marshmallow
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+DEFAULT_SEARCH_SIZE = 20
+MAX_SEARCH_SIZE = 100
+MAX_QUERY_LENGTH = 100  # same as resources' names
+
+
+class GetSearchSchema(marshmallow.Schema):
+    """
+    Schema validation for central server's 'GET' route (/search) query string
+
+    Example:
+    ?q=<String>&limit=<Int>&offset=<Int>
+    """
+
+    q = marshmallow.fields.String(
+        required=True,
+        validate=marshmallow.validate.Length(min=1, max=MAX_QUERY_LENGTH)
+    )
+    limit = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=1, max=MAX_SEARCH_SIZE),
+        missing=DEFAULT_SEARCH_SIZE
+    )
+    offset = marshmallow.fields.Int(
+        validate=marshmallow.validate.Range(min=0),
+        missing=0
+    )
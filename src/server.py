@@ -5,38 +5,63 @@
 Module that starts the REST central server (server's main thread)
 """
 
+# built-in dependencies
+import sys
+
 # external dependencies
-import atexit
-import flask
-import flask_restful
-from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import WSGIRequestHandler
 
 # project dependencies
-from controllers.server.heartbeat import HeartBeatController
-from controllers.server.resource import ResourceController
-from controllers.server.utils import response
-from database.table import create_table
+from app import (
+    HOST,
+    KEEP_ALIVE_TIMEOUT,
+    PORT,
+    create_app
+)
+from controllers.database.selection import (
+    DEFAULT_STRATEGY,
+    STRATEGIES
+)
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "24/10/2020"
 
 if __name__ == "__main__":
-    app = flask.Flask(__name__)
-    api = flask_restful.Api(app)
 
-    # stop server's heartbeat threads when server is stopped
-    atexit.register(HeartBeatController.stop_threads)
+    args = sys.argv[1:]
+    udp_heartbeat = "--udp-heartbeat" in args
+    workers = None
+    selection = DEFAULT_STRATEGY
+
+    if "--workers" in args:
+        position = args.index("--workers")
+        workers = args[position + 1] if position + 1 < len(args) else ""
+        del args[position:position + 2]
+
+    if "--selection" in args:
+        position = args.index("--selection")
+        selection = args[position + 1] if position + 1 < len(args) else ""
+        del args[position:position + 2]
+
+    if [arg for arg in args if arg != "--udp-heartbeat"] or (workers is not None and not workers.isdigit()) or \
+            selection not in STRATEGIES:
+        print("Usage: python src/server.py [--udp-heartbeat] [--workers <processes:int>] "
+              f"[--selection {'|'.join(STRATEGIES)}]")
+        sys.exit(2)
+
+    if workers is not None:
+        # production mode: many worker processes sharing registry and liveness through the database
+        from runner import ProductionRunner
 
-    # when internal exceptions occurs
-    @app.errorhandler(InternalServerError)
-    def handle_exception(e):
-        return response.internal_server_error(data=e)
+        ProductionRunner(workers=int(workers), udp_heartbeat=udp_heartbeat, selection=selection).run()
 
-    # assign resources to routes
-    api.add_resource(ResourceController, "/resource")
-    api.add_resource(HeartBeatController, "/heartbeat")
+    else:
+        app = create_app(udp_heartbeat=udp_heartbeat, selection=selection)
 
-    # create database table if not exists
-    create_table()
+        # keep peers' connections alive between requests (HTTP/1.0 closes them after every response),
+        # closing the idle ones so that gone peers do not hold a server thread forever
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        WSGIRequestHandler.timeout = KEEP_ALIVE_TIMEOUT
+        WSGIRequestHandler.disable_nagle_algorithm = True  # headers and body are written apart
 
-    app.run()
+        app.run(host=HOST, port=PORT)
@@ -8,52 +8,132 @@ Module that defines peer's heart beat thread
 # built-in dependencies
 import json
 import queue
-import time
+import socket
+import typing
 
 # external dependencies
 import requests
 
 # project dependencies
+from controllers.peer.rest_client import (
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    RESTClientController
+)
+from protocol import heartbeat
 from threads.base import BaseThread
 
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "31/10/2020"
 
+HEARTBEAT_INTERVAL = 5  # seconds
+
 
 class PeerHeartBeatThread(BaseThread):
     """
     Peer's heart beat thread
+
+    Beats go through a single keep-alive connection, kept for the thread's whole lifetime, or as
+    compact UDP datagrams when central server listens for them. Each beat carries the peer's current
+    load, when known, so central server ranks it among the holders of its resources
     """
 
-    def __init__(self, peer_id: str, server_ip: str, exceptions: queue.Queue, *args, **kwargs):
+    def __init__(self, peer_id: str, server_ip: str, exceptions: queue.Queue,
+                 timeout: typing.Union[float, typing.Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, udp: bool = False,
+                 load: typing.Optional[typing.Callable[[], heartbeat.Load]] = None, *args, **kwargs):
         super(PeerHeartBeatThread, self).__init__(*args, **kwargs)
 
         # arguments
         self.server_ip = server_ip
         self.peer_id = peer_id
         self.exceptions = exceptions
+        self.timeout = timeout
+        self.retries = retries
+        self.udp = udp
+        self.load = load
 
     def run(self) -> None:
         """
-        Overrides the base thread's behaviour to consume a heartbeat route at central server
+        Overrides the base thread's behaviour to beat at central server
+        """
+
+        if self.udp:
+            self.__run_udp()
+        else:
+            self.__run_rest()
+
+    def __run_rest(self) -> None:
+        """
+        Consumes the heartbeat route at central server
         """
 
-        body = {
-            "peer_id": self.peer_id
-        }
         headers = {
             "Content-Type": "application/json"
         }
 
+        # a beat only refreshes peer's liveness, so it is safe to retry
+        client = RESTClientController(timeout=self.timeout, retries=self.retries, pool_size=1,
+                                      stop_event=self.stop_event)
+
         try:
             while not self.stop_event.is_set():
-                requests.post(
+                body = {
+                    "peer_id": self.peer_id
+                }
+
+                if self.load is not None:
+                    body["active_uploads"], body["upload_rate"] = self.load()
+
+                client.post(
                     f"http://{self.server_ip}:5000/heartbeat",
+                    idempotent=True,
                     data=json.dumps(body),
                     headers=headers
                 )
-                time.sleep(5)
+                self.stop_event.wait(HEARTBEAT_INTERVAL)
+
+        except requests.exceptions.RequestException as err:
+            if not self.stop_event.is_set():
+                self.exceptions.put_nowait(err)
+
+        finally:
+            client.close()
+
+    def __run_udp(self) -> None:
+        """
+        Sends sequenced heartbeat datagrams to central server's UDP heartbeat port
+        """
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # a connected socket reports an unreachable server (ICMP) at the following send
+        sock.connect((self.server_ip, heartbeat.DEFAULT_PORT))
+
+        sequence = 0
+        failures = 0
+        delivered = 0
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    sock.send(heartbeat.pack(self.peer_id, sequence, self.load() if self.load else None))
+
+                    # an unreachable server fails every other send (each error is reported once),
+                    # so it is only reachable again after two sends in a row succeed
+                    delivered += 1
+                    if delivered >= 2:
+                        failures = 0
+
+                except OSError as err:
+                    delivered = 0
+                    failures += 1
+                    if failures > self.retries:
+                        self.exceptions.put_nowait(err)
+                        return
+
+                sequence += 1
+                self.stop_event.wait(heartbeat.DEFAULT_INTERVAL)
 
-        except requests.exceptions.ConnectionError as err:
-            self.exceptions.put_nowait(err)
+        finally:
+            sock.close()
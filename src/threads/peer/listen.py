@@ -6,10 +6,21 @@ Module that defines a peer's listen thread
 """
 
 # built-in dependencies
+import collections
+import concurrent.futures
 import queue
+import selectors
 import socket
+import threading
+import time
+import typing
 
 # project dependencies
+from protocol import (
+    tcp,
+    udp
+)
+from protocol.heartbeat import Load
 from threads.base import BaseThread
 
 
@@ -17,45 +28,205 @@ __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
 __date__ = "31/10/2020"
 
 
+DEFAULT_MAX_TRANSFERS = 16
+RATE_WINDOW = 30  # seconds of finished transfers averaged into the reported upload rate
+
+
 class PeerListenSocketThread(BaseThread):
     """
     Peer's listen thread for socket communications
+
+    Transfers are served by a bounded pool of workers: up to 'max_transfers' run at the same time and
+    as many more wait for a free worker, further requests are refused with a 'busy' error, so
+    downloaders move on to another seeder. Accepted transfers and bytes recently served make up the
+    load reported to central server, which ranks this peer among the holders of its resources
     """
 
-    def __init__(self, peer_ip: str, listen_port: int, exceptions: queue.Queue, *args, **kwargs):
+    def __init__(self, peer_ip: str, listen_port: int, exceptions: queue.Queue, transfer_mode: str = "udp",
+                 max_transfers: int = DEFAULT_MAX_TRANSFERS, *args, **kwargs):
         super(PeerListenSocketThread, self).__init__(*args, **kwargs)
 
         # arguments
         self.peer_ip = peer_ip
         self.listen_port = listen_port
         self.exceptions = exceptions
+        self.transfer_mode = transfer_mode
+        self.max_transfers = max_transfers
 
         # sockets
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.bind((self.peer_ip, int(self.listen_port)))
 
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.socket, selectors.EVENT_READ)
+
+        # streaming listener at the same port number (only when peer advertises TCP transfers)
+        self.tcp_socket = None
+        if self.transfer_mode == "tcp":
+            self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.tcp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.tcp_socket.bind((self.peer_ip, int(self.listen_port)))
+            self.tcp_socket.listen()
+            self.selector.register(self.tcp_socket, selectors.EVENT_READ)
+
+        # workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_transfers,
+            thread_name_prefix="transfer"
+        )
+
+        # (client's address, transfer's id) -> requested resource, for every accepted transfer
+        self.transfers = dict()
+        self.transfers_lock = threading.Lock()
+
+        # (finish time, bytes served) of the transfers finished in the last 'RATE_WINDOW' seconds
+        self.uploaded = collections.deque()
+        self.uploaded_bytes = 0
+
+        # recently served requests (downloaders repeat their request until the first chunk arrives)
+        self.served = collections.deque(maxlen=1024)
+
     def run(self) -> None:
         """
-        Overrides the base thread's behaviour to send a local file content through UDP socket
+        Overrides the base thread's behaviour to send a local file content through UDP or TCP socket
         when a connection is received
         """
 
         try:
             while not self.stop_event.is_set():
-                try:
-                    # wait for connection with timeout (check for thread interruption)
-                    self.socket.settimeout(1)
-                    msg, client = self.socket.recvfrom(10240)
+                # wait for connection with timeout (check for thread interruption)
+                for key, _ in self.selector.select(timeout=1):
+                    if key.fileobj is self.socket:
+                        self.__accept_datagram()
+                    else:
+                        self.__accept_stream()
+
+        except Exception as err:
+            self.exceptions.put_nowait(err)
 
-                    # open resource through received message
-                    resource = open(msg, "rb").read(10240)
+        finally:
+            self.executor.shutdown(wait=False)
+            self.selector.close()
+            if self.tcp_socket is not None:
+                self.tcp_socket.close()
 
-                    # send back to the caller
-                    self.socket.sendto(resource, client)
+    def load(self) -> Load:
+        """
+        :return: Transfers in progress (or waiting for a worker) and bytes per second recently served
+        """
 
-                except socket.timeout:
-                    pass
+        horizon = time.monotonic() - RATE_WINDOW
 
-        except Exception as err:
-            self.exceptions.put_nowait(err)
+        with self.transfers_lock:
+            while self.uploaded and self.uploaded[0][0] < horizon:
+                self.uploaded_bytes -= self.uploaded.popleft()[1]
+
+            return len(self.transfers), self.uploaded_bytes // RATE_WINDOW
+
+    def __accept_datagram(self) -> None:
+        """
+        Receives a UDP transfer request and hands it to a worker
+        """
+
+        msg, client = self.socket.recvfrom(udp.MAX_DATAGRAM_SIZE)
+
+        request = udp.parse_request(msg)
+
+        if request is None or (client, request.transfer_id) in self.served:
+            return
+
+        self.served.append((client, request.transfer_id))
+
+        if not self.__register((client, request.transfer_id), request.resource):
+            udp.send_error(self.socket, client, request.transfer_id, "peer is busy")
+            return
+
+        # send resource to the caller through a dedicated transfer socket
+        self.executor.submit(self.__serve_datagram, request, client)
+
+    def __accept_stream(self) -> None:
+        """
+        Accepts a TCP transfer connection and hands it to a worker
+        """
+
+        conn, client = self.tcp_socket.accept()
+
+        if not self.__register((client, 0), None):
+            with conn:
+                tcp.send_error(conn, "peer is busy")
+            return
+
+        self.executor.submit(self.__serve_stream, conn, client)
+
+    def __register(self, key: typing.Tuple, resource: typing.Optional[str]) -> bool:
+        """
+        Registers a new transfer if there is room for it at the pool
+
+        :param key: Transfer's key (client's address, transfer's id)
+        :param resource: Requested resource (unknown for TCP transfers until a worker reads the request)
+        :return: Whether transfer was accepted
+        """
+
+        with self.transfers_lock:
+            if len(self.transfers) >= 2 * self.max_transfers:
+                return False
+
+            self.transfers[key] = resource
+            return True
+
+    def __unregister(self, key: typing.Tuple, served: int = 0) -> None:
+        """
+        Removes a finished transfer
+
+        :param key: Transfer's key (client's address, transfer's id)
+        :param served: Number of bytes it served
+        """
+
+        with self.transfers_lock:
+            self.transfers.pop(key, None)
+
+            if served:
+                self.uploaded.append((time.monotonic(), served))
+                self.uploaded_bytes += served
+
+    def __serve_datagram(self, request: udp.Request, client: tuple) -> None:
+        """
+        Serves a single transfer through a dedicated UDP socket
+
+        :param request: Downloader's request
+        :param client: Downloader's address
+        """
+
+        transfer_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        served = 0
+
+        try:
+            transfer_socket.bind((self.peer_ip, 0))
+            served = udp.serve(transfer_socket, client, request)
+
+        except OSError:
+            pass
+
+        finally:
+            transfer_socket.close()
+            self.__unregister((client, request.transfer_id), served)
+
+    def __serve_stream(self, conn: socket.socket, client: tuple) -> None:
+        """
+        Serves a single transfer through an accepted TCP connection
+
+        :param conn: Accepted connection
+        :param client: Downloader's address
+        """
+
+        served = 0
+
+        try:
+            with conn:
+                served = tcp.serve(conn)
+
+        except OSError:  # includes connection errors and timeouts
+            pass
 
+        finally:
+            self.__unregister((client, 0), served)
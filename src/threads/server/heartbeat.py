@@ -6,11 +6,16 @@ Module that defines server's heart beat thread
 """
 
 # built-in dependencies
+import heapq
+import threading
 import time
 import typing
 
 # project dependencies
-from controllers.database.database import get_database_resource_table_controller
+from controllers.database.index import get_resource_index_controller
+from controllers.database.liveness import get_database_liveness_table_controller
+from controllers.server.utils.metrics import get_metrics_registry_controller
+from protocol.heartbeat import Load
 from threads.base import BaseThread
 
 __authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
@@ -20,33 +25,217 @@ __date__ = "30/10/2020"
 class ServerHeartBeatThread(BaseThread):
     """
     Server's heart beat thread
+
+    A single thread monitors every peer: each peer owns one deadline at a min-heap, a heartbeat
+    only refreshes the peer's deadline at a map (O(1)) and the heap entry is lazily rescheduled
+    when it reaches the top, so the heap never holds more than one entry per monitored peer
     """
 
-    def __init__(self, peer_id: str, my_queue: typing.List, *args, **kwargs):
+    def __init__(self, timeout: float = 7, batch_size: int = 500, *args, **kwargs):
         super(ServerHeartBeatThread, self).__init__(*args, **kwargs)
 
+        self.daemon = True
+
         # arguments
-        self.peer_id = peer_id
-        self.my_queue = my_queue
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+        # peer's id -> deadline (latest heartbeat + timeout)
+        self.deadlines = dict()
+        # peer's id -> latest sequence number, for peers beating over UDP
+        self.sequences = dict()
+        # min-heap of (deadline, peer's id), at most one entry per monitored peer
+        self.heap = list()
+        self.lock = threading.Lock()
 
         # database access
-        self.db_access = get_database_resource_table_controller()
+        self.db_access = get_resource_index_controller()
+        self.metrics = get_metrics_registry_controller()
+
+    def beat(self, peer_id: str, load: typing.Optional[Load] = None) -> None:
+        """
+        Registers a heartbeat for a peer, starting its monitoring if it is a new peer
+
+        :param peer_id: Peer's id
+        :param load: Peer's reported load, if any
+        """
+
+        deadline = time.monotonic() + self.timeout
+
+        with self.lock:
+            if peer_id not in self.deadlines:  # new (or previously expired) peer
+                heapq.heappush(self.heap, (deadline, peer_id))
+
+            self.deadlines[peer_id] = deadline
+
+        if load is not None:
+            self.db_access.report_loads({peer_id: load})
+
+    def beat_many(self, beats: typing.Iterable[typing.Tuple[str, int, typing.Optional[Load]]]) -> None:
+        """
+        Registers many sequenced heartbeats at once (e.g. a burst of UDP beats), discarding the ones
+        that arrived duplicated or out of order
+
+        :param beats: Tuples (peer's id, beat's sequence number, peer's reported load or None)
+        """
+
+        deadline = time.monotonic() + self.timeout
+        deadlines = self.deadlines
+        sequences = self.sequences
+        loads = dict()
+
+        with self.lock:
+            for peer_id, sequence, load in beats:
+                if sequence <= sequences.get(peer_id, -1):
+                    continue
+
+                sequences[peer_id] = sequence
+
+                if peer_id not in deadlines:  # new (or previously expired) peer
+                    heapq.heappush(self.heap, (deadline, peer_id))
+
+                deadlines[peer_id] = deadline
+
+                if load is not None:
+                    loads[peer_id] = load
+
+        # loads rank holders at the index, taking its lock once per burst
+        if loads:
+            self.db_access.report_loads(loads)
+
+    def expire(self, now: float) -> typing.List[str]:
+        """
+        Pops every peer whose deadline has passed
+
+        :param now: Current monotonic time
+        :return: List of expired peer's ids
+        """
+
+        expired = list()
+
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, peer_id = self.heap[0]
+                deadline = self.deadlines.get(peer_id)
+
+                if deadline is not None and deadline > now:
+                    # peer sent a heartbeat since this entry was scheduled, move it forward
+                    heapq.heapreplace(self.heap, (deadline, peer_id))
+
+                else:
+                    heapq.heappop(self.heap)
+                    self.deadlines.pop(peer_id, None)
+                    self.sequences.pop(peer_id, None)
+                    expired.append(peer_id)
+
+        return expired
+
+    def next_wakeup(self, now: float) -> float:
+        """
+        Time to sleep until the earliest deadline
+
+        :param now: Current monotonic time
+        :return: Seconds until the earliest deadline
+        """
+
+        with self.lock:
+            if self.heap:
+                return max(self.heap[0][0] - now, 0)
+
+        # any peer registered from now on expires no sooner than a full timeout
+        return self.timeout
 
     def run(self) -> None:
         """
-        Overrides the base thread's behaviour to check peer's heart beat
+        Overrides the base thread's behaviour to drop every peer that stopped beating
         """
 
-        while not self.stop_event.is_set():
-            if self.my_queue:
-                # if heartbeat received at '/heartbeat' route from the monitored peer,
-                # sleep until next
-                self.my_queue.clear()
-                time.sleep(7)
+        while not self.stop_event.wait(self.next_wakeup(time.monotonic())):
+            expired = self.expire(time.monotonic())
+
+            # drop peer data from database in batches
+            for i in range(0, len(expired), self.batch_size):
+                self.db_access.drop_peers(expired[i:i + self.batch_size])
+
+            if expired:
+                self.metrics.increment("p2p_heartbeat_expirations_total", amount=len(expired))
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+
+class ServerSharedHeartBeatThread(BaseThread):
+    """
+    Server's heart beat thread for multi-process servers
+
+    Same interface as ServerHeartBeatThread, but peers' deadlines live at the database's liveness table
+    (unix time, comparable across processes), so every process answers heartbeats and any of them
+    expires a peer. Each process runs its own thread, waking at the earliest deadline of the table
+    """
+
+    def __init__(self, timeout: float = 7, batch_size: int = 500, *args, **kwargs):
+        super(ServerSharedHeartBeatThread, self).__init__(*args, **kwargs)
+
+        self.daemon = True
+
+        # arguments
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+        # database access
+        self.liveness = get_database_liveness_table_controller()
+        self.metrics = get_metrics_registry_controller()
+
+    def beat(self, peer_id: str, load: typing.Optional[Load] = None) -> None:
+        """
+        Registers a heartbeat for a peer, starting its monitoring if it is a new peer
+
+        :param peer_id: Peer's id
+        :param load: Peer's reported load, if any
+        """
+
+        self.liveness.beat_many([(peer_id, None, load)], time.time() + self.timeout)
+
+    def beat_many(self, beats: typing.Iterable[typing.Tuple[str, int, typing.Optional[Load]]]) -> None:
+        """
+        Registers many sequenced heartbeats at once, discarding the ones that arrived duplicated or
+        out of order
+
+        :param beats: Tuples (peer's id, beat's sequence number, peer's reported load or None)
+        """
+
+        self.liveness.beat_many(beats, time.time() + self.timeout)
+
+    def next_wakeup(self, now: float) -> float:
+        """
+        Time to sleep until the earliest deadline
+
+        :param now: Current unix time
+        :return: Seconds until the earliest deadline
+        """
+
+        deadline = self.liveness.next_deadline()
+
+        # peers registered from now on (by any process) expire no sooner than a full timeout
+        if deadline is None:
+            return self.timeout
+
+        return min(max(deadline - now, 0), self.timeout)
+
+    def run(self) -> None:
+        """
+        Overrides the base thread's behaviour to drop every peer that stopped beating
+        """
+
+        while not self.stop_event.wait(self.next_wakeup(time.time())):
+            # peers' resources are deleted along with their liveness
+            expired = self.batch_size
+
+            while expired == self.batch_size:
+                expired = len(self.liveness.expire(time.time(), self.batch_size))
+
+                if expired:
+                    self.metrics.increment("p2p_heartbeat_expirations_total", amount=expired)
 
-            else:
-                # else drop peer data from database and inform central server appending '0'
-                # to my queue
-                self.db_access.drop_peer(self.peer_id)
-                self.my_queue.append(0)
-                break
+    def __len__(self) -> int:
+        return len(self.liveness)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Module that defines server's UDP heartbeat listen thread
+"""
+
+# built-in dependencies
+import selectors
+import socket
+import typing
+
+# project dependencies
+from controllers.server.utils.metrics import get_metrics_registry_controller
+from protocol import heartbeat
+from threads.base import BaseThread
+from threads.server.heartbeat import (
+    ServerHeartBeatThread,
+    ServerSharedHeartBeatThread
+)
+
+__authors__ = ["Gabriel Castro", "Gustavo Possebon", "Henrique Kops"]
+__date__ = "18/10/2026"
+
+BURST_SIZE = 1024  # datagrams drained from the socket before updating the monitor at once
+
+
+class ServerHeartBeatListenThread(BaseThread):
+    """
+    Server's UDP heartbeat listen thread
+
+    Beats are drained from a non-blocking socket in bursts and handed to the heartbeat monitor at
+    once, so a burst takes the monitor's lock a single time
+    """
+
+    def __init__(self, monitor: typing.Union[ServerHeartBeatThread, ServerSharedHeartBeatThread], ip: str,
+                 port: int = heartbeat.DEFAULT_PORT, reuse_port: bool = False, *args, **kwargs):
+        super(ServerHeartBeatListenThread, self).__init__(*args, **kwargs)
+
+        self.daemon = True
+
+        # arguments
+        self.monitor = monitor
+
+        # socket
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, heartbeat.SOCKET_BUFFER_SIZE)
+        if reuse_port:
+            # every server's process binds the same port and the kernel spreads datagrams among them
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.socket.bind((ip, port))
+        self.socket.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.socket, selectors.EVENT_READ)
+
+    def run(self) -> None:
+        """
+        Overrides the base thread's behaviour to refresh the deadline of every peer beating over UDP
+        """
+
+        receive = self.socket.recv
+        unpack = heartbeat.unpack
+        metrics = get_metrics_registry_controller()
+        transport = (("transport", "udp"),)
+        size = heartbeat.MAX_SIZE + 1  # larger datagrams are truncated to a wrong size and discarded
+
+        try:
+            while not self.stop_event.is_set():
+                beats = list()
+
+                try:
+                    for _ in range(BURST_SIZE):
+                        beat = unpack(receive(size))
+                        if beat is not None:
+                            beats.append(beat)
+
+                except BlockingIOError:
+                    pass
+
+                if beats:
+                    self.monitor.beat_many(beats)
+                    metrics.increment("p2p_heartbeats_total", transport, len(beats))
+
+                else:
+                    # socket is drained, wait for the next beats
+                    self.selector.select(timeout=0.5)
+
+        finally:
+            self.selector.close()
+            self.socket.close()